@@ -0,0 +1,69 @@
+'''
+Solves a batch of instances from the command line (see batch.run_batch).
+
+Usage: python -m src.scheduling instances [instances ...] [--heuristic tabu]
+         [--params '{"max_iterations": 50}'] [--time-limit 60] [--seed 0]
+         [--workers 4] [--output output] [--compress]
+instances: instance folders, directories of instance folders or glob patterns.
+'''
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import List
+
+from src.scheduling.batch import GRACE_PERIOD, HEURISTICS, find_instances, run_batch
+
+
+def main(argv: List[str]=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m src.scheduling', description=__doc__.split('\n\n')[0])
+    parser.add_argument('instances', nargs='+',
+                        help='instance folders, directories of instance folders or glob patterns')
+    parser.add_argument('--heuristic', default='greedy',
+                        help=f"one of {', '.join(HEURISTICS)} (default greedy)")
+    parser.add_argument('--params', default='{}', help='parameters of the heuristic, as a JSON object')
+    parser.add_argument('--time-limit', type=float,
+                        help='time limit in seconds of each instance: given to the heuristics accepting one, '
+                             f'and the run is stopped {GRACE_PERIOD:g} s after it whatever the heuristic')
+    parser.add_argument('--seed', type=int, help='seed of the heuristic')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='number of processes (default the number of CPUs)')
+    parser.add_argument('--output', default='output',
+                        help='folder of the solutions and of the summary (default output)')
+    parser.add_argument('--compress', action='store_true', help='writes the solutions with gzip')
+    parser.add_argument('--verbose', action='store_true', help='logs the gaps to the lower bounds')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    try:
+        params = json.loads(args.params)
+    except ValueError as error:
+        parser.error(f"--params is not valid JSON: {error}")
+    if not isinstance(params, dict):
+        parser.error("--params should be a JSON object")
+    if args.time_limit is not None and args.time_limit < 0:
+        parser.error("--time-limit should be positive")
+    if args.seed is not None:
+        params['seed'] = args.seed
+
+    folders = find_instances(args.instances)
+    if not folders:
+        parser.error(f"no instance folder found in {' '.join(args.instances)}")
+
+    def report(summary):
+        status = summary['error'] or f"objective {summary['objective']} in {summary['runtime']:.2f}s"
+        print(f"{summary['instance']}: {status}", file=sys.stderr)
+
+    try:
+        results = run_batch(folders, args.heuristic, params, args.workers, args.output, args.compress, report,
+                            args.time_limit)
+    except ValueError as error:
+        parser.error(str(error))
+    print(f"{len(results)} instances solved, {sum(1 for result in results if result['error'])} errors, "
+          f"summary in {os.path.join(args.output, 'summary.csv')}", file=sys.stderr)
+    return 1 if any(result['error'] for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+'''
+Solves a batch of instances with a heuristic, in a pool of worker processes,
+and writes the solutions and a summary of the runs.
+Command line: see __main__.
+
+@author: Vassilissa Lehoux
+'''
+import csv
+import glob
+import json
+import multiprocessing
+import os
+import signal
+import time
+import traceback
+from multiprocessing.connection import wait
+from typing import Callable, Dict, List
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy, NonDeterminist
+from src.scheduling.optim.genetic import GeneticAlgorithm
+from src.scheduling.optim.local_search import BestNeighborLocalSearch, FirstNeighborLocalSearch, \
+    IteratedLocalSearch, SimulatedAnnealing, TabuSearch
+from src.scheduling.optim.multi_start import MultiStart
+
+
+# Heuristics available by name, the class names are accepted too
+HEURISTICS = {
+    'greedy': Greedy,
+    'nondeterminist': NonDeterminist,
+    'first_neighbor': FirstNeighborLocalSearch,
+    'best_neighbor': BestNeighborLocalSearch,
+    'tabu': TabuSearch,
+    'annealing': SimulatedAnnealing,
+    'ils': IteratedLocalSearch,
+    'genetic': GeneticAlgorithm,
+    'multi_start': MultiStart,
+}
+
+SUMMARY_COLUMNS = ['instance', 'heuristic', 'nb_operations', 'objective', 'feasible', 'gap',
+                   'read_time', 'runtime', 'output', 'error']
+
+# Seconds given to a run after its time limit to return and write its solution,
+# before its process is stopped
+GRACE_PERIOD = 1.
+
+
+def heuristic_class(name: str):
+    '''
+    Returns the class of the heuristic of given name (see HEURISTICS), or class name.
+    '''
+    if name.lower() in HEURISTICS:
+        return HEURISTICS[name.lower()]
+    for heuristic in HEURISTICS.values():
+        if heuristic.__name__.lower() == name.lower():
+            return heuristic
+    raise ValueError(f"Unknown heuristic {name}, choose among {', '.join(HEURISTICS)}")
+
+
+def _is_instance_folder(path: str) -> bool:
+    name = os.path.basename(os.path.normpath(path))
+    return os.path.isfile(os.path.join(path, name + '_op.csv'))
+
+
+def find_instances(paths: List[str]) -> List[str]:
+    '''
+    Returns the instance folders (see Instance.from_file) given by the paths:
+    an instance folder, a directory of instance folders or a glob pattern
+    matching some of them. Sorted, without duplicates (a folder given by
+    several paths is kept once).
+    '''
+    folders = {}
+    for path in paths:
+        for match in sorted(glob.glob(path)) or [path]:
+            if _is_instance_folder(match):
+                matches = [match]
+            elif os.path.isdir(match):
+                matches = [os.path.join(match, child) for child in sorted(os.listdir(match))
+                           if _is_instance_folder(os.path.join(match, child))]
+            else:
+                matches = []
+            for folder in matches:
+                folders.setdefault(os.path.realpath(folder), os.path.normpath(folder))
+    return sorted(folders.values())
+
+
+def output_names(folders: List[str]) -> List[str]:
+    '''
+    Returns the names of the output folders of the instances, in the order of the folders:
+    the name of the instance folder, or, for the instances of the same name, their
+    path relative to the common parent of their folders (a/jsp10 and b/jsp10),
+    followed by their position among them if the paths are the same.
+    '''
+    paths = [os.path.abspath(folder) for folder in folders]
+    names = [os.path.basename(path) for path in paths]
+    positions = {}
+    for i, name in enumerate(names):
+        positions.setdefault(name, []).append(i)
+    for same_name in positions.values():
+        if len(same_name) == 1:
+            continue
+        parent = os.path.commonpath([os.path.dirname(paths[i]) for i in same_name])
+        relative_names = [os.path.relpath(paths[i], parent) for i in same_name]
+        for k, (i, relative_name) in enumerate(zip(same_name, relative_names)):
+            # Même dossier donné deux fois
+            names[i] = relative_name if relative_names.count(relative_name) == 1 else f"{relative_name}_{k}"
+    return names
+
+
+def _new_summary(name: str, heuristic: str) -> Dict:
+    summary = dict.fromkeys(SUMMARY_COLUMNS)
+    summary.update(instance=name, heuristic=heuristic, feasible=False)
+    return summary
+
+
+def solve_instance(folderpath: str, heuristic: str, params: Dict, output_folder: str,
+                   compress: bool = False, name: str = None, time_limit: float = None) -> Dict:
+    '''
+    Reads the instance, runs the heuristic and writes the solution with Solution.to_csv
+    in output_folder/<name>/.
+    Returns the summary of the run (see SUMMARY_COLUMNS). The errors are reported
+    in the summary instead of being raised, so that the other instances are solved.
+    @param name: name of the instance in the summary and of its output folder,
+      by default the name of the instance folder (see output_names)
+    @param time_limit: time limit in seconds, reading included: the time left after
+      reading is given to the heuristic as its 'time_limit' parameter
+    '''
+    if name is None:
+        name = os.path.basename(os.path.normpath(folderpath))
+    summary = _new_summary(name, heuristic)
+    try:
+        start = time.perf_counter()
+        instance = Instance.from_file(folderpath)
+        summary['read_time'] = time.perf_counter() - start
+        summary['nb_operations'] = instance.nb_operations
+        params = dict(params)
+        if time_limit is not None:
+            params['time_limit'] = max(0., time_limit - summary['read_time'])
+
+        solver = heuristic_class(heuristic)()
+        start = time.perf_counter()
+        solution = solver.run(instance, params)
+        summary['runtime'] = time.perf_counter() - start
+        summary['feasible'] = solution.is_feasible
+        summary['objective'] = solution.objective if solution.is_feasible else None
+        summary['gap'] = getattr(solver, 'gap', None)
+
+        output = os.path.join(output_folder, name)
+        solution.to_csv(output, compress=compress)
+        summary['output'] = output
+    except Exception as error:
+        summary['error'] = ''.join(traceback.format_exception_only(type(error), error)).strip()
+    return summary
+
+
+def _solve_and_send(connection, task: Dict):
+    '''
+    Solves an instance in a worker process (see solve_instance) and sends back its summary.
+    The process leads its own process group, so that it is stopped with the processes
+    the heuristic starts (see _stop).
+    '''
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    connection.send(solve_instance(**task))
+    connection.close()
+
+
+def _stop(process):
+    '''
+    Stops a worker process of _solve_and_send and the processes it started, and waits for it.
+    '''
+    if hasattr(os, 'killpg'):
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            # Groupe pas encore créé ou déjà terminé
+            process.kill()
+    else:
+        process.terminate()
+    process.join()
+
+
+def _solve_in_processes(tasks: List, workers: int, max_seconds: float = None):
+    '''
+    Yields the (position, summary) of the tasks, the keyword arguments of solve_instance,
+    as they finish. Each task is solved in its own process, at most workers at a time.
+    A process still running after max_seconds, if not None, is stopped and its
+    instance is reported as an error, so that a slow instance does not hold up the batch.
+    The processes are not daemonic, so that the heuristics can use their own pools
+    (MultiStart workers): the processes still running at the end are stopped by _stop.
+    '''
+    pending = list(enumerate(tasks))[::-1]
+    # Connexion de réception -> (position, processus, échéance, début)
+    running = {}
+    try:
+        while pending or running:
+            while pending and len(running) < workers:
+                position, task = pending.pop()
+                receiver, sender = multiprocessing.Pipe(duplex=False)
+                process = multiprocessing.Process(target=_solve_and_send, args=(sender, task))
+                process.start()
+                sender.close()
+                start = time.perf_counter()
+                deadline = start + max_seconds if max_seconds is not None else None
+                running[receiver] = (position, process, deadline, start)
+
+            deadlines = [deadline for _, _, deadline, _ in running.values() if deadline is not None]
+            timeout = max(0., min(deadlines) - time.perf_counter()) if deadlines else None
+            for receiver in wait(list(running), timeout):
+                position, process, _, start = running.pop(receiver)
+                try:
+                    summary = receiver.recv()
+                except EOFError:
+                    summary = _new_summary(tasks[position]['name'], tasks[position]['heuristic'])
+                    summary['error'] = f"Worker process exited with code {process.exitcode}"
+                receiver.close()
+                process.join()
+                yield position, summary
+
+            now = time.perf_counter()
+            for receiver, (position, process, deadline, start) in list(running.items()):
+                if deadline is not None and now >= deadline:
+                    _stop(process)
+                    receiver.close()
+                    del running[receiver]
+                    summary = _new_summary(tasks[position]['name'], tasks[position]['heuristic'])
+                    summary['runtime'] = now - start
+                    summary['error'] = f"Stopped after {max_seconds:g} s"
+                    yield position, summary
+    finally:
+        for receiver, (_, process, _, _) in running.items():
+            _stop(process)
+            receiver.close()
+
+
+def run_batch(folders: List[str], heuristic: str, params: Dict=dict(), workers: int = 1,
+              output_folder: str = 'output', compress: bool = False,
+              callback: Callable = None, time_limit: float = None,
+              grace_period: float = GRACE_PERIOD) -> List[Dict]:
+    '''
+    Solves the instances of the folders (see solve_instance) with a pool of processes
+    and writes the summaries of the runs in output_folder/summary.csv and summary.json.
+    The instances of the same name get distinct output folders (see output_names).
+    Returns the summaries, in the order of the folders.
+
+    @param params: the parameters of the heuristic
+    @param workers: number of processes, 1 to solve the instances in the current process
+      if there is no time limit
+    @param callback: function called with the summary of each instance as it is solved
+    @param time_limit: time limit in seconds of each instance, None for no limit.
+      The heuristics accepting a 'time_limit' parameter get the time left after reading
+      the instance. The process of an instance is stopped grace_period seconds after the
+      time limit if it has not finished, whatever the heuristic: the instance is then
+      reported as an error, without solution.
+    '''
+    heuristic_class(heuristic)
+    os.makedirs(output_folder, exist_ok=True)
+    names = output_names(folders)
+    tasks = [dict(folderpath=folder, heuristic=heuristic, params=params, output_folder=output_folder,
+                  compress=compress, name=name, time_limit=time_limit)
+             for folder, name in zip(folders, names)]
+    results = [None] * len(folders)
+    if time_limit is None and (workers <= 1 or len(folders) <= 1):
+        for i, task in enumerate(tasks):
+            results[i] = solve_instance(**task)
+            if callback is not None:
+                callback(results[i])
+    else:
+        max_seconds = time_limit + grace_period if time_limit is not None else None
+        for i, summary in _solve_in_processes(tasks, max(1, workers), max_seconds):
+            results[i] = summary
+            if callback is not None:
+                callback(summary)
+
+    with open(os.path.join(output_folder, 'summary.csv'), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(results)
+    with open(os.path.join(output_folder, 'summary.json'), 'w') as f:
+        json.dump(results, f, indent=2)
+    return results
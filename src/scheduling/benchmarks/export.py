@@ -0,0 +1,53 @@
+'''
+Time to write and read back the solution of a generated instance,
+in csv, gzip compressed csv and binary formats.
+
+Usage: python -m src.scheduling.benchmarks.export [nb_jobs] [nb_operations_per_job] [nb_machines]
+'''
+import os
+import sys
+import tempfile
+import time
+
+from src.scheduling.benchmarks.generator import generate
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.solution import Solution
+
+
+def measure(nb_jobs: int = 100000, nb_operations_per_job: int = 10, nb_machines: int = 5):
+    '''
+    Returns the (format, write seconds, read seconds, file bytes) of the solution
+    found by Greedy, for the csv, gzip and binary formats.
+    '''
+    instance = generate(nb_jobs, nb_operations_per_job, nb_machines, {'density': 0.4})
+    solution = Greedy().run(instance)
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        for name, write, read, files in (
+                ('csv', lambda sol: sol.to_csv(folder),
+                 lambda sol: sol.from_csv(folder, 'operations.csv', 'machines.csv'),
+                 ['operations.csv', 'machines.csv']),
+                ('gzip', lambda sol: sol.to_csv(folder, compress=True),
+                 lambda sol: sol.from_csv(folder, 'operations.csv.gz', 'machines.csv.gz'),
+                 ['operations.csv.gz', 'machines.csv.gz']),
+                ('binary', lambda sol: sol.to_binary(os.path.join(folder, 'solution.npy')),
+                 lambda sol: sol.from_binary(os.path.join(folder, 'solution.npy')),
+                 ['solution.npy'])):
+            start = time.perf_counter()
+            write(solution)
+            write_seconds = time.perf_counter() - start
+            # Les solutions partagent les objets de l'instance : la solution relue
+            # remplace la précédente, et est écrite au format suivant
+            read_solution = Solution(instance)
+            start = time.perf_counter()
+            read(read_solution)
+            read_seconds = time.perf_counter() - start
+            size = sum(os.path.getsize(os.path.join(folder, file)) for file in files)
+            results.append((name, write_seconds, read_seconds, size))
+    return results
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:4]]
+    for name, write_seconds, read_seconds, size in measure(*sizes):
+        print(f"{name}: write {write_seconds:.2f}s, read {read_seconds:.2f}s, {size / 1e6:.1f} MB")
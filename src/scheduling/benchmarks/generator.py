@@ -0,0 +1,105 @@
+'''
+Seeded generator of random instances, written as the <name>_op.csv
+and <name>_mach.csv files read by Instance.from_file.
+
+Usage: python -m src.scheduling.benchmarks.generator folder nb_jobs nb_operations_per_job nb_machines [seed]
+'''
+import csv
+import os
+import sys
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.scheduling.instance.instance import Instance
+
+
+OPERATION_HEADER = ['job', 'operation', 'machine', 'processing_time', 'energy_consumption']
+MACHINE_HEADER = ['machine_id', 'set_up_time', 'set_up_energy', 'tear_down_time',
+                  'tear_down_energy', 'min_consumption', 'end_time']
+
+
+def generate_rows(nb_jobs: int, nb_operations_per_job: int, nb_machines: int,
+                  params: Dict=dict()) -> Tuple[List[List[int]], List[List[int]]]:
+    '''
+    Returns the operation and machine rows, as read in the csv files,
+    of a random instance.
+
+    @param params: the parameters of the instance:
+      'seed' (default 0),
+      'density' (default 1.0): probability that a machine can process an operation,
+        each operation can be processed by at least one machine,
+      'processing_times' (default (1, 20)) and 'energies' (default (1, 20)): ranges
+        of the operations on each machine,
+      'set_up_times', 'set_up_energies', 'tear_down_times', 'tear_down_energies'
+        (default (1, 10)) and 'min_consumptions' (default (1, 3)): ranges of the machines,
+      'horizon' (default 1.5): end time of the machines, relative to the mean load
+        of a machine if the operations were spread evenly
+    The ranges are (min, max), bounds included.
+    '''
+    rng = np.random.default_rng(params.get('seed', 0))
+    density = params.get('density', 1.0)
+    nb_operations = nb_jobs * nb_operations_per_job
+
+    def draw(name, default, size):
+        low, high = params.get(name, default)
+        return rng.integers(low, high + 1, size=size)
+
+    eligible = rng.random((nb_operations, nb_machines)) < density
+    # Au moins une machine par opération
+    eligible[np.arange(nb_operations), rng.integers(nb_machines, size=nb_operations)] = True
+    processing_times = draw('processing_times', (1, 20), (nb_operations, nb_machines))
+    energies = draw('energies', (1, 20), (nb_operations, nb_machines))
+    positions, machine_ids = np.nonzero(eligible)
+    operation_rows = np.column_stack((positions // nb_operations_per_job,
+                                      positions,
+                                      machine_ids,
+                                      processing_times[positions, machine_ids],
+                                      energies[positions, machine_ids])).tolist()
+
+    set_up_times = draw('set_up_times', (1, 10), nb_machines)
+    mean_durations = np.where(eligible, processing_times, 0).sum(axis=1) / eligible.sum(axis=1)
+    end_time = int(params.get('horizon', 1.5) * mean_durations.sum() / nb_machines) + int(set_up_times.max())
+    machine_rows = np.column_stack((np.arange(nb_machines),
+                                    set_up_times,
+                                    draw('set_up_energies', (1, 10), nb_machines),
+                                    draw('tear_down_times', (1, 10), nb_machines),
+                                    draw('tear_down_energies', (1, 10), nb_machines),
+                                    draw('min_consumptions', (1, 3), nb_machines),
+                                    np.full(nb_machines, end_time))).tolist()
+    return operation_rows, machine_rows
+
+
+def write_instance(folder: str, name: str, nb_jobs: int, nb_operations_per_job: int,
+                   nb_machines: int, params: Dict=dict()) -> str:
+    '''
+    Writes a random instance (see generate_rows) in folder/name/
+    and returns the path of its folder, to give to Instance.from_file.
+    '''
+    operation_rows, machine_rows = generate_rows(nb_jobs, nb_operations_per_job, nb_machines, params)
+    folderpath = folder + os.path.sep + name
+    os.makedirs(folderpath, exist_ok=True)
+    for suffix, header, rows in (('_op.csv', OPERATION_HEADER, operation_rows),
+                                 ('_mach.csv', MACHINE_HEADER, machine_rows)):
+        with open(folderpath + os.path.sep + name + suffix, 'w', newline='') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(header)
+            csv_writer.writerows(rows)
+    return folderpath
+
+
+def generate(nb_jobs: int, nb_operations_per_job: int, nb_machines: int,
+             params: Dict=dict(), name: str='generated') -> Instance:
+    '''
+    Returns a random instance (see generate_rows) without writing it.
+    '''
+    operation_rows, machine_rows = generate_rows(nb_jobs, nb_operations_per_job, nb_machines, params)
+    return Instance._from_rows(name, operation_rows, machine_rows)
+
+
+if __name__ == "__main__":
+    folder = sys.argv[1]
+    sizes = [int(arg) for arg in sys.argv[2:5]]
+    seed = int(sys.argv[5]) if len(sys.argv) > 5 else 0
+    name = 'gen_{}x{}x{}_{}'.format(*sizes, seed)
+    print(write_instance(folder, name, *sizes, params={'seed': seed}))
@@ -0,0 +1,47 @@
+'''
+Memory used per operation by an instance and its scheduled solution.
+
+Usage: python -m src.scheduling.benchmarks.memory [nb_jobs] [nb_operations_per_job] [nb_machines]
+'''
+import gc
+import sys
+import tracemalloc
+
+from src.scheduling.benchmarks.generator import generate_rows
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy
+
+
+def random_rows(nb_jobs: int, nb_operations_per_job: int, nb_machines: int, seed: int = 0):
+    '''
+    Returns operation and machine rows, as read in the csv files,
+    of a random instance where every machine can process every operation.
+    '''
+    return generate_rows(nb_jobs, nb_operations_per_job, nb_machines, {'seed': seed})
+
+
+def measure(nb_jobs: int = 500, nb_operations_per_job: int = 20, nb_machines: int = 5):
+    '''
+    Returns the bytes allocated per operation to build the instance,
+    and then to schedule all its operations.
+    '''
+    operation_rows, machine_rows = random_rows(nb_jobs, nb_operations_per_job, nb_machines)
+    nb_operations = nb_jobs * nb_operations_per_job
+    gc.collect()
+    tracemalloc.start()
+    inst = Instance._from_rows('memory', operation_rows, machine_rows)
+    instance_bytes = tracemalloc.get_traced_memory()[0]
+    # The arrays used by Greedy are not part of the scheduled objects
+    inst.as_arrays()
+    before_schedule_bytes = tracemalloc.get_traced_memory()[0]
+    solution = Greedy().run(inst)
+    solution_bytes = tracemalloc.get_traced_memory()[0] - before_schedule_bytes
+    tracemalloc.stop()
+    return instance_bytes / nb_operations, solution_bytes / nb_operations
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:4]]
+    instance_bytes, solution_bytes = measure(*sizes)
+    print(f"instance: {instance_bytes:.0f} bytes/operation")
+    print(f"schedule: {solution_bytes:.0f} bytes/operation")
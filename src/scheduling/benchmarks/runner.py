@@ -0,0 +1,211 @@
+'''
+Times the import of the solvers, the reading of the instances, the constructive heuristics,
+a pass of each neighborhood and the local searches on generated
+instances of increasing sizes, and writes the results as JSON
+to compare the throughput and the scaling across versions.
+
+Usage: python -m src.scheduling.benchmarks.runner [--sizes 10 100 1000 10000 100000]
+         [--machines 10] [--density 0.5] [--seed 0] [--output results.json]
+'''
+import argparse
+import json
+import os
+import pkgutil
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from src.scheduling import optim
+from src.scheduling.benchmarks.generator import write_instance
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy, NonDeterminist
+from src.scheduling.optim.genetic import GeneticAlgorithm
+from src.scheduling.optim.local_search import BestNeighborLocalSearch, FirstNeighborLocalSearch, \
+    IteratedLocalSearch, SimulatedAnnealing, TabuSearch
+from src.scheduling.optim.neighborhoods import CriticalBlockNeighborhood, MachineSwitchNeighborhood, \
+    OperationOrderNeighborhood
+
+
+DEFAULT_SIZES = [10, 100, 1000, 10000, 100000]
+
+# Paramètres des recherches locales, bornés pour que les temps restent comparables
+LOCAL_SEARCHES = [
+    ('FirstNeighborLocalSearch', FirstNeighborLocalSearch, {}),
+    ('BestNeighborLocalSearch', BestNeighborLocalSearch, {}),
+    ('TabuSearch', TabuSearch, {'max_iterations': 20}),
+    ('SimulatedAnnealing', SimulatedAnnealing, {'max_iterations': 2000}),
+    ('IteratedLocalSearch', IteratedLocalSearch, {'max_iterations': 10}),
+    ('GeneticAlgorithm', GeneticAlgorithm, {'population_size': 50, 'generations': 20}),
+]
+
+
+# Modules of the solvers, that do not need to plot
+SOLVER_MODULES = ['src.scheduling.solution', 'src.scheduling.encoding', 'src.scheduling.bounds'] + \
+    ['src.scheduling.optim.' + module.name for module in pkgutil.iter_modules(optim.__path__)]
+
+# Racine du dépôt, d'où les modules src.scheduling sont importés
+_REPOSITORY_FOLDER = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+def import_modules(modules: List[str]=SOLVER_MODULES):
+    '''
+    Imports the modules in a new interpreter, as a worker process does.
+    Returns the import time in seconds and the names of all the modules then loaded.
+    '''
+    code = ("import importlib, json, sys, time\n"
+            "start = time.perf_counter()\n"
+            f"for module in {modules!r}:\n"
+            "    importlib.import_module(module)\n"
+            "print(json.dumps([time.perf_counter() - start, sorted(sys.modules)]))\n")
+    output = subprocess.run([sys.executable, '-c', code], cwd=_REPOSITORY_FOLDER, check=True,
+                            capture_output=True, text=True).stdout
+    seconds, loaded_modules = json.loads(output)
+    return seconds, loaded_modules
+
+
+def _timed(results: List[Dict], record: Dict, step: str, function: Callable):
+    '''
+    Calls the function, appends its runtime to the results and returns its result.
+    The objective of the returned solution is recorded if there is one.
+    '''
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    entry = dict(record, step=step, seconds=seconds,
+                 operations_per_second=record['nb_operations'] / seconds if seconds > 0 else None)
+    if hasattr(result, 'objective'):
+        entry['objective'] = result.objective
+    results.append(entry)
+    return result
+
+
+def benchmark_instance(folderpath: str, params: Dict=dict()) -> List[Dict]:
+    '''
+    Returns the timings of each step on the instance of the folder:
+    a list of dictionaries with the instance size, 'step', 'seconds',
+    'operations_per_second', 'objective' for the steps returning a solution,
+    and the numbers of moves for the neighborhoods.
+
+    @param params: 'seed' (default 0) of the heuristics,
+      'max_neighborhood_operations' (default 10000): the neighborhoods are only built
+        on instances with at most this number of operations (the operation order
+        neighborhood is quadratic),
+      'max_moves' (default 10000): number of moves of each neighborhood evaluated
+        to time a best move search, the first ones if the neighborhood is larger,
+      'max_search_operations' (default 1000): the local searches are only run
+        on instances with at most this number of operations,
+      'time_limit' (default 10): budget in seconds of the local searches accepting one
+    '''
+    seed = params.get('seed', 0)
+    results = []
+    instance = Instance.from_file(folderpath, use_cache=False)
+    record = {'instance': instance.name, 'nb_operations': instance.nb_operations,
+              'nb_jobs': instance.nb_jobs, 'nb_machines': instance.nb_machines}
+    _timed(results, record, 'read_csv', lambda: Instance.from_file(folderpath, use_cache=False))
+    # Le premier appel écrit le cache binaire
+    Instance.from_file(folderpath)
+    instance = _timed(results, record, 'read_cache', lambda: Instance.from_file(folderpath))
+    _timed(results, record, 'as_arrays', instance.as_arrays)
+    _timed(results, record, 'Greedy', lambda: Greedy().run(instance))
+    solution = _timed(results, record, 'NonDeterminist', lambda: NonDeterminist().run(instance, {'seed': seed}))
+
+    if instance.nb_operations > params.get('max_neighborhood_operations', 10000):
+        return results
+    for neighborhood_class in (MachineSwitchNeighborhood, OperationOrderNeighborhood, CriticalBlockNeighborhood):
+        neighborhood = neighborhood_class(instance)
+        moves = _timed(results, record, neighborhood_class.__name__ + '.moves',
+                       lambda: neighborhood.moves(solution))
+        results[-1]['nb_moves'] = len(moves)
+        evaluated_moves = moves[:params.get('max_moves', 10000)]
+        _timed(results, record, neighborhood_class.__name__ + '.best_move',
+               lambda: neighborhood._best_move(solution, evaluated_moves))
+        seconds = results[-1]['seconds']
+        results[-1]['evaluated_moves'] = len(evaluated_moves)
+        results[-1]['moves_per_second'] = len(evaluated_moves) / seconds if seconds > 0 else None
+
+    if instance.nb_operations > params.get('max_search_operations', 1000):
+        return results
+    for name, heuristic_class, heuristic_params in LOCAL_SEARCHES:
+        run_params = dict(heuristic_params, seed=seed, stop_at_bound=False,
+                          time_limit=params.get('time_limit', 10))
+        _timed(results, record, name, lambda: heuristic_class().run(instance, run_params))
+    return results
+
+
+def run_benchmarks(sizes: List[int]=DEFAULT_SIZES, params: Dict=dict()) -> Dict:
+    '''
+    Generates an instance of each size (number of operations) and benchmarks it
+    (see benchmark_instance). Returns the document written as JSON.
+
+    @param params: the parameters of benchmark_instance, and
+      'machines' (default 10), 'operations_per_job' (default 5),
+      'density' (default 0.5): see generator.generate_rows,
+      'folder' (default a temporary folder): where the instances are written
+    '''
+    nb_machines = params.get('machines', 10)
+    operations_per_job = params.get('operations_per_job', 5)
+    generator_params = {'seed': params.get('seed', 0), 'density': params.get('density', 0.5)}
+    results = []
+    with tempfile.TemporaryDirectory() as temporary_folder:
+        folder = params.get('folder', temporary_folder)
+        for size in sizes:
+            nb_jobs = max(1, size // operations_per_job)
+            name = f'gen_{nb_jobs}x{operations_per_job}x{nb_machines}'
+            folderpath = write_instance(folder, name, nb_jobs, operations_per_job, nb_machines,
+                                        generator_params)
+            results.extend(benchmark_instance(folderpath, params))
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'import_seconds': import_modules()[0],
+        'params': dict(params, sizes=sizes, machines=nb_machines,
+                       operations_per_job=operations_per_job, **generator_params),
+        'results': results,
+    }
+
+
+def main(argv: List[str]=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help='numbers of operations of the generated instances')
+    parser.add_argument('--machines', type=int, default=10)
+    parser.add_argument('--operations-per-job', type=int, default=5)
+    parser.add_argument('--density', type=float, default=0.5,
+                        help='probability that a machine can process an operation')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-neighborhood-operations', type=int, default=10000,
+                        help='largest instance on which the neighborhoods are built')
+    parser.add_argument('--max-moves', type=int, default=10000,
+                        help='number of moves evaluated to time each neighborhood')
+    parser.add_argument('--max-search-operations', type=int, default=1000,
+                        help='largest instance on which the local searches are run')
+    parser.add_argument('--time-limit', type=float, default=10,
+                        help='budget in seconds of the local searches accepting one')
+    parser.add_argument('--folder', help='keeps the generated instances in this folder')
+    parser.add_argument('--output', help='JSON file, default the standard output')
+    args = parser.parse_args(argv)
+
+    params = {'machines': args.machines, 'operations_per_job': args.operations_per_job,
+              'density': args.density, 'seed': args.seed,
+              'max_neighborhood_operations': args.max_neighborhood_operations, 'max_moves': args.max_moves,
+              'max_search_operations': args.max_search_operations, 'time_limit': args.time_limit}
+    if args.folder is not None:
+        params['folder'] = args.folder
+    document = run_benchmarks(args.sizes, params)
+    if args.output is None:
+        json.dump(document, sys.stdout, indent=2)
+        print()
+    else:
+        with open(args.output, 'w') as json_file:
+            json.dump(document, json_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+'''
+Lower bounds of the objective of the solutions of an instance
+(see Solution.objective), computed on the instance arrays.
+
+@author: Vassilissa Lehoux
+'''
+import logging
+
+import numpy as np
+
+from src.scheduling.instance.instance import Instance
+
+
+logger = logging.getLogger(__name__)
+
+
+class LowerBounds(object):
+    '''
+    Lower bounds of each term of the objective:
+    cmax: the longest job, each operation on its fastest machine, the first one
+      after the set up of its machine, and the load of the machines if the
+      operations were spread evenly,
+    energy: each operation on its least consuming machine, plus the start
+      and stop of the cheapest machine,
+    mean_processing_time: each operation on its fastest machine.
+    '''
+
+    def __init__(self, instance: Instance):
+        '''
+        Constructor
+        '''
+        arrays = instance.as_arrays()
+        max_int = np.iinfo(np.int64).max
+        self.cmax = 0
+        self.energy = 0
+        self.mean_processing_time = 0
+        if arrays.nb_operations == 0:
+            return
+        min_durations = arrays.masked(arrays.processing_times, max_int).min(axis=1)
+        min_energies = arrays.masked(arrays.energies, max_int).min(axis=1)
+        # Durée de la première opération de chaque job, réglage de la machine compris
+        first_durations = arrays.masked(arrays.processing_times + arrays.set_up_times, max_int).min(axis=1)
+        first = arrays.predecessors < 0
+        durations = np.where(first, first_durations, min_durations)
+        job_lengths = np.bincount(arrays.job_ids, weights=durations, minlength=arrays.nb_jobs)
+        total_duration = int(min_durations.sum())
+        machine_load = -(-total_duration // arrays.nb_machines) + int(arrays.set_up_times.min())
+
+        self.cmax = max(int(job_lengths.max()), machine_load)
+        self.energy = int(min_energies.sum()) + int((arrays.set_up_energies + arrays.tear_down_energies).min())
+        self.mean_processing_time = total_duration // arrays.nb_jobs if arrays.nb_jobs > 0 else 0
+
+    @property
+    def objective(self) -> int:
+        '''
+        Lower bound of Solution.objective
+        '''
+        return self.energy + self.cmax + self.mean_processing_time
+
+
+def gap(value: int, bound: int) -> float:
+    '''
+    Returns the optimality gap of a value, relative to the value:
+    0 if the value reaches the bound.
+    '''
+    if value <= bound:
+        return 0.
+    return (value - bound) / abs(value) if value != 0 else float('inf')
+
+
+def report_gap(name: str, value: int, bound: int) -> float:
+    '''
+    Logs the gap between the value found by a heuristic and the bound,
+    and returns it.
+    '''
+    value_gap = gap(value, bound)
+    logger.info("%s: value %d, lower bound %d, gap %.2f%%", name, value, bound, 100 * value_gap)
+    return value_gap
@@ -0,0 +1,257 @@
+'''
+Lightweight encoding of a solution as integer arrays, independent of the
+Operation and Machine objects of the instance, and the decoder computing
+the schedule it represents.
+
+Operations and machines are numbered by their position in
+Instance.operations and Instance.machines (see InstanceArrays).
+'''
+import bisect
+import sys
+
+import numpy as np
+
+from src.scheduling.instance.arrays import INELIGIBLE, InstanceArrays
+from src.scheduling.instance.instance import Instance
+from src.scheduling.instance.machine import plan_periods
+from src.scheduling.solution import Solution
+
+
+class Encoding(object):
+    '''
+    A solution encoded as two arrays:
+    sequence: the operations in the order in which they are scheduled,
+      each operation after its job predecessor.
+    assignment: for each operation, the machine processing it.
+    Decoding schedules the operations in sequence as Solution.schedule does.
+    '''
+    __slots__ = ('sequence', 'assignment')
+
+    def __init__(self, sequence, assignment):
+        '''
+        Constructor
+        '''
+        self.sequence = np.asarray(sequence, dtype=np.int64)
+        self.assignment = np.asarray(assignment, dtype=np.int64)
+
+    def copy(self) -> 'Encoding':
+        '''
+        Returns an independent copy of the encoding.
+        '''
+        return Encoding(self.sequence.copy(), self.assignment.copy())
+
+    @classmethod
+    def from_solution(cls, solution: Solution) -> 'Encoding':
+        '''
+        Encodes a solution in which all the operations are scheduled.
+        The operations are sequenced by increasing start time.
+        '''
+        instance = solution.inst
+        operations = instance.operations
+        machine_positions = {machine.machine_id: k for k, machine in enumerate(instance.machines)}
+        assignment = [machine_positions[op.assigned_to] for op in operations]
+        sequence = sorted(range(len(operations)), key=lambda i: (operations[i].start_time, i))
+        return cls(sequence, assignment)
+
+    @classmethod
+    def random(cls, arrays: InstanceArrays, rng: np.random.Generator) -> 'Encoding':
+        '''
+        Returns a random encoding: the jobs are interleaved at random
+        and each operation gets a random machine among those able to process it.
+        '''
+        job_sequence = np.repeat(np.arange(arrays.nb_jobs), np.bincount(arrays.job_ids, minlength=arrays.nb_jobs))
+        rng.shuffle(job_sequence)
+        # Random eligible machine: largest random key among the eligible machines
+        keys = np.where(arrays.eligible, rng.random(arrays.eligible.shape), -1.0)
+        return cls(sequence_from_jobs(arrays, job_sequence), np.argmax(keys, axis=1))
+
+    def to_solution(self, instance: Instance, plan_shutdowns: bool = False) -> Solution:
+        '''
+        Builds the Solution encoded, scheduling its operations on the instance.
+        @param plan_shutdowns: if True, the solution plans its machine shutdowns
+          (see Solution.plan_shutdowns)
+        '''
+        solution = Solution(instance)
+        solution.shutdown_planning = plan_shutdowns
+        operations = instance.operations
+        machines = instance.machines
+        assignment = self.assignment.tolist()
+        for position in self.sequence.tolist():
+            solution.schedule(operations[position], machines[assignment[position]])
+        return solution
+
+
+def sequence_from_jobs(arrays: InstanceArrays, job_sequence) -> np.ndarray:
+    '''
+    Converts a sequence of jobs, in which each job appears once per operation,
+    into a sequence of operations: the k-th occurrence of a job is its k-th operation.
+    '''
+    job_operations = arrays.tolist('job_operations')
+    next_operation = [0] * arrays.nb_jobs
+    sequence = []
+    for job_id in np.asarray(job_sequence).tolist():
+        sequence.append(job_operations[job_id][next_operation[job_id]])
+        next_operation[job_id] += 1
+    return np.array(sequence, dtype=np.int64)
+
+
+class DecodedSchedule(object):
+    '''
+    Schedule computed from an encoding.
+    '''
+    __slots__ = ('feasible', 'operation_start_times', 'operation_end_times', 'machine_start_times',
+                 'machine_stop_times', 'total_energy_consumption', 'cmax', 'mean_processing_time')
+
+    @property
+    def objective(self) -> int:
+        '''
+        Same objective as Solution.objective
+        '''
+        return self.total_energy_consumption + self.cmax + self.mean_processing_time
+
+    @property
+    def evaluate(self) -> int:
+        '''
+        Same value as Solution.evaluate: the objective, or sys.maxsize
+        if some operations are not scheduled
+        '''
+        return self.objective if self.feasible else sys.maxsize
+
+
+def decode(arrays: InstanceArrays, encoding: Encoding, plan_shutdowns: bool = False) -> DecodedSchedule:
+    '''
+    Computes the start times, the machine on/off periods and the objective
+    of the encoded solution in one pass over the sequence.
+    Gives the same schedule and objective as Encoding.to_solution.
+    '''
+    durations = arrays.tolist('processing_times')
+    energies = arrays.tolist('energies')
+    predecessors = arrays.tolist('predecessors')
+    set_up_times = arrays.tolist('set_up_times')
+    end_times = arrays.tolist('end_times')
+    assignment = encoding.assignment.tolist()
+    sequence = encoding.sequence.tolist()
+    nb_machines = arrays.nb_machines
+
+    operation_start_times = [-1] * arrays.nb_operations
+    operation_end_times = [-1] * arrays.nb_operations
+    available_times = [0] * nb_machines
+    machine_start_times = [[] for _ in range(nb_machines)]
+    begin_times = [[] for _ in range(nb_machines)]
+    machine_end_times = [[] for _ in range(nb_machines)]
+    operations_energy = [0] * nb_machines
+    processing_times = [0] * nb_machines
+    feasible = len(sequence) == arrays.nb_operations
+
+    for operation in sequence:
+        machine = assignment[operation]
+        duration = durations[operation][machine]
+        predecessor = predecessors[operation]
+        min_start_time = operation_end_times[predecessor] if predecessor >= 0 else 0
+        if duration == INELIGIBLE or min_start_time < 0 or operation_end_times[operation] >= 0:
+            feasible = False
+            break
+        # Same rules as Solution.schedule and Machine.is_on: the periods stop at the
+        # end time of the machine, except the last one which runs overtime
+        start_time = max(available_times[machine], min_start_time)
+        starts = machine_start_times[machine]
+        period = bisect.bisect_right(starts, start_time) - 1
+        if period < 0 or (start_time >= end_times[machine] and period < len(starts) - 1):
+            start_up_time = max(0, min_start_time - set_up_times[machine])
+            bisect.insort(starts, start_up_time)
+            start_time = max(available_times[machine], start_up_time + set_up_times[machine])
+        end_time = start_time + duration
+        operation_start_times[operation] = start_time
+        operation_end_times[operation] = end_time
+        available_times[machine] = end_time
+        begin_times[machine].append(start_time)
+        machine_end_times[machine].append(end_time)
+        operations_energy[machine] += energies[operation][machine]
+        processing_times[machine] += duration
+
+    set_up_energies = arrays.tolist('set_up_energies')
+    tear_down_times = arrays.tolist('tear_down_times')
+    tear_down_energies = arrays.tolist('tear_down_energies')
+    min_consumptions = arrays.tolist('min_consumptions')
+    machine_stop_times = []
+    total_energy = 0
+    for machine in range(nb_machines):
+        if plan_shutdowns:
+            periods = plan_periods(begin_times[machine], machine_end_times[machine], set_up_times[machine],
+                                   set_up_energies[machine], tear_down_times[machine],
+                                   tear_down_energies[machine], min_consumptions[machine])
+            machine_start_times[machine] = [start for start, _ in periods]
+            machine_stop_times.append([stop for _, stop in periods])
+        else:
+            machine_stop_times.append([end_times[machine]] if machine_start_times[machine] else [])
+        starts = machine_start_times[machine]
+        stops = machine_stop_times[machine]
+        working_time = sum((stops[i] if i < len(stops) else end_times[machine]) - starts[i]
+                           for i in range(len(starts)))
+        if starts and machine_end_times[machine]:
+            # Overtime of the last period
+            last_stop = stops[len(starts) - 1] if len(starts) <= len(stops) else end_times[machine]
+            working_time += max(0, machine_end_times[machine][-1] - last_stop)
+        total_energy += (operations_energy[machine] + len(starts) * set_up_energies[machine]
+                         + len(stops) * tear_down_energies[machine]
+                         + min_consumptions[machine] * (working_time - processing_times[machine]))
+
+    decoded = DecodedSchedule()
+    decoded.feasible = feasible
+    decoded.operation_start_times = operation_start_times
+    decoded.operation_end_times = operation_end_times
+    decoded.machine_start_times = machine_start_times
+    decoded.machine_stop_times = machine_stop_times
+    decoded.total_energy_consumption = total_energy
+    decoded.cmax = max(operation_end_times, default=0) if any(begin_times) else 0
+    decoded.mean_processing_time = sum(processing_times) // arrays.nb_jobs if arrays.nb_jobs > 0 else 0
+    return decoded
+
+
+def decode_population(arrays: InstanceArrays, job_sequences: np.ndarray, assignments: np.ndarray) -> np.ndarray:
+    '''
+    Computes the objective of a whole population of solutions at once,
+    without shutdown planning: the same values as decode, one NumPy step per
+    position in the sequences, over all the individuals.
+    @param job_sequences: (individuals x operations) sequences of jobs,
+      see sequence_from_jobs
+    @param assignments: (individuals x operations) machine of each operation,
+      which must be able to process it
+    '''
+    nb_individuals = job_sequences.shape[0]
+    rows = np.arange(nb_individuals)
+    set_up_times = arrays.set_up_times
+    available_times = np.zeros((nb_individuals, arrays.nb_machines), dtype=np.int64)
+    machine_start_times = np.full((nb_individuals, arrays.nb_machines), -1, dtype=np.int64)
+    operation_end_times = np.zeros((nb_individuals, arrays.nb_operations), dtype=np.int64)
+    next_operation = np.zeros((nb_individuals, arrays.nb_jobs), dtype=np.int64)
+
+    for k in range(job_sequences.shape[1]):
+        jobs = job_sequences[:, k]
+        operations = arrays.job_operations[jobs, next_operation[rows, jobs]]
+        next_operation[rows, jobs] += 1
+        machines = assignments[rows, operations]
+        predecessors = arrays.predecessors[operations]
+        min_start_times = np.where(predecessors >= 0, operation_end_times[rows, predecessors], 0)
+        # Same rules as decode: each machine is started once, for its first
+        # operation, and then runs until its last operation
+        first = machine_start_times[rows, machines] < 0
+        set_up = set_up_times[machines]
+        start_times = np.where(first, np.maximum(set_up, min_start_times),
+                               np.maximum(available_times[rows, machines], min_start_times))
+        machine_start_times[rows[first], machines[first]] = np.maximum(0, min_start_times[first] - set_up[first])
+        end_times = start_times + arrays.processing_times[operations, machines]
+        operation_end_times[rows, operations] = end_times
+        available_times[rows, machines] = end_times
+
+    positions = np.arange(arrays.nb_operations)
+    durations = arrays.processing_times[positions, assignments]
+    started = machine_start_times >= 0
+    working_times = np.where(started, np.maximum(arrays.end_times, available_times) - machine_start_times, 0)
+    energies = (arrays.energies[positions, assignments].sum(axis=1)
+                + (started * (arrays.set_up_energies + arrays.tear_down_energies)).sum(axis=1)
+                + (working_times * arrays.min_consumptions).sum(axis=1)
+                - (durations * arrays.min_consumptions[assignments]).sum(axis=1))
+    cmax = operation_end_times.max(axis=1, initial=0)
+    mean_processing_time = durations.sum(axis=1) // arrays.nb_jobs if arrays.nb_jobs > 0 else 0
+    return energies + cmax + mean_processing_time
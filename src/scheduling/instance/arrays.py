@@ -0,0 +1,82 @@
+'''
+Columnar representation of an instance, for vectorized evaluations.
+Operations and machines are numbered by their position in
+Instance.operations and Instance.machines.
+'''
+import numpy as np
+
+
+# Value of the duration and energy of an operation on a machine that cannot process it
+INELIGIBLE = -1
+
+
+class InstanceArrays(object):
+    '''
+    Dense NumPy arrays describing an instance.
+    '''
+
+    def __init__(self, instance):
+        '''
+        Constructor
+        @param instance: the instance to describe
+        '''
+        operations = instance.operations
+        machines = instance.machines
+        self.nb_operations = len(operations)
+        self.nb_machines = len(machines)
+        self.nb_jobs = instance.nb_jobs
+
+        # Machines parameters, one value per machine
+        self.machine_ids = np.array([m.machine_id for m in machines], dtype=np.int64)
+        self.set_up_times = np.array([m.set_up_time for m in machines], dtype=np.int64)
+        self.set_up_energies = np.array([m.set_up_energy for m in machines], dtype=np.int64)
+        self.tear_down_times = np.array([m.tear_down_time for m in machines], dtype=np.int64)
+        self.tear_down_energies = np.array([m.tear_down_energy for m in machines], dtype=np.int64)
+        self.min_consumptions = np.array([m.min_consumption for m in machines], dtype=np.int64)
+        self.end_times = np.array([m.end_time for m in machines], dtype=np.int64)
+        machine_positions = {machine_id: k for k, machine_id in enumerate(self.machine_ids.tolist())}
+
+        # Operations, one line per operation and one column per machine
+        self._operation_positions = {(op.job_id, op.operation_id): i for i, op in enumerate(operations)}
+        self.job_ids = np.array([op.job_id for op in operations], dtype=np.int64)
+        self.operation_ids = np.array([op.operation_id for op in operations], dtype=np.int64)
+        self.predecessors = np.array([self.position(op.predecessors[-1]) if op.predecessors else -1
+                                      for op in operations], dtype=np.int64)
+        self.processing_times = np.full((self.nb_operations, self.nb_machines), INELIGIBLE, dtype=np.int64)
+        self.energies = np.full((self.nb_operations, self.nb_machines), INELIGIBLE, dtype=np.int64)
+        for i, op in enumerate(operations):
+            for machine_id, duration in op.processing_times.items():
+                self.processing_times[i, machine_positions[machine_id]] = duration
+            for machine_id, energy in op.energies.items():
+                self.energies[i, machine_positions[machine_id]] = energy
+        self.eligible = self.processing_times != INELIGIBLE
+
+        # Operations of each job in order, one line per job, padded with -1
+        job_sizes = np.bincount(self.job_ids, minlength=self.nb_jobs) if self.nb_operations else np.zeros(0, np.int64)
+        self.job_operations = np.full((self.nb_jobs, max(job_sizes, default=0)), -1, dtype=np.int64)
+        for job in instance.jobs:
+            for k, op in enumerate(job.operations):
+                self.job_operations[job.job_id, k] = self.position(op)
+        self._lists = {}
+
+    def position(self, operation) -> int:
+        '''
+        Returns the line of the operation in the operation arrays
+        '''
+        return self._operation_positions[(operation.job_id, operation.operation_id)]
+
+    def tolist(self, name: str) -> list:
+        '''
+        Returns the array attribute called name as (nested) Python lists,
+        computed once. Faster than the array for element by element accesses.
+        '''
+        if name not in self._lists:
+            self._lists[name] = getattr(self, name).tolist()
+        return self._lists[name]
+
+    def masked(self, values: np.ndarray, fill_value=np.iinfo(np.int64).max) -> np.ndarray:
+        '''
+        Returns a copy of an (operations x machines) array where the
+        ineligible machines are replaced by fill_value.
+        '''
+        return np.where(self.eligible, values, fill_value)
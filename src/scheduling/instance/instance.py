@@ -7,11 +7,22 @@ import csv
 import os
 from typing import List
 
+import numpy as np
+
+from src.scheduling.instance.arrays import InstanceArrays
 from src.scheduling.instance.job import Job
 from src.scheduling.instance.machine import Machine
 from src.scheduling.instance.operation import Operation
 
 
+# Suffix of the binary cache file written in the instance folder
+CACHE_SUFFIX = '.cache.npy'
+
+_BINARY_MAGIC = 0x4A5350  # "JSP"
+_BINARY_VERSION = 1
+_HEADER_SIZE = 6
+
+
 class Instance(object):
     '''
     classdocs
@@ -22,57 +33,159 @@ class Instance(object):
         self._jobs = []
         self._machines = []
         self._operations = []
+        # Indexes for constant time lookups
+        self._job_index = {}
+        self._machine_index = {}
+        self._operation_index = {}
+        self._operation_id_index = {}
+        self._arrays = None
 
     @classmethod
-    def from_file(cls, folderpath):
-        inst = cls(os.path.basename(folderpath))
+    def from_file(cls, folderpath, use_cache=True):
+        '''
+        Reads the instance from the folder <name>/ containing <name>_op.csv and <name>_mach.csv.
+        @param use_cache: if True, the instance is read from the binary file <name>.cache.npy
+          of the folder when it is up to date with the csv files. Otherwise the csv files
+          are parsed and the binary file is written for the next calls.
+        '''
+        name = os.path.basename(folderpath)
+        op_path = folderpath + os.path.sep + name + '_op.csv'
+        mach_path = folderpath + os.path.sep + name + '_mach.csv'
+        cache_path = folderpath + os.path.sep + name + CACHE_SUFFIX
+        if use_cache:
+            mtimes = (os.stat(op_path).st_mtime_ns, os.stat(mach_path).st_mtime_ns)
+            inst = cls._from_cache(name, cache_path, mtimes)
+            if inst is not None:
+                return inst
+
         # Reading the operation inf
-        seen_operations = set()
-        with open(folderpath + os.path.sep + inst._instance_name + '_op.csv', 'r') as csv_file:
+        with open(op_path, 'r') as csv_file:
             csv_reader = csv.reader(csv_file)
             header = next(csv_reader)
-            for row in csv_reader:
-                job_id = int(row[0])
-                operation_id = int(row[1])
-                key = (job_id, operation_id)
-                if key not in seen_operations:
-                    operation = Operation(job_id, operation_id)
-                    inst._operations.append(operation)
-                    operation.processing_times[int(row[2])] = int(row[3])
-                    operation.energies[int(row[2])] = int(row[4])
-                    seen_operations.add(key)
-                else:
-                    # If the operation already axists, add the processing time and energy for the machine
-                    operation = inst.get_operation(operation_id)
-                    operation.processing_times[int(row[2])] = int(row[3])
-                    operation.energies[int(row[2])] = int(row[4])
-
-
-
+            operation_rows = [[int(value) for value in row] for row in csv_reader if row]
 
         # reading machine info
-        with open(folderpath + os.path.sep + inst._instance_name + '_mach.csv', 'r') as csv_file:
+        with open(mach_path, 'r') as csv_file:
             csv_reader = csv.reader(csv_file)
             header = next(csv_reader)
-            for row in csv_reader:
-                machine_id = int(row[0])
-                set_up_time = int(row[1])
-                set_up_energy = int(row[2])
-                tear_down_time = int(row[3])
-                tear_down_energy = int(row[4])
-                min_consumption = int(row[5])
-                end_time = int(row[6])
-                machine = Machine(machine_id, set_up_time, set_up_energy, tear_down_time,
-                                  tear_down_energy, min_consumption, end_time)
-                inst._machines.append(machine)
+            machine_rows = [[int(value) for value in row] for row in csv_reader if row]
+
+        inst = cls._from_rows(name, operation_rows, machine_rows)
+        if use_cache:
+            try:
+                inst._write_binary(cache_path, mtimes)
+            except OSError:
+                # The cache is optional (read only folder for instance)
+                pass
+        return inst
+
+    @classmethod
+    def _from_rows(cls, name, operation_rows, machine_rows):
+        '''
+        Builds the instance from the rows of the csv files, as lists of int.
+        '''
+        inst = cls(name)
+        for job_id, operation_id, machine_id, processing_time, energy in operation_rows:
+            operation = inst._operation_index.get((job_id, operation_id))
+            if operation is None:
+                operation = Operation(job_id, operation_id)
+                inst._add_operation(operation)
+            # Add the processing time and energy for the machine
+            operation.processing_times[machine_id] = processing_time
+            operation.energies[machine_id] = energy
+
+        for (machine_id, set_up_time, set_up_energy, tear_down_time,
+             tear_down_energy, min_consumption, end_time) in machine_rows:
+            machine = Machine(machine_id, set_up_time, set_up_energy, tear_down_time,
+                              tear_down_energy, min_consumption, end_time)
+            inst._add_machine(machine)
 
         for operation in inst._operations:
             job_id = operation.job_id
             while len(inst._jobs) <= job_id:
-                inst._jobs.append(Job(job_id))
+                inst._add_job(Job(len(inst._jobs)))
             inst._jobs[job_id].add_operation(operation)
         return inst
 
+    def to_binary(self, filepath):
+        '''
+        Saves the instance in a binary file, read back with from_binary.
+        The file is a single .npy int64 array:
+          header [magic, version, op csv mtime, mach csv mtime, nb operation rows, nb machines]
+          then the operation rows (job, operation, machine, processing_time, energy_consumption)
+          then the machine rows (machine_id, set_up_time, ..., end_time), as in the csv files.
+        '''
+        self._write_binary(filepath, (0, 0))
+
+    @classmethod
+    def from_binary(cls, filepath, name=None):
+        '''
+        Reads an instance saved with to_binary. The file is memory mapped.
+        @param name: name of the instance, by default the name of the folder of the file
+        '''
+        if name is None:
+            name = os.path.basename(os.path.dirname(os.path.abspath(filepath)))
+        data = np.load(filepath, mmap_mode='r')
+        return cls._from_binary_data(name, data)
+
+    @classmethod
+    def _from_cache(cls, name, cache_path, mtimes):
+        '''
+        Returns the instance stored in the cache file if it matches the csv
+        modification times, None otherwise.
+        '''
+        try:
+            data = np.load(cache_path, mmap_mode='r')
+        except (OSError, ValueError):
+            return None
+        if len(data) < _HEADER_SIZE or tuple(data[2:4].tolist()) != mtimes:
+            return None
+        try:
+            return cls._from_binary_data(name, data)
+        except ValueError:
+            return None
+
+    @classmethod
+    def _from_binary_data(cls, name, data):
+        magic, version, _, _, nb_rows, nb_machines = data[:_HEADER_SIZE].tolist()
+        if magic != _BINARY_MAGIC or version != _BINARY_VERSION:
+            raise ValueError(f"Not an instance file of version {_BINARY_VERSION}")
+        operations_end = _HEADER_SIZE + 5 * nb_rows
+        operation_rows = data[_HEADER_SIZE:operations_end].reshape(nb_rows, 5).tolist()
+        machine_rows = data[operations_end:operations_end + 7 * nb_machines].reshape(nb_machines, 7).tolist()
+        return cls._from_rows(name, operation_rows, machine_rows)
+
+    def _write_binary(self, filepath, mtimes):
+        operation_rows = [(op.job_id, op.operation_id, machine_id, duration, op.energies[machine_id])
+                          for op in self._operations
+                          for machine_id, duration in op.processing_times.items()]
+        machine_rows = [(m.machine_id, m.set_up_time, m.set_up_energy, m.tear_down_time,
+                         m.tear_down_energy, m.min_consumption, m.end_time)
+                        for m in self._machines]
+        header = [_BINARY_MAGIC, _BINARY_VERSION, mtimes[0], mtimes[1], len(operation_rows), len(machine_rows)]
+        data = np.concatenate((np.array(header, dtype=np.int64),
+                               np.array(operation_rows, dtype=np.int64).reshape(-1),
+                               np.array(machine_rows, dtype=np.int64).reshape(-1)))
+        # Written next to the final file then renamed, so that concurrent readers
+        # never see a partial file
+        tmp_path = f"{filepath}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, data)
+        os.replace(tmp_path, filepath)
+
+    def _add_operation(self, operation: Operation):
+        self._operations.append(operation)
+        self._operation_index[(operation.job_id, operation.operation_id)] = operation
+        self._operation_id_index.setdefault(operation.operation_id, operation)
+
+    def _add_machine(self, machine: Machine):
+        self._machines.append(machine)
+        self._machine_index[machine.machine_id] = machine
+
+    def _add_job(self, job: Job):
+        self._jobs.append(job)
+        self._job_index[job.job_id] = job
+
     @property
     def name(self):
         return self._instance_name
@@ -101,14 +214,30 @@ class Instance(object):
     def nb_operations(self):
         return len(self._operations)
 
+    def as_arrays(self) -> InstanceArrays:
+        '''
+        Returns the instance as dense NumPy arrays.
+        The arrays are computed on the first call.
+        '''
+        if self._arrays is None:
+            self._arrays = InstanceArrays(self)
+        return self._arrays
+
     def __str__(self):
         return f"{self.name}_M{self.nb_machines}_J{self.nb_jobs}_O{self.nb_operations}"
 
     def get_machine(self, machine_id) -> Machine:
-        return next((machine for machine in self._machines if machine.machine_id == machine_id), None)
+        return self._machine_index.get(machine_id)
 
     def get_job(self, job_id) -> Job:
-        return next((job for job in self._jobs if job.job_id == job_id), None)
-
-    def get_operation(self, operation_id) -> Operation:
-        return next((op for op in self._operations if op.operation_id == operation_id), None)
+        return self._job_index.get(job_id)
+
+    def get_operation(self, operation_id, job_id=None) -> Operation:
+        '''
+        Returns the operation with the given id.
+        @param job_id: job of the operation. If None, the first operation
+          read with that id is returned.
+        '''
+        if job_id is None:
+            return self._operation_id_index.get(operation_id)
+        return self._operation_index.get((job_id, operation_id))
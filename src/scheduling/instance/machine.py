@@ -3,16 +3,87 @@ Machine on which operation are executed.
 
 @author: Vassilissa Lehoux
 '''
-import sys
-from typing import List
+import bisect
+from collections.abc import Sequence
+from typing import List, Tuple
 from src.scheduling.instance.operation import Operation
 
 
+def plan_periods(begin_times: List[int], end_times: List[int], set_up_time: int, set_up_energy: int,
+                 tear_down_time: int, tear_down_energy: int, min_consumption: int) -> List[Tuple[int, int]]:
+    '''
+    Returns the (start time, stop time) periods during which a machine must be
+    running to process operations with the least energy.
+    The machine is started just in time for its first operation and stopped
+    after its last one. Between two operations, it is stopped and started again
+    if the idle period is long enough to tear it down and set it up, and if
+    tear_down_energy + set_up_energy + min_consumption * set_up_time
+    is lower than min_consumption * idle time.
+    @param begin_times: sorted start times of the operations of the machine
+    @param end_times: sorted end times of the operations of the machine
+    '''
+    if not begin_times:
+        return []
+    restart_energy = tear_down_energy + set_up_energy + min_consumption * set_up_time
+    restart_time = tear_down_time + set_up_time
+    periods = []
+    period_start = max(0, begin_times[0] - set_up_time)
+    for i in range(1, len(begin_times)):
+        idle_time = begin_times[i] - end_times[i - 1]
+        if idle_time >= restart_time and restart_energy < min_consumption * idle_time:
+            periods.append((period_start, end_times[i - 1]))
+            period_start = begin_times[i] - set_up_time
+    periods.append((period_start, end_times[-1]))
+    return periods
+
+
+def _unchanged():
+    '''
+    Inverse of a change of the aggregates of a machine only.
+    '''
+
+
+class TimesView(Sequence):
+    '''
+    Read only view on a sorted list of times of a machine.
+    '''
+    __slots__ = ('_times',)
+
+    def __init__(self, times: List[int]):
+        self._times = times
+
+    def __getitem__(self, index):
+        return self._times[index]
+
+    def __len__(self):
+        return len(self._times)
+
+    def __eq__(self, other):
+        if isinstance(other, Sequence):
+            return list(self._times) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self._times)
+
+
 class Machine(object):
     '''
     Machine class.
     When operations are scheduled on the machine, contains the relative information. 
+    The start and stop times are kept sorted: the i-th start time and the i-th
+    stop time delimit the i-th period during which the machine is on.
+    The operations are not processed at the same time: their sorted start times
+    and sorted end times give the busy intervals of the machine.
+    The end time of the machine is the end of its regular planning: the periods
+    stop at that time at the latest, except the last one, which runs overtime
+    until the end of the last operation if it ends later. The overtime is running
+    time like any other, paid at the minimum consumption when idle.
     '''
+    __slots__ = ('_machine_id', '_set_up_time', '_set_up_energy', '_tear_down_time',
+                 '_tear_down_energy', '_min_consumption', 'end_time', '_scheduled_operations',
+                 '_start_times', '_stop_times', '_available_time', '_operations_energy',
+                 '_processing_time', '_working_time', '_begin_times', '_end_times', '_undo')
 
     def __init__(self, machine_id: int, set_up_time: int, set_up_energy: int, tear_down_time: int,
                  tear_down_energy:int, min_consumption: int, end_time: int):
@@ -20,8 +91,9 @@ class Machine(object):
         Constructor
         Machine is stopped at the beginning of the planning and need to
         be started before executing any operation.
-        @param end_time: End of the schedule on this machine: the machine must be
-          shut down before that time.
+        @param end_time: End of the regular schedule on this machine: the machine
+          is shut down at that time, unless its last operation ends later, in which
+          case it runs overtime until that operation ends.
         '''
         self._machine_id = machine_id
         self._set_up_time = set_up_time
@@ -34,13 +106,91 @@ class Machine(object):
         self._start_times = []
         self._stop_times = []
         self._available_time = 0
+        # Running aggregates, updated when operations are added or removed
+        # and when the machine is started or stopped
+        self._operations_energy = 0
+        self._processing_time = 0
+        self._working_time = 0
+        self._begin_times = []
+        self._end_times = []
+        # Inverse of the changes of the planning, while journaled (see start_journal)
+        self._undo = None
 
 
     def reset(self):
+        self._record(self.restore, self._state())
         self._start_times = []
         self._stop_times = []
         self._scheduled_operations = []
         self._available_time = 0
+        self._operations_energy = 0
+        self._processing_time = 0
+        self._working_time = 0
+        self._begin_times = []
+        self._end_times = []
+
+    def snapshot(self):
+        '''
+        Returns a copy of the planning state of the machine,
+        to be given back to restore.
+        '''
+        (scheduled_operations, start_times, stop_times, available_time, operations_energy,
+         processing_time, working_time, begin_times, end_times) = self._state()
+        return (list(scheduled_operations), list(start_times), list(stop_times), available_time,
+                operations_energy, processing_time, working_time, list(begin_times), list(end_times))
+
+    def restore(self, state):
+        '''
+        Restores a planning state returned by snapshot.
+        '''
+        (self._scheduled_operations, self._start_times,
+         self._stop_times, self._available_time, self._operations_energy,
+         self._processing_time, self._working_time, self._begin_times,
+         self._end_times) = state
+
+    def _state(self):
+        '''
+        Returns the planning state of the machine, sharing its lists.
+        '''
+        return (self._scheduled_operations, self._start_times, self._stop_times,
+                self._available_time, self._operations_energy, self._processing_time,
+                self._working_time, self._begin_times, self._end_times)
+
+    def start_journal(self) -> int:
+        '''
+        Starts recording the inverse of the changes of the planning, if not already
+        recording, so that they can be rolled back in constant time per change.
+        Returns the mark of the current planning, to be given back to rollback.
+        '''
+        if self._undo is None:
+            self._undo = []
+        return len(self._undo)
+
+    def rollback(self, mark: int):
+        '''
+        Rolls back the changes of the planning made since start_journal returned mark.
+        '''
+        undo = self._undo
+        while len(undo) > mark:
+            function, args, aggregates = undo.pop()
+            function(*args)
+            (self._available_time, self._operations_energy,
+             self._processing_time, self._working_time) = aggregates
+
+    def stop_journal(self):
+        '''
+        Stops recording the changes of the planning: they can no longer be rolled back.
+        '''
+        self._undo = None
+
+    def _record(self, function, *args):
+        '''
+        Records, while journaled, the inverse of the change about to be made:
+        function(*args) undoes it, then the aggregates are set back.
+        '''
+        if self._undo is not None:
+            self._undo.append((function, args, (self._available_time, self._operations_energy,
+                                                self._processing_time, self._working_time)))
 
     @property
     def set_up_time(self) -> int:
@@ -50,6 +200,18 @@ class Machine(object):
     def tear_down_time(self) -> int:
         return self._tear_down_time
 
+    @property
+    def set_up_energy(self) -> int:
+        return self._set_up_energy
+
+    @property
+    def tear_down_energy(self) -> int:
+        return self._tear_down_energy
+
+    @property
+    def min_consumption(self) -> int:
+        return self._min_consumption
+
     @property
     def machine_id(self) -> int:
         return self._machine_id
@@ -57,7 +219,8 @@ class Machine(object):
     @property
     def scheduled_operations(self) -> List:
         '''
-        Returns the list of the scheduled operations on the machine.
+        Returns the list of the scheduled operations on the machine,
+        in the order in which they are processed.
         '''
         return self._scheduled_operations
 
@@ -76,83 +239,296 @@ class Machine(object):
         Returns the actual start time.
         '''
 
-        self._scheduled_operations.append(operation)
-        operation.schedule(self._machine_id, start_time)
+        self._insert(operation, start_time)
         self._available_time = operation.end_time
         return operation.start_time
 
+    def insert_operation(self, operation: Operation, start_time: int) -> int:
+        '''
+        Adds an operation on the machine at time start_time, that can be
+        in an idle period between two scheduled operations.
+        Returns the actual start time.
+        '''
+        self._insert(operation, start_time)
+        self._available_time = max(self._available_time, operation.end_time)
+        return operation.start_time
+
+    def _insert(self, operation: Operation, start_time: int):
+        operation.schedule(self._machine_id, start_time)
+        # Les opérations restent dans l'ordre de leurs dates de début
+        index = bisect.bisect_right(self._begin_times, operation.start_time)
+        end_index = bisect.bisect_right(self._end_times, operation.end_time)
+        self._record(self._remove_at, index, end_index)
+        self._operations_energy += operation.energy
+        self._processing_time += operation.processing_time
+        self._begin_times.insert(index, operation.start_time)
+        self._scheduled_operations.insert(index, operation)
+        self._end_times.insert(end_index, operation.end_time)
+        self._update_working_time()
+
+    def _remove_at(self, index: int, end_index: int):
+        del self._scheduled_operations[index]
+        del self._begin_times[index]
+        del self._end_times[end_index]
+
+    def _insert_at(self, operation: Operation, index: int, begin_time: int, end_index: int, end_time: int):
+        self._scheduled_operations.insert(index, operation)
+        self._begin_times.insert(index, begin_time)
+        self._end_times.insert(end_index, end_time)
+
+    def earliest_slot(self, duration: int, at_time: int, ignore_periods: bool = False) -> int:
+        '''
+        Returns the earliest time at or after at_time at which an operation
+        of the given duration can be processed: the machine is on and set up
+        for the whole duration and does not process another operation.
+        Returns None if there is no such time before the machine is stopped.
+        @param ignore_periods: if True, the machine is considered as on whenever
+          it has finished its first set up (the periods are planned afterwards)
+        '''
+        begin_times = self._begin_times
+        end_times = self._end_times
+        nb_operations = len(end_times)
+        # First busy interval ending after at_time
+        index = bisect.bisect_right(end_times, at_time)
+        slot_time = max(at_time, self._set_up_time) if ignore_periods else at_time
+        while True:
+            if ignore_periods:
+                while index < nb_operations and end_times[index] <= slot_time:
+                    index += 1
+                if index < nb_operations and begin_times[index] < slot_time + duration:
+                    slot_time = end_times[index]
+                    continue
+                return slot_time
+            period = self._period_index(slot_time)
+            if period < 0 or slot_time >= self._period_stop(period):
+                # Machine stopped: wait for its next start
+                if period + 1 >= len(self._start_times):
+                    return None
+                period += 1
+            slot_time = max(slot_time, self._start_times[period] + self._set_up_time)
+            if slot_time + duration > self._period_stop(period):
+                if period + 1 >= len(self._start_times):
+                    return None
+                slot_time = self._start_times[period + 1]
+                continue
+            while index < nb_operations and end_times[index] <= slot_time:
+                index += 1
+            if index < nb_operations and begin_times[index] < slot_time + duration:
+                # Overlaps the next busy interval: try after it
+                slot_time = end_times[index]
+                continue
+            return slot_time
+
 
     def stop(self, at_time):
         """
         Stops the machine at time at_time.
         """
         assert(self.available_time <= at_time)
-        self._stop_times.append(at_time)
+        index = bisect.bisect_right(self._stop_times, at_time)
+        self._record(self._stop_times.pop, index)
+        self._stop_times.insert(index, at_time)
+        self._update_working_time()
 
     def start(self, at_time):
         """
         Starts the machine at time at_time.
+        If the machine is started later on, that start is moved to at_time
+        instead, so that every start keeps its own stop.
         """
-        self._start_times.append(at_time)
-        if len(self.stop_times) == 0:
+        index = self._period_index(at_time)
+        if index + 1 < len(self._start_times):
+            self._record(self._start_times.__setitem__, index + 1, self._start_times[index + 1])
+            self._start_times[index + 1] = at_time
+            self._update_working_time()
+            return
+        self._record(self._start_times.pop, index + 1)
+        self._start_times.insert(index + 1, at_time)
+        if len(self._stop_times) == 0:
+            self._record(self._stop_times.pop)
             self._stop_times.append(self.end_time)
+        self._update_working_time()
+
+    def add_period(self, start_time: int, stop_time: int):
+        """
+        Adds a period during which the machine is running:
+        started at start_time and stopped at stop_time.
+        """
+        index = bisect.bisect_right(self._start_times, start_time)
+        self._record(self._start_times.pop, index)
+        self._start_times.insert(index, start_time)
+        index = bisect.bisect_right(self._stop_times, stop_time)
+        self._record(self._stop_times.pop, index)
+        self._stop_times.insert(index, stop_time)
+        self._update_working_time()
+
+    def set_periods(self, periods: List[Tuple[int, int]]):
+        """
+        Replaces the periods during which the machine is running
+        by the given (start time, stop time) pairs.
+        """
+        # Les anciennes listes sont remplacées, et non modifiées : il suffit de les garder
+        self._record(self._set_period_lists, self._start_times, self._stop_times)
+        self._start_times = sorted(start for start, _ in periods)
+        self._stop_times = sorted(stop for _, stop in periods)
+        self._update_working_time()
+
+    def _set_period_lists(self, start_times: List[int], stop_times: List[int]):
+        self._start_times = start_times
+        self._stop_times = stop_times
+
+    def load(self, operations: List[Operation], periods: List[Tuple[int, int]]):
+        """
+        Replaces the planning of the machine, e.g. read from a file: the operations,
+        already scheduled on this machine, and the (start time, stop time) periods.
+        Faster than adding the operations one by one: the times are sorted once.
+        """
+        self._record(self.restore, self._state())
+        self._scheduled_operations = sorted(operations, key=lambda operation: operation.start_time)
+        # (machine id, start time, duration, energy) of each operation
+        schedules = [operation.snapshot() for operation in self._scheduled_operations]
+        self._operations_energy = sum(schedule[3] for schedule in schedules)
+        self._processing_time = sum(schedule[2] for schedule in schedules)
+        self._begin_times = [schedule[1] for schedule in schedules]
+        self._end_times = sorted(schedule[1] + schedule[2] for schedule in schedules)
+        self._available_time = self._end_times[-1] if self._end_times else 0
+        self.set_periods(periods)
+
+    def optimal_periods(self) -> List[Tuple[int, int]]:
+        """
+        Returns the (start time, stop time) periods during which the machine must
+        be running to process its scheduled operations with the least energy
+        (see plan_periods).
+        Linear in the number of scheduled operations.
+        """
+        return plan_periods(self._begin_times, self._end_times, self._set_up_time, self._set_up_energy,
+                            self._tear_down_time, self._tear_down_energy, self._min_consumption)
+
+    def _period_index(self, at_time: int) -> int:
+        '''
+        Returns the index of the last period started at or before at_time, -1 if none.
+        '''
+        return bisect.bisect_right(self._start_times, at_time) - 1
+
+    def _period_stop(self, index: int) -> int:
+        '''
+        Returns the stop time of the period of given index
+        (end of the schedule if the machine is not stopped).
+        The last period lasts at least until the end of the last operation,
+        and does not stop before it starts when started after the end time.
+        '''
+        stop = self._stop_times[index] if index < len(self._stop_times) else self.end_time
+        if index == len(self._start_times) - 1:
+            stop = max(stop, self._start_times[index])
+            if self._end_times:
+                stop = max(stop, self._end_times[-1])
+        return stop
 
     def is_on(self, at_time: int) -> bool:
         """
         Returns True if the machine is running at time at_time.
+        A machine still running at its end time keeps running for the
+        operations planned after it (overtime) instead of being restarted.
         """
-        if not self._start_times:
+        index = self._period_index(at_time)
+        if index < 0:
             return False
-        if at_time < self._start_times[0]:
-            return False
-        for i in range(len(self._start_times)):
-            start = self._start_times[i]
-            stop = self._stop_times[i] if i < len(self._stop_times) else self.end_time
-            if start <= at_time < stop:
-                return True
-        return False
+        stop = self._period_stop(index)
+        return at_time < stop or (index == len(self._start_times) - 1 and stop >= self.end_time)
+
+    def next_on(self, at_time: int) -> int:
+        """
+        Returns the first time at or after at_time at which the machine is running,
+        None if it is never started again.
+        """
+        index = self._period_index(at_time)
+        if index >= 0 and at_time < self._period_stop(index):
+            return at_time
+        if index + 1 < len(self._start_times):
+            return self._start_times[index + 1]
+        return None
+
+    def ready_time(self, at_time: int) -> int:
+        """
+        Returns the first time at or after at_time at which the machine has
+        finished the set up of the last period started at or before at_time.
+        """
+        index = self._period_index(at_time)
+        if index < 0:
+            return at_time
+        return max(at_time, self._start_times[index] + self._set_up_time)
+
+    def next_off(self, at_time: int) -> int:
+        """
+        Returns the first time at or after at_time at which the machine is stopped.
+        """
+        index = self._period_index(at_time)
+        if index >= 0 and at_time < self._period_stop(index):
+            return self._period_stop(index)
+        return at_time
 
     @property
     def working_time(self) -> int:
         '''
         Total time during which the machine is running
         '''
-        if not self._start_times:
-            return 0
+        return self._working_time
 
+    def _update_working_time(self):
+        '''
+        Computes the total running time after a start, a stop or a change of the operations
+        '''
         total_time = 0
         for i in range(len(self._start_times)):
-            start = self._start_times[i]
-            stop = self._stop_times[i] if i < len(self._stop_times) else self.end_time
-            total_time += stop - start
+            total_time += self._period_stop(i) - self._start_times[i]
+        self._working_time = total_time
 
-        return total_time
+    @property
+    def processing_time(self) -> int:
+        '''
+        Total processing time of the operations scheduled on the machine
+        '''
+        return self._processing_time
+
+    @property
+    def completion_time(self) -> int:
+        '''
+        End time of the last operation processed on the machine,
+        0 if no operation is scheduled on it
+        '''
+        return self._end_times[-1] if self._end_times else 0
 
 
     @property
-    def start_times(self) -> List[int]:
+    def start_times(self) -> TimesView:
         """
         Returns the list of the times at which the machine is started
-        in increasing order
+        in increasing order, as a read only view
         """
-        return sorted(self._start_times)
+        return TimesView(self._start_times)
 
     @property
-    def stop_times(self) -> List[int]:
+    def stop_times(self) -> TimesView:
         """
         Returns the list of the times at which the machine is stopped
-        in increasing order
+        in increasing order, as a read only view
         """
-        return sorted(self._stop_times)
+        return TimesView(self._stop_times)
 
     def remove_operation(self, operation: Operation):
         """
         Removes an operation from the machine.
         """
         if operation in self._scheduled_operations:
-            self._scheduled_operations.remove(operation)
-            self._available_time = operation.start_time
-            self.recalculate_available_time(min_gap=sys.maxsize)
+            index = self._scheduled_operations.index(operation)
+            end_index = bisect.bisect_left(self._end_times, operation.end_time)
+            self._record(self._insert_at, operation, index, self._begin_times[index],
+                         end_index, self._end_times[end_index])
+            self._operations_energy -= operation.energy
+            self._processing_time -= operation.processing_time
+            self._remove_at(index, end_index)
+            self._available_time = self._end_times[-1] if self._end_times else 0
+            self._update_working_time()
 
     def recalculate_available_time(self, min_gap: int = 0):
         """
@@ -160,32 +536,31 @@ class Machine(object):
         en tenant compte des créneaux libres entre opérations.
         min_gap : durée minimale requise pour considérer un créneau comme disponible.
         """
+        self._record(_unchanged)
         if not self._scheduled_operations:
             self._available_time = 0
             return
 
-        # Trie les opérations par start_time
-        ops = sorted(self._scheduled_operations, key=lambda op: op.start_time)
-        # Vérifie les créneaux entre les opérations
-        for i in range(len(ops) - 1):
-            gap = ops[i + 1].start_time - ops[i].end_time
+        # Vérifie les créneaux entre les opérations, triées par start_time
+        for i in range(len(self._end_times) - 1):
+            gap = self._begin_times[i + 1] - self._end_times[i]
             if gap >= min_gap:
-                self._available_time = ops[i].end_time
+                self._available_time = self._end_times[i]
                 return
 
         # Sinon, disponible après la dernière opération
-        self._available_time = ops[-1].end_time
+        self._available_time = self._end_times[-1]
 
     @property
     def total_energy_consumption(self) -> int:
         """
         Total energy consumption of the machine during planning exectution.
         """
-        energy = sum(op.energy for op in self._scheduled_operations)
+        energy = self._operations_energy
         energy += len(self._start_times) * self._set_up_energy
         energy += len(self._stop_times) * self._tear_down_energy
 
-        min_consumption_time = self.working_time - sum(op.processing_time for op in self._scheduled_operations)
+        min_consumption_time = self._working_time - self._processing_time
 
         energy += self._min_consumption * min_consumption_time
 
@@ -12,6 +12,7 @@ class OperationScheduleInfo(object):
     '''
     Informations known when the operation is scheduled
     '''
+    __slots__ = ('machine_id', 'schedule_time', 'duration', 'energy_consumption')
 
     def __init__(self, machine_id: int, schedule_time: int, duration: int, energy_consumption: int):
         self.machine_id = machine_id
@@ -24,6 +25,8 @@ class Operation(object):
     '''
     Operation of the jobs
     '''
+    __slots__ = ('_job_id', '_operation_id', '_schedule_info', '_free_schedule_info',
+                 '_predecessors', '_successors', 'energies', 'processing_times')
 
     def __init__(self, job_id, operation_id):
         '''
@@ -32,6 +35,8 @@ class Operation(object):
         self._job_id = job_id
         self._operation_id = operation_id
         self._schedule_info = None
+        # Schedule information kept after a reset, reused by the next schedule
+        self._free_schedule_info = None
         self._predecessors = []
         self._successors = []
         self.energies = {}
@@ -55,7 +60,28 @@ class Operation(object):
         '''
         Removes scheduling informations
         '''
-        self._schedule_info = None
+        if self._schedule_info is not None:
+            self._free_schedule_info = self._schedule_info
+            self._schedule_info = None
+
+    def snapshot(self):
+        '''
+        Returns a copy of the schedule information of the operation,
+        to be given back to restore.
+        '''
+        info = self._schedule_info
+        if info is None:
+            return None
+        return (info.machine_id, info.schedule_time, info.duration, info.energy_consumption)
+
+    def restore(self, state):
+        '''
+        Restores schedule information returned by snapshot.
+        '''
+        if state is None:
+            self.reset()
+        else:
+            self._set_schedule_info(*state)
 
     def add_predecessor(self, operation):
         '''
@@ -155,9 +181,25 @@ class Operation(object):
         '''
         if check_success and not self.is_ready(at_time):
             return False
-        self._schedule_info = OperationScheduleInfo(machine_id, at_time, self.processing_times[machine_id], self.energies[machine_id])
+        self._set_schedule_info(machine_id, at_time, self.processing_times[machine_id], self.energies[machine_id])
         return True
 
+    def _set_schedule_info(self, machine_id: int, schedule_time: int, duration: int, energy_consumption: int):
+        '''
+        Updates the schedule information in place, without allocating
+        a new object when the operation has already been scheduled.
+        '''
+        info = self._schedule_info or self._free_schedule_info
+        if info is None:
+            self._schedule_info = OperationScheduleInfo(machine_id, schedule_time, duration, energy_consumption)
+            return
+        info.machine_id = machine_id
+        info.schedule_time = schedule_time
+        info.duration = duration
+        info.energy_consumption = energy_consumption
+        self._schedule_info = info
+        self._free_schedule_info = None
+
     @property
     def min_start_time(self) -> int:
         '''
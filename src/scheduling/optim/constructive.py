@@ -4,21 +4,24 @@ Constructive heuristics that returns preferably **feasible** solutions.
 @author: Vassilissa Lehoux
 '''
 from typing import Dict
-import random
+
+import numpy as np
 
 from src.scheduling.instance.instance import Instance
 from src.scheduling.solution import Solution
 from src.scheduling.optim.heuristics import Heuristic
+from src.scheduling.optim.rng import get_seed, python_rng
 
 
-def _evaluate_cost(operation, machine) -> float:
+def _evaluate_costs(instance: Instance) -> np.ndarray:
     '''
-    Evaluates the cost of assigning an operation to a machine.
+    Evaluates the cost of assigning each operation to each machine,
+    as an (operations x machines) array.
     Cost can be based on energy consumption or duration.
+    Machines that cannot process an operation get the maximum cost.
     '''
-    energy_cost = operation.energies[machine.machine_id]
-    duration_cost = operation.processing_times[machine.machine_id]
-    return energy_cost + duration_cost
+    arrays = instance.as_arrays()
+    return arrays.masked(arrays.energies + arrays.processing_times)
 
 
 class Greedy(Heuristic):
@@ -44,17 +47,13 @@ class Greedy(Heuristic):
         @param params: the parameters for the run
         '''
         solution = Solution(instance)
+        arrays = instance.as_arrays()
+        # Machine de coût minimal pour chaque opération (la première en cas d'égalité)
+        best_machines = np.argmin(_evaluate_costs(instance), axis=1).tolist()
         for job in instance.jobs:
             for operation in job.operations:
-                best_machine = None
-                best_cost = float('inf')
-                for machine in instance.machines:
-                    cost = _evaluate_cost(operation, machine)
-                    if cost < best_cost:
-                        best_cost = cost
-                        best_machine = machine
-                if best_machine:
-                    solution.schedule(operation, best_machine)
+                best_machine = instance.machines[best_machines[arrays.position(operation)]]
+                solution.schedule(operation, best_machine)
         return solution
 
 
@@ -79,16 +78,20 @@ class NonDeterminist(Heuristic):
         (the function will be evaluated with an empty dictionary).
 
         @param instance: the instance to solve
-        @param params: the parameters for the run
+        @param params: the parameters for the run: 'seed' (default the seed given to
+          the constructor, else None) of the random choices
         '''
+        rng = python_rng(get_seed(params, self.params))
         solution = Solution(instance)
         for job in instance.jobs:
             for operation in job.operations:
-                feasible_machines = [machine for machine in instance.machines if
+                eligible_machines = [machine for machine in instance.machines
+                                     if machine.machine_id in operation.processing_times]
+                # De préférence une machine libre au plus tôt démarrage de l'opération
+                feasible_machines = [machine for machine in eligible_machines if
                                      machine.available_time <= operation.min_start_time]
-                if feasible_machines:
-                    selected_machine = random.choice(feasible_machines)
-                    solution.schedule(operation, selected_machine)
+                selected_machine = rng.choice(feasible_machines or eligible_machines)
+                solution.schedule(operation, selected_machine)
         return solution
 
 
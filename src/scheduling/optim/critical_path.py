@@ -0,0 +1,112 @@
+'''
+Critical path of a solution in the disjunctive graph: one arc from each
+operation to the next operation of its job and to the next operation
+on its machine.
+
+@author: Vassilissa Lehoux
+'''
+from typing import List, Tuple
+
+from src.scheduling.instance.operation import Operation
+from src.scheduling.solution import Solution
+
+
+class CriticalPath(object):
+    '''
+    Heads and tails of the scheduled operations of a solution:
+    head: earliest start time of the operation given the arcs, the first
+      operation of a machine not starting before the machine is set up,
+    tail: length of the longest path from the end of the operation
+      to the end of the schedule.
+    An operation is critical if head + processing time + tail is the makespan.
+    '''
+
+    def __init__(self, sol: Solution):
+        '''
+        Computes the heads and tails in a topological order of the arcs
+        (Kahn's algorithm). Linear in the number of operations once the
+        operations of each machine are sorted by start time.
+        Raises ValueError if the arcs have a cycle: the planning of a machine
+        processes an operation before the one preceding it in its job.
+        '''
+        operations = [op for op in sol.all_operations if op.assigned]
+        self.heads = {}
+        self.tails = {}
+        # Operations of each machine in the order they are processed
+        self.machine_sequences = {}
+        self._machine_next = {}
+        machine_previous = {}
+        for op in sorted(operations, key=lambda op: (op.start_time, op.end_time)):
+            sequence = self.machine_sequences.setdefault(op.assigned_to, [])
+            if sequence:
+                self._machine_next[sequence[-1]] = op
+                machine_previous[op] = sequence[-1]
+            sequence.append(op)
+
+        # Ordre topologique : une opération est traitée une fois tous ses arcs entrants traités
+        nb_predecessors = {op: sum(1 for pred in op.predecessors if pred.assigned) + (op in machine_previous)
+                           for op in operations}
+        order = [op for op in operations if nb_predecessors[op] == 0]
+        for op in order:
+            for successor in self._successors(op):
+                nb_predecessors[successor] -= 1
+                if nb_predecessors[successor] == 0:
+                    order.append(successor)
+        if len(order) < len(operations):
+            raise ValueError("The planning has a cycle: an operation is processed "
+                             "before its predecessor on the same machine")
+
+        for op in order:
+            previous = machine_previous.get(op)
+            if previous is not None:
+                head = self.heads[previous] + previous.processing_time
+            else:
+                machine = sol.inst.get_machine(op.assigned_to)
+                head = machine.start_times[0] + machine.set_up_time if machine.start_times else 0
+            for pred in op.predecessors:
+                if pred.assigned:
+                    head = max(head, self.heads[pred] + pred.processing_time)
+            self.heads[op] = head
+
+        for op in reversed(order):
+            self.tails[op] = max((successor.processing_time + self.tails[successor]
+                                  for successor in self._successors(op)), default=0)
+
+        self.makespan = max((self.heads[op] + op.processing_time + self.tails[op] for op in operations),
+                            default=0)
+
+    def _successors(self, op: Operation) -> List[Operation]:
+        '''
+        Returns the planned operations at the end of the arcs leaving the operation.
+        '''
+        successors = [successor for successor in op.successors if successor.assigned]
+        if op in self._machine_next:
+            successors.append(self._machine_next[op])
+        return successors
+
+    def is_critical(self, op: Operation) -> bool:
+        '''
+        Returns True if the operation is on a longest path.
+        '''
+        return self.heads[op] + op.processing_time + self.tails[op] == self.makespan
+
+    def critical_blocks(self) -> List[Tuple[int, List[Operation]]]:
+        '''
+        Returns the (machine id, operations) of the critical blocks:
+        the maximal sequences of at least two critical operations processed
+        one right after the other on the same machine.
+        '''
+        blocks = []
+        for machine_id, sequence in self.machine_sequences.items():
+            block = []
+            for op in sequence:
+                if self.is_critical(op) and block and \
+                        self.heads[block[-1]] + block[-1].processing_time == self.heads[op]:
+                    block.append(op)
+                    continue
+                if len(block) >= 2:
+                    blocks.append((machine_id, block))
+                block = [op] if self.is_critical(op) else []
+            if len(block) >= 2:
+                blocks.append((machine_id, block))
+        return blocks
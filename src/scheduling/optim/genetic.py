@@ -0,0 +1,169 @@
+'''
+Genetic algorithm over (job sequence, machine assignment) chromosomes.
+Whole populations are evaluated at once with encoding.decode_population,
+and the genetic operators work on NumPy arrays.
+
+@author: Vassilissa Lehoux
+'''
+import time
+from typing import Dict
+
+import numpy as np
+
+from src.scheduling.bounds import LowerBounds, report_gap
+from src.scheduling.encoding import Encoding, decode_population, sequence_from_jobs
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.heuristics import Heuristic
+from src.scheduling.optim.rng import get_seed, numpy_rng
+
+
+class GeneticAlgorithm(Heuristic):
+    '''
+    Genetic algorithm: each individual is a sequence of jobs, in which a job
+    appears once per operation (see encoding.sequence_from_jobs), and a machine
+    for each operation. At each generation, the parents are chosen by
+    tournament, the sequences are crossed with the precedence preserving order
+    based crossover (POX), the assignments with a uniform crossover,
+    and the children are mutated. The best individuals are kept (elitism).
+    Only the best individual found is built as a Solution.
+    '''
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        self.params = params
+        # Statistics of the last run
+        self.generations = 0
+        self.evaluations = 0
+        self.evaluations_per_second = 0.
+        self.gap = None
+
+    def run(self, instance: Instance, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run:
+          'population_size' (default 100), 'generations' (default 100),
+          'time_limit' (default None) in seconds,
+          'tournament_size' (default 2), 'crossover_rate' (default 0.9),
+          'mutation_rate' (default 0.2): probability to swap two jobs of the sequence
+            of a child,
+          'assignment_mutation_rate' (default 0.05): probability to change the machine
+            of each operation of a child,
+          'elite' (default 2): number of best individuals copied to the next generation,
+          'seed' (default the seed given to the constructor, else None),
+          'plan_shutdowns' (default False): plans the shutdowns of the returned
+            solution (the individuals are evaluated without),
+          'stop_at_bound' (default True): stops once the best individual reaches
+            the lower bound of the objective (see bounds.LowerBounds)
+        '''
+        population_size = params.get('population_size', 100)
+        max_generations = params.get('generations', 100)
+        time_limit = params.get('time_limit', None)
+        tournament_size = params.get('tournament_size', 2)
+        crossover_rate = params.get('crossover_rate', 0.9)
+        mutation_rate = params.get('mutation_rate', 0.2)
+        assignment_mutation_rate = params.get('assignment_mutation_rate', 0.05)
+        elite = min(params.get('elite', 2), population_size)
+        rng = numpy_rng(get_seed(params, self.params))
+
+        start = time.perf_counter()
+        deadline = start + time_limit if time_limit is not None else None
+        arrays = instance.as_arrays()
+        bound = LowerBounds(instance).objective
+        stop_at_bound = params.get('stop_at_bound', True)
+        job_sequences = rng.permuted(np.tile(arrays.job_ids, (population_size, 1)), axis=1)
+        assignments = _random_machines(arrays.eligible, rng, population_size)
+        values = decode_population(arrays, job_sequences, assignments)
+        self.evaluations = population_size
+
+        self.generations = 0
+        while self.generations < max_generations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if stop_at_bound and values.min() <= bound:
+                break
+            parents = _tournament(values, rng, population_size - elite, tournament_size)
+            mates = np.roll(parents, 1)
+            children_sequences = job_sequences[parents].copy()
+            children_assignments = assignments[parents].copy()
+            crossed = rng.random(len(parents)) < crossover_rate
+            children_sequences[crossed] = _pox(job_sequences[parents[crossed]], job_sequences[mates[crossed]],
+                                               arrays.nb_jobs, rng)
+            genes = crossed[:, None] & (rng.random(children_assignments.shape) < 0.5)
+            children_assignments[genes] = assignments[mates][genes]
+            _swap_mutation(children_sequences, rng, mutation_rate)
+            mutated = rng.random(children_assignments.shape) < assignment_mutation_rate
+            children_assignments[mutated] = _random_machines(arrays.eligible, rng, len(parents))[mutated]
+
+            children_values = decode_population(arrays, children_sequences, children_assignments)
+            self.evaluations += len(parents)
+            best = np.argsort(values, kind='stable')[:elite]
+            job_sequences = np.concatenate((job_sequences[best], children_sequences))
+            assignments = np.concatenate((assignments[best], children_assignments))
+            values = np.concatenate((values[best], children_values))
+            self.generations += 1
+
+        elapsed = time.perf_counter() - start
+        self.evaluations_per_second = self.evaluations / elapsed if elapsed > 0 else 0.
+        best = int(np.argmin(values))
+        encoding = Encoding(sequence_from_jobs(arrays, job_sequences[best]), assignments[best])
+        solution = encoding.to_solution(instance)
+        if params.get('plan_shutdowns', False):
+            solution.shutdown_planning = True
+            solution.plan_shutdowns()
+        self.gap = report_gap(type(self).__name__, solution.evaluate, bound)
+        return solution
+
+
+def _random_machines(eligible: np.ndarray, rng: np.random.Generator, nb_individuals: int) -> np.ndarray:
+    '''
+    Returns (individuals x operations) random machines able to process the operations.
+    '''
+    keys = np.where(eligible, rng.random((nb_individuals,) + eligible.shape), -1.)
+    return np.argmax(keys, axis=2)
+
+
+def _tournament(values: np.ndarray, rng: np.random.Generator, nb_winners: int, size: int) -> np.ndarray:
+    '''
+    Returns the positions of nb_winners individuals, each the best
+    of size individuals drawn at random.
+    '''
+    candidates = rng.integers(len(values), size=(nb_winners, size))
+    return candidates[np.arange(nb_winners), np.argmin(values[candidates], axis=1)]
+
+
+def _pox(parents: np.ndarray, mates: np.ndarray, nb_jobs: int, rng: np.random.Generator) -> np.ndarray:
+    '''
+    Precedence preserving order based crossover, row by row: the jobs of a random
+    subset keep their positions in the parent, the other positions are filled
+    with the other jobs in the order of the mate.
+    '''
+    nb_children, length = parents.shape
+    rows = np.arange(nb_children)[:, None]
+    kept_jobs = rng.random((nb_children, nb_jobs)) < 0.5
+    kept = kept_jobs[rows, parents]
+    # Positions to fill in the parent and genes taken from the mate, in order
+    free_positions = np.argsort(kept, axis=1, kind='stable')
+    mate_genes = np.argsort(kept_jobs[rows, mates], axis=1, kind='stable')
+    filled = np.arange(length) < (~kept).sum(axis=1)[:, None]
+    rows = np.broadcast_to(rows, (nb_children, length))[filled]
+    children = parents.copy()
+    children[rows, free_positions[filled]] = mates[rows, mate_genes[filled]]
+    return children
+
+
+def _swap_mutation(job_sequences: np.ndarray, rng: np.random.Generator, rate: float):
+    '''
+    Swaps two random positions of each sequence with probability rate, in place.
+    '''
+    mutated = np.flatnonzero(rng.random(len(job_sequences)) < rate)
+    first = rng.integers(job_sequences.shape[1], size=len(mutated))
+    second = rng.integers(job_sequences.shape[1], size=len(mutated))
+    job_sequences[mutated, first], job_sequences[mutated, second] = \
+        job_sequences[mutated, second], job_sequences[mutated, first]
@@ -4,15 +4,21 @@ then improve it.
 
 @author: Vassilissa Lehoux
 '''
-import copy
+import math
+import sys
+import time
+from collections import deque
 from typing import Dict
 
+from src.scheduling.bounds import LowerBounds, report_gap
 from src.scheduling.optim.heuristics import Heuristic
 from src.scheduling.instance.instance import Instance
 from src.scheduling.solution import Solution
 from src.scheduling.optim.constructive import NonDeterminist
 from src.scheduling.optim.neighborhoods import MachineSwitchNeighborhood
-from src.scheduling.optim.neighborhoods import OperationOrderNeighborhood
+from src.scheduling.optim.neighborhoods import OperationOrderNeighborhood, past_deadline
+from src.scheduling.optim.moves import Move, MachineSwitchMove, SwapMove
+from src.scheduling.optim.rng import get_seed, python_rng
 
 
 
@@ -34,26 +40,51 @@ class FirstNeighborLocalSearch(Heuristic):
                dictionary. Implementation should provide default values in the function.
         '''
         self.params = params
+        # Optimality gap of the last run (see bounds.gap)
+        self.gap = None
 
     def run(self, instance, params: Dict = dict()) -> Solution:
-        self.nonDeterminist = params['nonDeterminist']
-        self.machineSwitchNeighborhood = params['machineSwitchNeighborhood']
+        '''
+        Computes a solution for the given instance.
+        Implementation should provide default values in the function
+        (the function will be evaluated with an empty dictionary).
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run: 'nonDeterminist' the heuristic
+          computing the initial solution, 'machineSwitchNeighborhood' the neighborhood,
+          'plan_shutdowns' (default False) to plan the machine shutdowns of every
+          evaluated solution (see Solution.plan_shutdowns), 'seed' (default the seed
+          given to the constructor, else None) of the initial solution,
+          'stop_at_bound' (default True) to stop once the solution reaches the
+          lower bound of the objective (see bounds.LowerBounds),
+          'time_limit' (default None) in seconds, checked while the moves are tried
+        '''
+        self.nonDeterminist = params.get('nonDeterminist', NonDeterminist())
+        self.machineSwitchNeighborhood = params.get('machineSwitchNeighborhood',
+                                                    MachineSwitchNeighborhood(instance))
+        time_limit = params.get('time_limit', None)
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        bound = LowerBounds(instance).objective
+        stop_at_bound = params.get('stop_at_bound', True)
         # Génère une solution initiale
-        current_solution = self.nonDeterminist.run(instance)
+        current_solution = self.nonDeterminist.run(instance, _init_params(params, self.params))
+        _init_shutdown_planning(current_solution, params)
 
         improved = True
 
         while improved:
-            improved = False
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            current_value = current_solution.evaluate
 
-            current_solution_copy = copy.deepcopy(current_solution)
+            # Le premier voisin améliorant est appliqué sur la solution courante
+            current_solution = self.machineSwitchNeighborhood.first_better_neighbor(current_solution, deadline)
 
-            neighbor_solution = self.machineSwitchNeighborhood.first_better_neighbor(current_solution_copy)
-
-            if neighbor_solution.evaluate < current_solution.evaluate:
-                current_solution = neighbor_solution
-                improved = True
+            improved = current_solution.evaluate < current_value
+            if stop_at_bound and current_solution.evaluate <= bound:
+                break
 
+        self.gap = report_gap(type(self).__name__, current_solution.evaluate, bound)
         return current_solution
 
 
@@ -75,6 +106,8 @@ class BestNeighborLocalSearch(Heuristic):
                dictionary. Implementation should provide default values in the function.
         '''
         self.params = params
+        # Optimality gap of the last run (see bounds.gap)
+        self.gap = None
 
 
     def run(self, instance: Instance, params: Dict=dict()) -> Solution:
@@ -86,30 +119,556 @@ class BestNeighborLocalSearch(Heuristic):
         @param instance: the instance to solve
         @param InitClass: the class for the heuristic computing the initialization
         @param NeighborClass: the class of neighborhood used in the vanilla local search
-        @param params: the parameters for the run
+        @param params: the parameters for the run, see FirstNeighborLocalSearch,
+          and 'operationOrderNeighborhood' the second neighborhood.
+          With 'stop_at_bound', no move is searched if the initial solution
+          reaches the lower bound. With 'time_limit', the best of the moves
+          evaluated before it is applied
         '''
-        self.nonDeterminist = params['nonDeterminist']
-        self.machineSwitchNeighborhood = params['machineSwitchNeighborhood']
-        self.operationOrderNeighborhood = params['operationOrderNeighborhood']
-        current_solution = self.nonDeterminist.run(instance)
+        self.nonDeterminist = params.get('nonDeterminist', NonDeterminist())
+        self.machineSwitchNeighborhood = params.get('machineSwitchNeighborhood',
+                                                    MachineSwitchNeighborhood(instance))
+        self.operationOrderNeighborhood = params.get('operationOrderNeighborhood',
+                                                     OperationOrderNeighborhood(instance))
+        time_limit = params.get('time_limit', None)
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        bound = LowerBounds(instance).objective
+        stop_at_bound = params.get('stop_at_bound', True)
+        current_solution = self.nonDeterminist.run(instance, _init_params(params, self.params))
+        _init_shutdown_planning(current_solution, params)
+        current_value = current_solution.evaluate
+        if stop_at_bound and current_value <= bound:
+            self.gap = report_gap(type(self).__name__, current_value, bound)
+            return current_solution
 
-        first_solution = copy.deepcopy(current_solution)
+        first_move, first_value = self.machineSwitchNeighborhood.best_move(current_solution, deadline)
+        if first_move is None or first_value > current_value:
+            first_move, first_value = None, current_value
 
-        first_neighbor_solution = self.machineSwitchNeighborhood.best_neighbor(first_solution)
+        second_move, second_value = None, current_value
+        if deadline is None or time.perf_counter() < deadline:
+            second_move, second_value = self.operationOrderNeighborhood.best_move(current_solution, deadline)
+            if second_move is None or second_value >= current_value:
+                second_move, second_value = None, current_value
 
-        second_solution = copy.deepcopy(first_solution)
+        move = second_move if second_value < first_value else first_move
+        if move is not None:
+            current_solution.apply_move(move)
+            current_solution.commit_move()
 
-        second_neighbor_solution = self.operationOrderNeighborhood.best_neighbor(second_solution)
+        self.gap = report_gap(type(self).__name__, current_solution.evaluate, bound)
+        return current_solution
 
-        if second_neighbor_solution.evaluate < first_neighbor_solution.evaluate:
-            current_solution = second_neighbor_solution
-        else:
-            current_solution = first_neighbor_solution
 
+class TabuSearch(Heuristic):
+    '''
+    Tabu search: at each iteration, the best move of the machine switch
+    and operation order neighborhoods is applied, even if it degrades the
+    solution, except the moves undoing a recent move (tabu moves).
+    A tabu move is still allowed if it gives a solution better than the
+    best one found (aspiration criterion).
+    Tabu attributes: an operation may not go back to the machine it left,
+    and a pair of swapped operations may not be swapped again, for
+    'tenure' iterations (see _TabuList).
+    '''
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        self.params = params
+        # Number of iterations done by the last run
+        self.iterations = 0
+        # Optimality gap of the last run (see bounds.gap)
+        self.gap = None
+
+    def run(self, instance: Instance, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run, see BestNeighborLocalSearch, and
+          'tenure' (default 7) the number of iterations a move stays tabu,
+          'max_iterations' (default 100), 'time_limit' (default None) in seconds,
+          'stop_at_bound' (default True), see FirstNeighborLocalSearch
+        '''
+        self.nonDeterminist = params.get('nonDeterminist', NonDeterminist())
+        self.machineSwitchNeighborhood = params.get('machineSwitchNeighborhood',
+                                                    MachineSwitchNeighborhood(instance))
+        self.operationOrderNeighborhood = params.get('operationOrderNeighborhood',
+                                                     OperationOrderNeighborhood(instance))
+        tenure = params.get('tenure', 7)
+        max_iterations = params.get('max_iterations', 100)
+        time_limit = params.get('time_limit', None)
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        bound = LowerBounds(instance).objective
+        stop_at_bound = params.get('stop_at_bound', True)
+
+        current_solution = self.nonDeterminist.run(instance, _init_params(params, self.params))
+        _init_shutdown_planning(current_solution, params)
+        best_value = current_solution.evaluate
+        best_state = current_solution.export_state()
+        tabu = _TabuList()
+
+        self.iterations = 0
+        while self.iterations < max_iterations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if stop_at_bound and best_value <= bound:
+                break
+            move, value = self._best_admissible_move(current_solution, tabu, best_value, deadline)
+            if move is None:
+                break
+            forbidden = _reverse_attribute(move)
+            current_solution.apply_move(move)
+            current_solution.commit_move()
+            self.iterations += 1
+            tabu.add(forbidden, self.iterations + tenure)
+            tabu.purge(self.iterations)
+            if value < best_value:
+                best_value = value
+                best_state = current_solution.export_state()
+
+        current_solution.load_state(best_state)
+        self.gap = report_gap(type(self).__name__, best_value, bound)
         return current_solution
 
+    def _best_admissible_move(self, sol: Solution, tabu: '_TabuList', best_value: int, deadline: float = None):
+        '''
+        Returns the best move that is not tabu, or that improves best_value,
+        and the value of the solution once it is applied, or (None, None).
+        The moves after the deadline (time.perf_counter value), if any, are not
+        evaluated: the best admissible move found before it is returned.
+        The solution is left unchanged.
+        '''
+        best_move = None
+        best_move_value = None
+        for neighborhood in (self.machineSwitchNeighborhood, self.operationOrderNeighborhood):
+            for position, move in enumerate(neighborhood.moves(sol)):
+                if past_deadline(deadline, position):
+                    return best_move, best_move_value
+                is_tabu = _attribute(move) in tabu
+                if not sol.apply_move(move):
+                    continue
+                value = sol.evaluate
+                sol.undo_move()
+                if is_tabu and value >= best_value:
+                    continue
+                if best_move is None or value < best_move_value:
+                    best_move = move
+                    best_move_value = value
+        return best_move, best_move_value
+
+
+class _TabuList(object):
+    '''
+    Tabu attributes, each one until its expiry iteration: a hash set for the
+    lookups and a queue by expiry, so that the expired attributes are dropped.
+    '''
+
+    def __init__(self):
+        # Attribut tabou -> première itération où il ne l'est plus
+        self._expiries = {}
+        # (itération d'expiration, attribut), dans l'ordre des expirations
+        self._queue = deque()
+
+    def add(self, attribute, expiry: int):
+        '''
+        Makes the attribute tabu until the iteration expiry (excluded).
+        The expiries must be given in non decreasing order.
+        '''
+        self._expiries[attribute] = expiry
+        self._queue.append((expiry, attribute))
+
+    def purge(self, iteration: int):
+        '''
+        Drops the attributes that are no longer tabu at the given iteration.
+        '''
+        queue = self._queue
+        while queue and queue[0][0] <= iteration:
+            expiry, attribute = queue.popleft()
+            # L'attribut a pu être rendu tabou de nouveau depuis
+            if self._expiries.get(attribute) == expiry:
+                del self._expiries[attribute]
+
+    def __contains__(self, attribute) -> bool:
+        return attribute in self._expiries
+
+    def __len__(self) -> int:
+        return len(self._expiries)
+
+
+class SimulatedAnnealing(Heuristic):
+    '''
+    Simulated annealing: at each iteration, a single random move is drawn
+    (an operation switched to another machine or two operations of a machine
+    swapped, as in the neighborhoods) and evaluated in place. It is kept if it
+    improves the solution, else with probability exp(-delta / temperature).
+    The temperature decreases with the iterations (cooling schedule) and
+    goes back up after too many iterations without improvement (reheat).
+    '''
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        self.params = params
+        # Statistics of the last run
+        self.iterations = 0
+        self.iterations_per_second = 0.
+        self.gap = None
+
+    def run(self, instance: Instance, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run: 'nonDeterminist', 'plan_shutdowns'
+          and 'seed' as in FirstNeighborLocalSearch, and
+          'initial_temperature' (default None: set so that half of the degrading
+            moves of the initial solution are accepted),
+          'cooling' (default 'geometric'): cooling schedule, 'geometric' (T0 * alpha^k),
+            'linear' (T0 * (1 - k / max_iterations)) or 'logarithmic' (T0 / log(e + k)),
+            k being the number of iterations since the last (re)heat,
+          'alpha' (default 0.999): factor of the geometric schedule,
+          'reheat_after' (default None): number of iterations without improvement
+            of the best solution after which the temperature is set back to
+            'reheat_ratio' (default 1.0) times the initial temperature,
+          'switch_probability' (default 0.5): probability to draw a machine switch
+            move rather than a swap,
+          'insert' (default True): the machine switch moves insert the operation
+            in the first idle period where it fits (see MachineSwitchMove), so that
+            the operations moved away can be moved back where they were,
+          'max_iterations' (default 10000), 'time_limit' (default None) in seconds,
+          'stop_at_bound' (default True), see FirstNeighborLocalSearch
+        '''
+        self.nonDeterminist = params.get('nonDeterminist', NonDeterminist())
+        cooling = params.get('cooling', 'geometric')
+        alpha = params.get('alpha', 0.999)
+        reheat_after = params.get('reheat_after', None)
+        reheat_ratio = params.get('reheat_ratio', 1.0)
+        switch_probability = params.get('switch_probability', 0.5)
+        insert = params.get('insert', True)
+        max_iterations = params.get('max_iterations', 10000)
+        time_limit = params.get('time_limit', None)
+        if cooling not in _COOLING_SCHEDULES:
+            raise ValueError(f"Unknown cooling schedule {cooling}")
+        rng = python_rng(get_seed(params, self.params))
+
+        start = time.perf_counter()
+        deadline = start + time_limit if time_limit is not None else None
+        bound = LowerBounds(instance).objective
+        stop_at_bound = params.get('stop_at_bound', True)
+        current_solution = self.nonDeterminist.run(instance, _init_params(params, self.params))
+        _init_shutdown_planning(current_solution, params)
+        sampler = _MoveSampler(instance, rng, switch_probability, insert)
+        current_value = current_solution.evaluate
+        best_value = current_value
+        best_state = current_solution.export_state()
+        initial_temperature = params.get('initial_temperature', None)
+        if initial_temperature is None:
+            initial_temperature = _initial_temperature(current_solution, sampler)
+        temperature_0 = initial_temperature
+        heat_iteration = 0
+        best_iteration = 0
+
+        self.iterations = 0
+        while self.iterations < max_iterations:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if stop_at_bound and best_value <= bound:
+                break
+            self.iterations += 1
+            if reheat_after is not None and self.iterations - max(best_iteration, heat_iteration) > reheat_after:
+                temperature_0 = reheat_ratio * initial_temperature
+                heat_iteration = self.iterations
+            temperature = _COOLING_SCHEDULES[cooling](temperature_0, self.iterations - heat_iteration,
+                                                      alpha, max_iterations)
+            move = sampler.sample(current_solution)
+            if move is None or not current_solution.apply_move(move):
+                continue
+            delta = current_solution.evaluate - current_value
+            if delta <= 0 or (temperature > 0 and rng.random() < math.exp(-delta / temperature)):
+                current_solution.commit_move()
+                current_value += delta
+                if current_value < best_value:
+                    best_value = current_value
+                    best_state = current_solution.export_state()
+                    best_iteration = self.iterations
+            else:
+                current_solution.undo_move()
+
+        elapsed = time.perf_counter() - start
+        self.iterations_per_second = self.iterations / elapsed if elapsed > 0 else 0.
+        current_solution.load_state(best_state)
+        self.gap = report_gap(type(self).__name__, best_value, bound)
+        return current_solution
 
 
+class IteratedLocalSearch(Heuristic):
+    '''
+    Iterated local search: a descent with the machine switch and operation
+    order neighborhoods, then cycles of a perturbation (k random moves)
+    followed by a new descent. A cycle is applied as one move (see
+    Solution.apply_move), the moves it makes being nested in it, so that a
+    rejected cycle is rolled back with undo_move at a cost proportional to
+    the operations and machines it touched.
+    '''
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        self.params = params
+        # Number of perturbation and descent cycles done by the last run
+        self.iterations = 0
+        # Optimality gap of the last run (see bounds.gap)
+        self.gap = None
+
+    def run(self, instance: Instance, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run, see BestNeighborLocalSearch, and
+          'perturbation_size' (default 3): number of random moves of a perturbation,
+          'acceptance' (default 'better'): the cycles kept, 'better' if they do not
+            degrade the current solution, 'threshold' if they give a solution at most
+            'threshold' (default 0.02) times worse than the best one, 'always',
+          'max_iterations' (default 100), 'max_stagnation' (default 20): number of
+            cycles without improvement of the best solution, 'time_limit' (default None),
+          'stop_at_bound' (default True), see FirstNeighborLocalSearch
+        '''
+        self.nonDeterminist = params.get('nonDeterminist', NonDeterminist())
+        self.machineSwitchNeighborhood = params.get('machineSwitchNeighborhood',
+                                                    MachineSwitchNeighborhood(instance))
+        self.operationOrderNeighborhood = params.get('operationOrderNeighborhood',
+                                                     OperationOrderNeighborhood(instance))
+        perturbation_size = params.get('perturbation_size', 3)
+        acceptance = params.get('acceptance', 'better')
+        threshold = params.get('threshold', 0.02)
+        max_iterations = params.get('max_iterations', 100)
+        max_stagnation = params.get('max_stagnation', 20)
+        time_limit = params.get('time_limit', None)
+        if acceptance not in ('better', 'threshold', 'always'):
+            raise ValueError(f"Unknown acceptance criterion {acceptance}")
+        rng = python_rng(get_seed(params, self.params))
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        bound = LowerBounds(instance).objective
+        stop_at_bound = params.get('stop_at_bound', True)
+        neighborhoods = (self.machineSwitchNeighborhood, self.operationOrderNeighborhood)
+
+        current_solution = self.nonDeterminist.run(instance, _init_params(params, self.params))
+        _init_shutdown_planning(current_solution, params)
+        _descent(current_solution, neighborhoods, deadline)
+        cycle = _PerturbationDescent(_MoveSampler(instance, rng, 0.5, True), perturbation_size, neighborhoods,
+                                     deadline)
+        current_value = current_solution.evaluate
+        best_value = current_value
+        best_state = current_solution.export_state()
+        stagnation = 0
+
+        self.iterations = 0
+        while self.iterations < max_iterations and stagnation < max_stagnation:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+            if stop_at_bound and best_value <= bound:
+                break
+            self.iterations += 1
+            current_solution.apply_move(cycle)
+            value = current_solution.evaluate
+            if (value <= current_value or acceptance == 'always'
+                    or (acceptance == 'threshold' and value <= best_value * (1 + threshold))):
+                current_solution.commit_move()
+                current_value = value
+            else:
+                current_solution.undo_move()
+            if current_value < best_value:
+                best_value = current_value
+                best_state = current_solution.export_state()
+                stagnation = 0
+            else:
+                stagnation += 1
+
+        current_solution.load_state(best_state)
+        self.gap = report_gap(type(self).__name__, best_value, bound)
+        return current_solution
+
+
+class _PerturbationDescent(Move):
+    '''
+    Cycle of the iterated local search: random moves, then a descent.
+    '''
+
+    def __init__(self, sampler: '_MoveSampler', perturbation_size: int, neighborhoods,
+                 deadline: float = None):
+        self._sampler = sampler
+        self._perturbation_size = perturbation_size
+        self._neighborhoods = neighborhoods
+        self._deadline = deadline
+
+    def apply(self, sol) -> bool:
+        for _ in range(self._perturbation_size):
+            move = self._sampler.sample(sol)
+            if move is not None and sol.apply_move(move):
+                sol.commit_move()
+        _descent(sol, self._neighborhoods, self._deadline)
+        return True
+
+
+def _descent(sol: Solution, neighborhoods, deadline: float = None):
+    '''
+    Applies improving moves of the neighborhoods until none improves the solution,
+    or until the deadline (time.perf_counter value) if any, which also stops the
+    scans of the neighborhoods (see first_better_neighbor).
+    '''
+    improved = True
+    while improved:
+        if deadline is not None and time.perf_counter() >= deadline:
+            break
+        value = sol.evaluate
+        for neighborhood in neighborhoods:
+            neighborhood.first_better_neighbor(sol, deadline)
+        improved = sol.evaluate < value
+
+
+# Temperature after k iterations, from the initial temperature t0
+_COOLING_SCHEDULES = {
+    'geometric': lambda t0, k, alpha, max_iterations: t0 * alpha ** k,
+    'linear': lambda t0, k, alpha, max_iterations: t0 * max(0., 1. - k / max_iterations),
+    'logarithmic': lambda t0, k, alpha, max_iterations: t0 / math.log(math.e + k),
+}
+
+
+# Number of machines drawn at most for a swap before the machines with
+# at least two operations are listed
+_SWAP_DRAWS = 8
+
+
+class _MoveSampler(object):
+    '''
+    Draws random moves of the machine switch and operation order neighborhoods
+    without building them all, in constant expected time: the machines are drawn
+    by index, and drawn again when they cannot give a move.
+    '''
+
+    def __init__(self, instance: Instance, rng, switch_probability: float, insert: bool):
+        self._instance = instance
+        self._rng = rng
+        self._switch_probability = switch_probability
+        self._insert = insert
+        self._operations = instance.operations
+        self._positions = {op: i for i, op in enumerate(instance.operations)}
+        # Machines able to process each operation
+        self._eligible_machines = [[machine for machine in instance.machines
+                                    if machine.machine_id in op.processing_times]
+                                   for op in instance.operations]
+
+    def sample(self, sol: Solution) -> Move:
+        '''
+        Returns a random move for the solution, None if none was found.
+        '''
+        if self._rng.random() < self._switch_probability:
+            return self._switch_move() or self._swap_move()
+        return self._swap_move() or self._switch_move()
+
+    def _switch_move(self) -> MachineSwitchMove:
+        position = self._rng.randrange(len(self._operations))
+        operation = self._operations[position]
+        machines = self._eligible_machines[position]
+        if not machines or (len(machines) == 1 and machines[0].machine_id == operation.assigned_to):
+            return None
+        # Au plus une machine éligible est la machine courante : nouveau tirage dans ce cas
+        machine = machines[self._rng.randrange(len(machines))]
+        while machine.machine_id == operation.assigned_to:
+            machine = machines[self._rng.randrange(len(machines))]
+        return MachineSwitchMove(operation, machine, self._insert)
+
+    def _swap_move(self) -> SwapMove:
+        machines = self._instance.machines
+        if not machines:
+            return None
+        for _ in range(_SWAP_DRAWS):
+            machine = machines[self._rng.randrange(len(machines))]
+            if len(machine.scheduled_operations) >= 2:
+                break
+        else:
+            # Peu de machines ont deux opérations : tirage parmi elles
+            machines = [machine for machine in machines if len(machine.scheduled_operations) >= 2]
+            if not machines:
+                return None
+            machine = self._rng.choice(machines)
+        # Dans l'ordre de l'instance, comme OperationOrderNeighborhood
+        op1, op2 = sorted(self._rng.sample(machine.scheduled_operations, 2), key=self._positions.get)
+        return SwapMove(op1, op2, machine)
+
+
+def _initial_temperature(sol: Solution, sampler: _MoveSampler, nb_samples: int = 50) -> float:
+    '''
+    Returns the temperature at which a degrading move of average delta
+    is accepted with probability 1/2, from moves drawn around the solution.
+    '''
+    value = sol.evaluate
+    deltas = []
+    for _ in range(nb_samples):
+        move = sampler.sample(sol)
+        if move is None or not sol.apply_move(move):
+            continue
+        delta = sol.evaluate - value
+        sol.undo_move()
+        if 0 < delta < sys.maxsize // 2:
+            deltas.append(delta)
+    if not deltas:
+        return 1.
+    return (sum(deltas) / len(deltas)) / math.log(2)
+
+
+def _attribute(move: Move):
+    '''
+    Returns the tabu attribute of the solutions obtained with the move.
+    '''
+    if isinstance(move, MachineSwitchMove):
+        operation = move.operation
+        return ('machine', operation.job_id, operation.operation_id, move.machine.machine_id)
+    return ('order', frozenset(((move.operation1.job_id, move.operation1.operation_id),
+                                (move.operation2.job_id, move.operation2.operation_id))))
+
+
+def _reverse_attribute(move: Move):
+    '''
+    Returns the tabu attribute of the moves undoing the move,
+    computed before it is applied.
+    '''
+    if isinstance(move, MachineSwitchMove):
+        operation = move.operation
+        return ('machine', operation.job_id, operation.operation_id, operation.assigned_to)
+    return _attribute(move)
+
+
+def _init_params(params: Dict, default_params: Dict) -> Dict:
+    '''
+    Returns the parameters of the heuristic computing the initial solution:
+    the seed of the local search if it has one.
+    '''
+    seed = get_seed(params, default_params)
+    return dict() if seed is None else {'seed': seed}
+
+
+def _init_shutdown_planning(solution: Solution, params: Dict):
+    '''
+    Plans the machine shutdowns of the solution and of all its neighbors
+    if params['plan_shutdowns'] is True.
+    '''
+    if params.get('plan_shutdowns', False):
+        solution.shutdown_planning = True
+        solution.plan_shutdowns()
+
 
 if __name__ == "__main__":
     # To play with the heuristics
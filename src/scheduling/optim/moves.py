@@ -0,0 +1,150 @@
+'''
+Moves applied by the neighborhoods on a solution.
+A move changes a solution in place through Solution.apply_move,
+and can then be rolled back with Solution.undo_move.
+'''
+from src.scheduling.instance.machine import Machine
+from src.scheduling.instance.operation import Operation
+
+
+class Move(object):
+    '''
+    Base move class.
+    '''
+
+    def apply(self, sol) -> bool:
+        '''
+        Modifies the solution using Solution.schedule and Solution.unschedule.
+        Returns False if the move cannot be applied on the solution.
+        Must be called through Solution.apply_move.
+        '''
+        raise NotImplementedError
+
+
+class MachineSwitchMove(Move):
+    '''
+    Moves an operation at the end of the planning of another machine,
+    or in its first idle period long enough if insert is True.
+    The move cannot be applied if the operation then ends after the start
+    of its successor.
+    '''
+
+    def __init__(self, operation: Operation, machine: Machine, insert: bool = False):
+        '''
+        Constructor
+        '''
+        self.operation = operation
+        self.machine = machine
+        self.insert = insert
+
+    def apply(self, sol) -> bool:
+        operation = self.operation
+        machine = self.machine
+        if operation.assigned_to == machine.machine_id:
+            return False
+        if machine.machine_id not in operation.processing_times:
+            return False
+        sol.unschedule(operation)
+        if not sol.is_available(operation):
+            return False
+        if self.insert:
+            sol.insert(operation, machine)
+        else:
+            sol.schedule(operation, machine)
+        return sol.respects_precedences(operation)
+
+    def __str__(self):
+        return f"{self.operation}->{self.machine}"
+
+    def __repr__(self):
+        return str(self)
+
+
+class SwapMove(Move):
+    '''
+    Swaps two operations of a machine: both are planned again
+    at the end of the machine, the second one first.
+    The move cannot be applied if one of them then ends after the start
+    of its successor.
+    '''
+
+    def __init__(self, operation1: Operation, operation2: Operation, machine: Machine):
+        '''
+        Constructor
+        '''
+        self.operation1 = operation1
+        self.operation2 = operation2
+        self.machine = machine
+
+    def apply(self, sol) -> bool:
+        op1 = self.operation1
+        op2 = self.operation2
+        if op1.job_id == op2.job_id:
+            job_ops = sol.inst.get_job(op1.job_id).operations
+            # On ne peut inverser que si op2 précède directement op1 dans le job
+            if job_ops.index(op1) != job_ops.index(op2) + 1:
+                return False
+
+        sol.unschedule(op1)
+        sol.unschedule(op2)
+        # Réassigner dans l'ordre inverse
+        for operation in (op2, op1):
+            if not sol.is_available(operation):
+                return False
+            sol.schedule(operation, self.machine)
+        return sol.respects_precedences(op1) and sol.respects_precedences(op2)
+
+    def __str__(self):
+        return f"{self.operation1}<->{self.operation2}@{self.machine}"
+
+    def __repr__(self):
+        return str(self)
+
+
+class AdjacentSwapMove(Move):
+    '''
+    Interchanges two operations processed one right after the other on a machine,
+    in place: the second one takes the place of the first one, then the first one
+    and the following operations of the machine are planned again, in the same
+    order, as early as possible.
+    The move cannot be applied if the operations are of the same job, or if an
+    operation planned again then ends after the start of its successor.
+    '''
+
+    def __init__(self, operation1: Operation, operation2: Operation, machine: Machine):
+        '''
+        Constructor
+        @param operation1: operation processed right before operation2 on the machine
+        '''
+        self.operation1 = operation1
+        self.operation2 = operation2
+        self.machine = machine
+
+    def apply(self, sol) -> bool:
+        op1 = self.operation1
+        op2 = self.operation2
+        if op1.job_id == op2.job_id:
+            return False
+        sequence = self.machine.scheduled_operations
+        if op1 not in sequence:
+            return False
+        position = sequence.index(op1)
+        if position + 1 >= len(sequence) or sequence[position + 1] is not op2:
+            return False
+
+        # Les opérations suivantes de la machine sont replanifiées derrière les deux échangées
+        following = sequence[position + 2:]
+        for operation in [op1, op2] + following:
+            sol.unschedule(operation)
+        replanned = [op2, op1] + following
+        for operation in replanned:
+            if not sol.is_available(operation):
+                return False
+            sol.schedule(operation, self.machine)
+        return all(sol.respects_precedences(operation) for operation in replanned)
+
+    def __str__(self):
+        return f"{self.operation1}<>{self.operation2}@{self.machine}"
+
+    def __repr__(self):
+        return str(self)
@@ -0,0 +1,153 @@
+'''
+Multi-start heuristic: independent seeded runs of a heuristic,
+spread over a pool of processes.
+
+@author: Vassilissa Lehoux
+'''
+import multiprocessing
+import os
+import sys
+import time
+from functools import partial
+from typing import Dict, List
+
+from src.scheduling.bounds import LowerBounds, report_gap
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+from src.scheduling.optim.heuristics import Heuristic
+from src.scheduling.optim.local_search import FirstNeighborLocalSearch
+from src.scheduling.optim.rng import child_seeds
+
+
+# Instance of a worker process, set by _init_worker
+_worker_instance = None
+
+
+def _init_worker(instance: Instance):
+    '''
+    Receives the instance, once per worker process.
+    '''
+    global _worker_instance
+    _worker_instance = instance
+
+
+def _seeded_run(heuristic: Heuristic, params: Dict, seed: int, deadline: float = None,
+                instance: Instance = None):
+    '''
+    Runs the heuristic with the given seed, and the time left before the deadline
+    (time.time value, shared by the processes) as time limit if there is one.
+    Returns (seed, value, runtime, solution state), see Solution.export_state.
+    '''
+    instance = instance if instance is not None else _worker_instance
+    params = dict(params, seed=seed)
+    if deadline is not None:
+        params['time_limit'] = max(0., deadline - time.time())
+    start = time.perf_counter()
+    solution = heuristic.run(instance, params)
+    runtime = time.perf_counter() - start
+    return seed, solution.evaluate, runtime, solution.export_state()
+
+
+class MultiStart(Heuristic):
+    '''
+    Runs a heuristic from several seeds and keeps the best solution.
+    The runs are independent and done in parallel by worker processes,
+    which receive the instance once, and which are stopped as soon as the
+    result is known.
+    '''
+
+    def __init__(self, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: The parameters of your heuristic method if any as a
+               dictionary. Implementation should provide default values in the function.
+        '''
+        self.params = params
+        # (seed, value, runtime) of the runs, in the order they finished
+        self.runs = []
+        # Optimality gap of the last run (see bounds.gap)
+        self.gap = None
+
+    def run(self, instance: Instance, params: Dict=dict()) -> Solution:
+        '''
+        Computes a solution for the given instance.
+
+        @param instance: the instance to solve
+        @param params: the parameters for the run:
+          'heuristic' (default FirstNeighborLocalSearch()): the heuristic to restart,
+          'heuristic_params' (default {}): its parameters, sent to the workers,
+            so they should not hold objects built on the instance (neighborhoods...),
+          'runs' (default 10): the number of runs,
+          'seed' (default 0): the seeds of the runs are child seeds of it (see rng.child_seeds),
+            a run can be reproduced by running the heuristic with its seed,
+          'workers' (default os.cpu_count()): the number of processes,
+            1 to do the runs in the current process,
+          'time_limit' (default None): wall-clock budget in seconds. Each run gets the
+            time left as its own 'time_limit'. No run is started after it, except the
+            first one, and the worker processes of the runs still in progress are
+            terminated once a run has finished,
+          'callback' (default None): function called with (seed, value, runtime)
+            as each run finishes,
+          'stop_at_bound' (default True): the remaining runs are cancelled once a run
+            reaches the lower bound of the objective (see bounds.LowerBounds)
+        '''
+        heuristic = params.get('heuristic', FirstNeighborLocalSearch())
+        heuristic_params = params.get('heuristic_params', dict())
+        seeds = child_seeds(params.get('seed', 0), params.get('runs', 10))
+        workers = params.get('workers', os.cpu_count() or 1)
+        time_limit = params.get('time_limit', None)
+        callback = params.get('callback', None)
+        deadline = time.time() + time_limit if time_limit is not None else None
+        bound = LowerBounds(instance).objective
+        stop_at_bound = params.get('stop_at_bound', True)
+
+        self.runs = []
+        best = (sys.maxsize, sys.maxsize, None)
+        results = self._results(instance, heuristic, heuristic_params, seeds, workers, deadline)
+        for seed, value, runtime, state in results:
+            self.runs.append((seed, value, runtime))
+            if callback is not None:
+                callback(seed, value, runtime)
+            best = min(best, (value, seed, state), key=lambda result: result[:2])
+            if stop_at_bound and value <= bound:
+                # Annule les runs restants
+                results.close()
+                break
+
+        if best[2] is None:
+            raise ValueError("MultiStart needs at least one run")
+        solution = Solution(instance)
+        solution.load_state(best[2])
+        self.gap = report_gap(type(self).__name__, solution.evaluate, bound)
+        return solution
+
+    def _results(self, instance: Instance, heuristic: Heuristic, params: Dict,
+                 seeds: List[int], workers: int, deadline: float):
+        '''
+        Yields the results of the runs (see _seeded_run) as they finish.
+        After the deadline, waits for the first result if there is none yet.
+        The worker processes are terminated when the generator is closed or
+        returns, so that the runs still in progress stop at once.
+        '''
+        if workers <= 1 or len(seeds) <= 1:
+            for i, seed in enumerate(seeds):
+                if i > 0 and deadline is not None and time.time() >= deadline:
+                    return
+                yield _seeded_run(heuristic, params, seed, deadline, instance)
+            return
+
+        pool = multiprocessing.Pool(min(workers, len(seeds)), initializer=_init_worker, initargs=(instance,))
+        try:
+            results = pool.imap_unordered(partial(_seeded_run, heuristic, params, deadline=deadline), seeds)
+            for i in range(len(seeds)):
+                timeout = None
+                if deadline is not None and i > 0:
+                    timeout = max(0., deadline - time.time())
+                try:
+                    yield results.next(timeout)
+                except multiprocessing.TimeoutError:
+                    return
+        finally:
+            # Les runs encore en cours ne continuent pas en arrière-plan
+            pool.terminate()
+            pool.join()
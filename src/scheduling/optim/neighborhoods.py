@@ -4,11 +4,19 @@ They must derive from the Neighborhood class.
 
 @author: Vassilissa Lehoux
 '''
-import copy
-from typing import Dict
+import sys
+import time
+from typing import Dict, List, Tuple
 
 from src.scheduling.instance.instance import Instance
 from src.scheduling.solution import Solution
+from src.scheduling.optim.moves import AdjacentSwapMove, Move, MachineSwitchMove, SwapMove
+from src.scheduling.optim.parallel import ParallelMoveEvaluator
+from src.scheduling.optim.critical_path import CriticalPath
+
+
+# Number of moves evaluated between two checks of the deadline of a search
+DEADLINE_CHECK_INTERVAL = 200
 
 
 class Neighborhood(object):
@@ -38,7 +46,33 @@ class Neighborhood(object):
         raise "Not implemented error"
 
 
-class MachineSwitchNeighborhood(Neighborhood):
+class _ParallelNeighborhood(Neighborhood):
+    '''
+    Neighborhood whose moves can be evaluated by several processes.
+    '''
+
+    def _init_workers(self, instance: Instance, params: Dict):
+        workers = params.get('workers', 1)
+        self._evaluator = ParallelMoveEvaluator(instance, workers) if workers > 1 else None
+        # The worker processes build the same moves with a sequential neighborhood
+        self._worker_params = dict(params, workers=1)
+
+    def _best_move(self, sol: Solution, moves: List[Move], deadline: float = None) -> Tuple[Move, int]:
+        if self._evaluator is None:
+            return _best_move(sol, moves, deadline)
+        time_left = deadline - time.perf_counter() if deadline is not None else None
+        position, value = self._evaluator.best_move(sol, len(moves), type(self), self._worker_params, time_left)
+        return (moves[position], value) if position >= 0 else (None, sys.maxsize)
+
+    def close(self):
+        '''
+        Stops the worker processes, if any.
+        '''
+        if self._evaluator is not None:
+            self._evaluator.close()
+
+
+class MachineSwitchNeighborhood(_ParallelNeighborhood):
     '''
     Premier voisinage : change la machine sur laquelle s'exécute une opération.
     Taille du voisinage : O(O * (M-1)) où O est le nombre d'opérations et M le nombre de machines.
@@ -47,69 +81,61 @@ class MachineSwitchNeighborhood(Neighborhood):
     def __init__(self, instance: Instance, params: Dict=dict()):
         '''
         Constructor
+        @param params: 'insert' (default False): if True, the operation is inserted
+          in the first idle period of the new machine where it fits instead of
+          being planned at the end of the machine,
+          'workers' (default 1): number of processes evaluating the moves in best_move
         '''
         super().__init__(instance,params)
+        self._insert = params.get('insert', False)
+        self._init_workers(instance, params)
+
+    def moves(self, sol: Solution) -> List[MachineSwitchMove]:
+        '''
+        Returns the moves of the neighborhood of the solution:
+        each operation on each other machine able to process it.
+        '''
+        return [MachineSwitchMove(operation, machine, self._insert)
+                for operation in sol.all_operations
+                for machine in sol.inst.machines
+                if machine.machine_id != operation.assigned_to
+                and machine.machine_id in operation.processing_times]
+
+    def best_move(self, sol: Solution, deadline: float = None) -> Tuple[Move, int]:
+        '''
+        Returns the best move of the neighborhood and the value of the solution
+        once it is applied, or (None, sys.maxsize) if there is no move.
+        The solution is left unchanged.
+        @param deadline: time.perf_counter value after which the moves are no longer
+          evaluated: the best move among those evaluated is returned
+        '''
+        return self._best_move(sol, self.moves(sol), deadline)
 
     def best_neighbor(self, sol: Solution) -> Solution:
         '''
         Returns the best solution in the neighborhood of the solution.
         Can be the solution itself.
+        The best move is applied in place on the solution.
         '''
-        best_solution = sol
-        best_value = sol.evaluate
-
-        for operation in sol.all_operations:
-            current_machine_id = operation.assigned_to
-            for machine in self._instance.machines:
-                if machine.machine_id != current_machine_id:
-                    # Créer une nouvelle solution
-                    neighbor = copy.deepcopy(sol)
-                    # Trouver l'opération correspondante dans la nouvelle solution
-                    op = next(op for op in neighbor.all_operations if op.operation_id == operation.operation_id)
-                    # Réassigner l'opération à la nouvelle machine
-                    # we need to remove the operation from the current machine
-                    current_machine = next((m for m in neighbor.inst.machines if m.machine_id == current_machine_id), None)
-                    if current_machine is not None:
-                        current_machine.remove_operation(op)
-                    op.reset()
-                    neighbor.schedule(op, machine)
-
-                    # Évaluer le voisin
-                    neighbor_value = neighbor.evaluate
-                    if neighbor_value <= best_value:
-                        best_solution = neighbor
-                        best_value = neighbor_value
-
-        return best_solution
-
-    def first_better_neighbor(self, sol: Solution) -> Solution:
+        move, value = self.best_move(sol)
+        if move is not None and value <= sol.evaluate:
+            sol.apply_move(move)
+            sol.commit_move()
+        return sol
+
+    def first_better_neighbor(self, sol: Solution, deadline: float = None) -> Solution:
         '''
         Returns the first solution in the neighborhood of the solution
         that improves other it and the solution itself if none is better.
+        The improving move is applied in place on the solution.
+        @param deadline: time.perf_counter value after which the moves are no longer
+          tried, None for no limit
         '''
-        current_value = sol.evaluate
-
-        for operation in sol.all_operations:
-            current_machine_id = operation.assigned_to
-            for machine in self._instance.machines:
-                if machine.machine_id != current_machine_id:
-                    neighbor = copy.deepcopy(sol)
-                    op = next(op for op in neighbor.all_operations if op.operation_id == operation.operation_id)
-                    # Retirer l'opération de la machine d'origine dans la copie
-                    current_machine = next((m for m in neighbor.inst.machines if m.machine_id == current_machine_id), None)
-                    if current_machine is not None:
-                        current_machine.remove_operation(op)
-                    op.reset()
-                    neighbor.schedule(op, machine)
-
-                    if neighbor.evaluate < current_value:
-                        return neighbor
-
-        return sol
+        return _first_better_neighbor(sol, self.moves(sol), deadline)
 
 
 
-class OperationOrderNeighborhood(Neighborhood):
+class OperationOrderNeighborhood(_ParallelNeighborhood):
     '''
     Deuxième voisinage : Permutations d'ordre sur une machine.
     Taille du voisinage : O(N^2) dans le pire cas, où N est le nombre total d'opérations.
@@ -119,94 +145,172 @@ class OperationOrderNeighborhood(Neighborhood):
     def __init__(self, instance: Instance, params: Dict=dict()):
         '''
         Constructor
+        @param params: 'workers' (default 1): number of processes evaluating the moves in best_move
         '''
         super().__init__(instance, params)
+        self._init_workers(instance, params)
 
-    def best_neighbor(self, sol: Solution) -> Solution:
+    def moves(self, sol: Solution) -> List[SwapMove]:
         '''
-        Returns the best solution in the neighborhood of the solution.
-        Can be the solution itself.
+        Returns the moves of the neighborhood of the solution:
+        each pair of operations planned on the same machine.
         '''
-        best_solution = copy.deepcopy(sol)
-        best_value = best_solution.evaluate
-
-        for machine in self._instance.machines:
+        moves = []
+        for machine in sol.inst.machines:
             machine_ops = [op for op in sol.all_operations if op.assigned_to == machine.machine_id]
             for i in range(len(machine_ops)):
                 for j in range(i + 1, len(machine_ops)):
-                    neighbor = _create_neighbor_solution(sol, machine_ops[i], machine_ops[j], machine)
-                    # On ignore les voisins identiques à la solution initiale
-                    if neighbor is sol:
-                        continue
-                    neighbor_value = neighbor.evaluate
-                    if neighbor_value < best_value:
-                        best_solution = neighbor
-                        best_value = neighbor_value
+                    moves.append(SwapMove(machine_ops[i], machine_ops[j], machine))
+        return moves
 
-        return best_solution
+    def best_move(self, sol: Solution, deadline: float = None) -> Tuple[Move, int]:
+        '''
+        Returns the best move of the neighborhood and the value of the solution
+        once it is applied, or (None, sys.maxsize) if there is no move.
+        The solution is left unchanged.
+        @param deadline: time.perf_counter value after which the moves are no longer
+          evaluated: the best move among those evaluated is returned
+        '''
+        return self._best_move(sol, self.moves(sol), deadline)
+
+    def best_neighbor(self, sol: Solution) -> Solution:
+        '''
+        Returns the best solution in the neighborhood of the solution.
+        Can be the solution itself.
+        The best move is applied in place on the solution.
+        '''
+        move, value = self.best_move(sol)
+        if move is not None and value < sol.evaluate:
+            sol.apply_move(move)
+            sol.commit_move()
+        return sol
 
-    def first_better_neighbor(self, sol: Solution) -> Solution:
+    def first_better_neighbor(self, sol: Solution, deadline: float = None) -> Solution:
         '''
         Returns the first solution in the neighborhood of the solution
         that improves other it and the solution itself if none is better.
+        The improving move is applied in place on the solution.
+        @param deadline: time.perf_counter value after which the moves are no longer
+          tried, None for no limit
         '''
-        sol_copy = copy.deepcopy(sol)
-        current_value = sol_copy.evaluate
+        return _first_better_neighbor(sol, self.moves(sol), deadline)
 
-        for machine in self._instance.machines:
-            # Récupérer toutes les opérations sur cette machine
-            machine_ops = [op for op in sol_copy.all_operations if op.assigned_to == machine.machine_id]
 
-            # Pour chaque paire d'opérations sur la machine
-            for i in range(len(machine_ops)):
-                for j in range(i + 1, len(machine_ops)):
-                    neighbor = _create_neighbor_solution(sol_copy, machine_ops[i], machine_ops[j], machine)
-
-                    # Vérifie la faisabilité avant de retourner
-                    if neighbor.is_feasible and neighbor.evaluate < current_value:
-                        return neighbor
-
-        return sol_copy
-
-
-def _create_neighbor_solution(sol: Solution, op1, op2, machine):
+class CriticalBlockNeighborhood(_ParallelNeighborhood):
     '''
-    Helper function to create a neighbor solution by swapping two operations.
+    Troisième voisinage : permutations aux bords des blocs critiques.
+    Only the interchanges of the first two and of the last two operations of
+    each critical block (see CriticalPath) are tried, in place (see
+    AdjacentSwapMove), as in the N5 neighborhood of the job shop: interchanges
+    inside a block cannot shorten the critical path.
+    Taille du voisinage : au plus 2 mouvements par bloc critique.
     '''
 
-    if op1.job_id == op2.job_id:
-        job_ops = [op for op in sol.all_operations if op.job_id == op1.job_id]
-        idx1 = job_ops.index(op1)
-        idx2 = job_ops.index(op2)
-        # On ne peut pas inverser si op1 précède op2 dans le job
-        if abs(idx1 - idx2) == 1:
-            # Si elles sont consécutives, on ne peut inverser que si op2 précède op1
-            if idx1 < idx2:
-                return sol  # On ne fait rien, inversion interdite
-        else:
-            # Si elles ne sont pas consécutives, on ne fait rien pour éviter les incohérences
-            return sol
+    def __init__(self, instance: Instance, params: Dict=dict()):
+        '''
+        Constructor
+        @param params: 'workers' (default 1): number of processes evaluating the moves in best_move
+        '''
+        super().__init__(instance, params)
+        self._init_workers(instance, params)
 
-    neighbor = copy.deepcopy(sol)
+    def moves(self, sol: Solution) -> List[AdjacentSwapMove]:
+        '''
+        Returns the moves of the neighborhood of the solution:
+        the interchanges of the operations at both ends of each critical block.
+        '''
+        moves = []
+        for machine_id, block in CriticalPath(sol).critical_blocks():
+            machine = sol.inst.get_machine(machine_id)
+            moves.append(AdjacentSwapMove(block[0], block[1], machine))
+            if len(block) > 2:
+                moves.append(AdjacentSwapMove(block[-2], block[-1], machine))
+        return moves
+
+    def best_move(self, sol: Solution, deadline: float = None) -> Tuple[Move, int]:
+        '''
+        Returns the best move of the neighborhood and the value of the solution
+        once it is applied, or (None, sys.maxsize) if there is no move.
+        The solution is left unchanged.
+        @param deadline: time.perf_counter value after which the moves are no longer
+          evaluated: the best move among those evaluated is returned
+        '''
+        return self._best_move(sol, self.moves(sol), deadline)
+
+    def best_neighbor(self, sol: Solution) -> Solution:
+        '''
+        Returns the best solution in the neighborhood of the solution.
+        Can be the solution itself.
+        The best move is applied in place on the solution.
+        '''
+        move, value = self.best_move(sol)
+        if move is not None and value < sol.evaluate:
+            sol.apply_move(move)
+            sol.commit_move()
+        return sol
 
+    def first_better_neighbor(self, sol: Solution, deadline: float = None) -> Solution:
+        '''
+        Returns the first solution in the neighborhood of the solution
+        that improves other it and the solution itself if none is better.
+        The improving move is applied in place on the solution.
+        @param deadline: time.perf_counter value after which the moves are no longer
+          tried, None for no limit
+        '''
+        return _first_better_neighbor(sol, self.moves(sol), deadline)
 
-    op1_copy = next(o for o in neighbor.all_operations if o.operation_id == op1.operation_id)
-    op2_copy = next(o for o in neighbor.all_operations if o.operation_id == op2.operation_id)
 
-    machine.remove_operation(op1_copy)
-    machine.remove_operation(op2_copy)
+def _evaluate_move(sol: Solution, move: Move) -> int:
+    '''
+    Returns the value of the solution once the move is applied,
+    or None if the move cannot be applied. The solution is left unchanged.
+    '''
+    if not sol.apply_move(move):
+        return None
+    value = sol.evaluate
+    sol.undo_move()
+    return value
 
-    op1_copy.reset()
-    op2_copy.reset()
 
-    # Les ajouter à available_operations
-    if op1_copy not in neighbor.available_operations:
-        neighbor.available_operations.append(op1_copy)
-    if op2_copy not in neighbor.available_operations:
-        neighbor.available_operations.append(op2_copy)
+def past_deadline(deadline: float, position: int) -> bool:
+    '''
+    Returns True if the deadline (time.perf_counter value, None for no limit)
+    is reached, the clock being read every DEADLINE_CHECK_INTERVAL positions
+    of a scan of moves.
+    '''
+    return deadline is not None and position % DEADLINE_CHECK_INTERVAL == 0 and time.perf_counter() >= deadline
 
-    # Réassigner dans l'ordre inverse
-    neighbor.schedule(op2_copy, machine)
-    neighbor.schedule(op1_copy, machine)
 
-    return neighbor
+def _best_move(sol: Solution, moves: List[Move], deadline: float = None) -> Tuple[Move, int]:
+    '''
+    Returns the move giving the best value and that value.
+    Ties are broken by the position of the move in the list.
+    The moves after the deadline, if any, are not evaluated.
+    '''
+    best_move = None
+    best_value = sys.maxsize
+    for position, move in enumerate(moves):
+        if past_deadline(deadline, position):
+            break
+        value = _evaluate_move(sol, move)
+        if value is not None and (best_move is None or value < best_value):
+            best_move = move
+            best_value = value
+    return best_move, best_value
+
+
+def _first_better_neighbor(sol: Solution, moves: List[Move], deadline: float = None) -> Solution:
+    '''
+    Applies the first move improving the solution, if any before the deadline.
+    '''
+    current_value = sol.evaluate
+    for position, move in enumerate(moves):
+        if past_deadline(deadline, position):
+            break
+        if not sol.apply_move(move):
+            continue
+        if sol.evaluate < current_value:
+            sol.commit_move()
+            return sol
+        sol.undo_move()
+    return sol
@@ -0,0 +1,115 @@
+'''
+Evaluation of the moves of a neighborhood across a pool of processes.
+
+The instance is sent once to each worker process. For each evaluation,
+the workers receive the state of the solution (see Solution.export_state)
+and ranges of positions in the list of moves, which they build again
+from the same state.
+'''
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Tuple
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.solution import Solution
+
+
+# Number of ranges of moves per worker, to balance the load
+CHUNKS_PER_WORKER = 4
+
+# Number of moves evaluated between two checks of the deadline
+DEADLINE_CHECK_INTERVAL = 200
+
+# State of a worker process
+_worker_solution = None
+_worker_call = None
+_worker_moves = None
+
+
+def _init_worker(instance: Instance):
+    '''
+    Receives the instance, once per worker process.
+    '''
+    global _worker_solution
+    _worker_solution = Solution(instance)
+
+
+def _best_in_range(neighborhood_class, params: Dict, call: int, state, begin: int, end: int,
+                   deadline: float = None) -> Tuple[int, int]:
+    '''
+    Returns the best (value, position) of the moves at positions [begin, end)
+    of the neighborhood of the solution state, or (sys.maxsize, -1)
+    if none can be applied. The moves are built once per call.
+    The moves after the deadline (time.time value), if any, are not evaluated.
+    '''
+    global _worker_call, _worker_moves
+    sol = _worker_solution
+    if call != _worker_call:
+        sol.load_state(state)
+        _worker_moves = neighborhood_class(sol.inst, params).moves(sol)
+        _worker_call = call
+    best = (sys.maxsize, -1)
+    for position in range(begin, end):
+        if deadline is not None and (position - begin) % DEADLINE_CHECK_INTERVAL == 0 and time.time() >= deadline:
+            break
+        if not sol.apply_move(_worker_moves[position]):
+            continue
+        value = sol.evaluate
+        sol.undo_move()
+        if best[1] < 0 or value < best[0]:
+            best = (value, position)
+    return best
+
+
+class ParallelMoveEvaluator(object):
+    '''
+    Finds the best move of a neighborhood with a pool of worker processes,
+    started at the first evaluation.
+    '''
+
+    def __init__(self, instance: Instance, workers: int):
+        '''
+        Constructor
+        @param workers: number of worker processes
+        '''
+        self._instance = instance
+        self._workers = workers
+        self._executor = None
+        self._calls = 0
+
+    def best_move(self, sol: Solution, nb_moves: int, neighborhood_class, params: Dict,
+                  time_left: float = None) -> Tuple[int, int]:
+        '''
+        Returns the position of the best move of the neighborhood and the value
+        of the solution once it is applied, or (-1, sys.maxsize) if no move
+        can be applied. Ties are broken by the position of the move, so the
+        result is the same as a sequential evaluation.
+        @param nb_moves: number of moves returned by neighborhood_class(instance, params).moves(sol)
+        @param time_left: seconds after which the workers stop evaluating moves, None for no limit:
+          the best of the moves evaluated is then returned
+        '''
+        if nb_moves == 0:
+            return -1, sys.maxsize
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self._workers, initializer=_init_worker,
+                                                 initargs=(self._instance,))
+        self._calls += 1
+        state = sol.export_state()
+        # Horloge commune aux processus
+        deadline = time.time() + time_left if time_left is not None else None
+        size = -(-nb_moves // (self._workers * CHUNKS_PER_WORKER))
+        futures = [self._executor.submit(_best_in_range, neighborhood_class, params, self._calls,
+                                         state, begin, min(begin + size, nb_moves), deadline)
+                   for begin in range(0, nb_moves, size)]
+        results = [future.result() for future in futures]
+        value, position = min((result for result in results if result[1] >= 0), default=(sys.maxsize, -1))
+        return position, value
+
+    def close(self):
+        '''
+        Stops the worker processes.
+        '''
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,44 @@
+'''
+Random number generators of the stochastic heuristics.
+
+A heuristic reads its seed from the 'seed' entry of its parameters and
+draws from its own generator, never from the global random modules,
+so that a run can be reproduced from its seed.
+'''
+import random
+from typing import Dict, List
+
+import numpy as np
+
+
+def get_seed(params: Dict, default_params: Dict = dict()):
+    '''
+    Returns the 'seed' of the run parameters, or else of the parameters
+    given to the constructor of the heuristic. None if there is none:
+    the runs are then not reproducible.
+    '''
+    return params.get('seed', default_params.get('seed', None))
+
+
+def python_rng(seed=None) -> random.Random:
+    '''
+    Returns a random.Random generator seeded with seed (an int or None).
+    '''
+    return random.Random(seed)
+
+
+def numpy_rng(seed=None) -> np.random.Generator:
+    '''
+    Returns a NumPy generator seeded with seed (an int or None).
+    '''
+    return np.random.default_rng(seed)
+
+
+def child_seeds(seed, nb_children: int) -> List[int]:
+    '''
+    Returns the seeds of nb_children independent random streams derived from seed,
+    e.g. for the restarts of a heuristic run in parallel.
+    The same seed always gives the same child seeds.
+    '''
+    children = np.random.SeedSequence(seed).spawn(nb_children)
+    return [int(child.generate_state(1, np.uint64)[0]) for child in children]
@@ -1,3 +1,7 @@
+'''
+Compares the heuristics on jsp_easy.
+For timings on larger generated instances, see benchmarks.runner.
+'''
 import time
 from src.scheduling.instance.instance import Instance
 from src.scheduling.optim.constructive import Greedy, NonDeterminist
@@ -5,39 +9,45 @@ from src.scheduling.optim.local_search import FirstNeighborLocalSearch, BestNeig
 from src.scheduling.optim.neighborhoods import MachineSwitchNeighborhood, OperationOrderNeighborhood
 
 N_RUNS = 10
-instance = Instance.from_file("src/scheduling/tests/data/jsp_easy")
 
-# Greedy
-start = time.time()
-greedy = Greedy()
-sol_greedy = greedy.run(instance)
-greedy_time = time.time() - start
-greedy_obj = sol_greedy.objective
 
-# FirstNeighborLocalSearch
-best_fnls_obj = float('inf')
-fnls_time = 0
-for _ in range(N_RUNS):
-    start = time.time()
-    fnls = FirstNeighborLocalSearch()
-    sol = fnls.run(instance, NonDeterminist(), MachineSwitchNeighborhood(instance))
-    fnls_time += time.time() - start
-    if sol.is_feasible and sol.objective < best_fnls_obj:
-        best_fnls_obj = sol.objective
-fnls_time /= N_RUNS
+if __name__ == "__main__":
+    instance = Instance.from_file("src/scheduling/tests/data/jsp_easy")
 
-# BestNeighborLocalSearch
-best_bnls_obj = float('inf')
-bnls_time = 0
-for _ in range(N_RUNS):
+    # Greedy
     start = time.time()
-    bnls = BestNeighborLocalSearch()
-    sol = bnls.run(instance, NonDeterminist(), OperationOrderNeighborhood(instance), MachineSwitchNeighborhood(instance))
-    bnls_time += time.time() - start
-    if sol.is_feasible and sol.objective < best_bnls_obj:
-        best_bnls_obj = sol.objective
-bnls_time /= N_RUNS
+    greedy = Greedy()
+    sol_greedy = greedy.run(instance)
+    greedy_time = time.time() - start
+    greedy_obj = sol_greedy.objective
+
+    # FirstNeighborLocalSearch
+    best_fnls_obj = float('inf')
+    fnls_time = 0
+    for _ in range(N_RUNS):
+        start = time.time()
+        fnls = FirstNeighborLocalSearch()
+        sol = fnls.run(instance, {'nonDeterminist': NonDeterminist(),
+                                  'machineSwitchNeighborhood': MachineSwitchNeighborhood(instance)})
+        fnls_time += time.time() - start
+        if sol.is_feasible and sol.objective < best_fnls_obj:
+            best_fnls_obj = sol.objective
+    fnls_time /= N_RUNS
+
+    # BestNeighborLocalSearch
+    best_bnls_obj = float('inf')
+    bnls_time = 0
+    for _ in range(N_RUNS):
+        start = time.time()
+        bnls = BestNeighborLocalSearch()
+        sol = bnls.run(instance, {'nonDeterminist': NonDeterminist(),
+                                  'operationOrderNeighborhood': OperationOrderNeighborhood(instance),
+                                  'machineSwitchNeighborhood': MachineSwitchNeighborhood(instance)})
+        bnls_time += time.time() - start
+        if sol.is_feasible and sol.objective < best_bnls_obj:
+            best_bnls_obj = sol.objective
+    bnls_time /= N_RUNS
 
-print(f"Greedy: obj={greedy_obj}, time={greedy_time:.4f}s")
-print(f"FirstNeighborLocalSearch: best obj={best_fnls_obj}, avg time={fnls_time:.4f}s")
-print(f"BestNeighborLocalSearch: best obj={best_bnls_obj}, avg time={bnls_time:.4f}s")
\ No newline at end of file
+    print(f"Greedy: obj={greedy_obj}, time={greedy_time:.4f}s")
+    print(f"FirstNeighborLocalSearch: best obj={best_fnls_obj}, avg time={fnls_time:.4f}s")
+    print(f"BestNeighborLocalSearch: best obj={best_bnls_obj}, avg time={bnls_time:.4f}s")
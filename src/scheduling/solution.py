@@ -4,18 +4,52 @@ Object containing the solution to the optimization problem.
 @author: Vassilissa Lehoux
 '''
 import csv
+import gzip
 import math
 import os
 import sys
-from typing import List
-from matplotlib import pyplot as plt
+import warnings
+from functools import partial
+from typing import Dict, List
+
+import numpy as np
 
 from src.scheduling.instance.machine import Machine
 from src.scheduling.instance.instance import Instance
 from src.scheduling.instance.operation import Operation
 
-from matplotlib import colormaps
-from src.scheduling.instance.machine import Machine
+
+OPERATION_COLUMNS = ["operation_id", "machine_id", "start_time"]
+MACHINE_COLUMNS = ["machine_id", "start_time", "stop_time"]
+
+_BINARY_MAGIC = 0x534F4C  # "SOL"
+_BINARY_VERSION = 1
+_HEADER_SIZE = 4
+
+
+def _open_text(path, mode):
+    '''
+    Opens a text file with a large buffer, compressed with gzip if its name ends with .gz.
+    '''
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", newline="")
+    return open(path, mode, newline="", buffering=1 << 20)
+
+
+def _read_columns(path, columns):
+    '''
+    Returns the given columns of a csv file of integers with a header, as an int64 array.
+    '''
+    with _open_text(path, "r") as f:
+        header = [name.strip() for name in f.readline().strip().split(",")]
+        try:
+            indexes = [header.index(column) for column in columns]
+        except ValueError:
+            raise ValueError(f"{path} should have the columns {columns}, not {header}")
+        with warnings.catch_warnings():
+            # Fichier sans lignes (aucune opération planifiée)
+            warnings.simplefilter("ignore", UserWarning)
+            return np.loadtxt(f, delimiter=",", dtype=np.int64, usecols=indexes, ndmin=2)
 
 
 class Solution(object):
@@ -28,7 +62,13 @@ class Solution(object):
         Constructor
         '''
         self._instance = instance
-        self._operations = {op: None for op in instance.operations}
+        self._journal = []
+        # Machines recording their changes for the moves being applied
+        self._journaled_machines = {}
+        # If True, the on/off periods of a machine are planned again
+        # each time its operations change (see plan_shutdowns)
+        self.shutdown_planning = False
+        self.reset()
 
 
     @property
@@ -43,15 +83,76 @@ class Solution(object):
         '''
         Resets the solution: everything needs to be replanned
         '''
+        self._clear()
+        self._init_available()
+
+    def _clear(self):
+        '''
+        Unschedules every operation, without updating the available operations.
+        '''
+        for job in self._instance.jobs:
+            job.reset()
+        for machine in self._instance.machines:
+            machine.reset()
         self._operations = {op: None for op in self._instance.operations}
+        self._journal = []
+        self._stop_journals()
+        self._violations = 0
 
     @property
     def is_feasible(self) -> bool:
         '''
-        Returns True if the solution respects the constraints.
-        To call this function, all the operations must be planned.
+        Returns True if the solution respects the constraints:
+        all the operations are planned, each one after the end of its predecessor.
+        Operations ending after the end time of their machine are allowed:
+        the machine runs overtime, which counts in its energy (see Machine).
         '''
-        return all(op.assigned for op in self.all_operations)
+        nb_scheduled = sum(len(machine.scheduled_operations) for machine in self._instance.machines)
+        return nb_scheduled == self._instance.nb_operations and self._violations == 0
+
+    @property
+    def violated_precedences(self) -> int:
+        '''
+        Returns the number of planned operations starting before the end of their
+        planned predecessor. Updated by schedule, insert and unschedule.
+        '''
+        return self._violations
+
+    def respects_precedences(self, operation: Operation) -> bool:
+        '''
+        Returns True if the planned operation starts after the end of its predecessors
+        and ends before the start of its planned successors.
+        '''
+        return self._violated_arcs(operation) == 0
+
+    def _violated_arcs(self, operation: Operation) -> int:
+        '''
+        Returns the number of precedence constraints between the planned operation
+        and its planned predecessors and successors that are violated.
+        '''
+        start_time = operation.start_time
+        end_time = operation.end_time
+        count = 0
+        for pred in operation.predecessors:
+            if pred.assigned and pred.end_time > start_time:
+                count += 1
+        for successor in operation.successors:
+            if successor.assigned and successor.start_time < end_time:
+                count += 1
+        return count
+
+    def _count_violations(self) -> int:
+        '''
+        Counts the violated precedence constraints of the whole planning,
+        the predecessors being found with the operation index of the instance arrays.
+        '''
+        operations = self._instance.operations
+        count = 0
+        for op, pred in zip(operations, self._instance.as_arrays().tolist('predecessors')):
+            if pred >= 0 and op.assigned and operations[pred].assigned \
+                    and operations[pred].end_time > op.start_time:
+                count += 1
+        return count
 
     @property
     def evaluate(self) -> int:
@@ -81,7 +182,7 @@ class Solution(object):
         return the result as an integer
         '''
 
-        total_processing_time = sum(op.end_time - op.start_time for op in self._operations.keys() if op.assigned)
+        total_processing_time = sum(machine.processing_time for machine in self._instance.machines)
         total_jobs = len(self._instance.jobs)
         if total_jobs == 0:
             return 0
@@ -93,7 +194,7 @@ class Solution(object):
         '''
         Returns the maximum completion time of a job
         '''
-        return max(op.end_time for op in self._operations.keys())
+        return max((machine.completion_time for machine in self._instance.machines), default=0)
 
     @property
     def sum_ci(self) -> int:
@@ -116,7 +217,7 @@ class Solution(object):
         '''
         return ""
 
-    def to_csv(self, folder_path="output"):
+    def to_csv(self, folder_path="output", compress=False):
         '''
         Save the solution to a csv files with the following formats:
         Operation file:
@@ -126,57 +227,97 @@ class Solution(object):
         Machine file:
           One line per pair of (start time, stop time) for the machine
           header: "machine_id, start_time, stop_time"
+        @param compress: if True, the files are compressed with gzip
+          (operations.csv.gz and machines.csv.gz)
         '''
         os.makedirs(folder_path, exist_ok=True)
-        op_file = os.path.join(folder_path, "operations.csv")
-        machine_file = os.path.join(folder_path, "machines.csv")
+        suffix = ".csv.gz" if compress else ".csv"
+        op_file = os.path.join(folder_path, "operations" + suffix)
+        machine_file = os.path.join(folder_path, "machines" + suffix)
 
         # Fichier des opérations
-        with open(op_file, mode="w", newline="") as f:
+        with _open_text(op_file, "w") as f:
             writer = csv.writer(f)
-            writer.writerow(["operation_id", "machine_id", "start_time"])
-            for op in self.all_operations:
-                if op.assigned:
-                    writer.writerow([op.operation_id, op.assigned_to, op.start_time])
+            writer.writerow(OPERATION_COLUMNS)
+            writer.writerows(self._operation_rows())
 
         # Fichier des machines
-        with open(machine_file, mode="w", newline="") as f:
+        with _open_text(machine_file, "w") as f:
             writer = csv.writer(f)
-            writer.writerow(["machine_id", "start_time", "stop_time"])
-            for machine in self.inst.machines:
-                for start, stop in zip(machine.start_times, machine.stop_times):
-                    writer.writerow([machine.machine_id, start, stop])
+            writer.writerow(MACHINE_COLUMNS)
+            writer.writerows(self._period_rows())
 
     def from_csv(self, inst_folder, operation_file, machine_file):
         '''
-        Reads a solution from the instance folder
+        Reads a solution from the instance folder, written by to_csv
+        (compressed if the file names end with .gz).
+        The columns are found by their names in the headers.
         '''
-        # Réinitialise la solution
-        self.reset()
+        operation_rows = _read_columns(os.path.join(inst_folder, operation_file), OPERATION_COLUMNS)
+        period_rows = _read_columns(os.path.join(inst_folder, machine_file), MACHINE_COLUMNS)
+        self._load_planning(operation_rows.tolist(), period_rows.tolist())
 
-        # Restaure les périodes d'allumage des machines
-        machine_path = os.path.join(inst_folder, machine_file)
-        with open(machine_path, mode="r", newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                machine_id = int(row["machine_id"])
-                start = int(row["start_time"])
-                stop = int(row["stop_time"])
-                machine = next(m for m in self._instance.machines if m.machine_id == machine_id)
-                machine.start_times.append(start)
-                machine.stop_times.append(stop)
-
-        # Restaure les opérations planifiées
-        op_path = os.path.join(inst_folder, operation_file)
-        with open(op_path, mode="r", newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                op_id = int(row["operation_id"])
-                machine_id = int(row["machine_id"])
-                start_time = int(row["start_time"])
-                op = next(o for o in self.all_operations if o.operation_id == op_id)
-                machine = next(m for m in self._instance.machines if m.machine_id == machine_id)
-                machine.add_operation(op, start_time)
+    def to_binary(self, filepath):
+        '''
+        Saves the solution in a binary file, read back with from_binary.
+        The file is a single .npy int64 array:
+          header [magic, version, nb operations, nb periods]
+          then the operation rows and the machine rows, as in the csv files.
+        '''
+        operation_rows = np.array(list(self._operation_rows()), dtype=np.int64).reshape(-1)
+        period_rows = np.array(list(self._period_rows()), dtype=np.int64).reshape(-1)
+        header = [_BINARY_MAGIC, _BINARY_VERSION, len(operation_rows) // 3, len(period_rows) // 3]
+        with open(filepath, "wb") as f:
+            np.save(f, np.concatenate((np.array(header, dtype=np.int64), operation_rows, period_rows)))
+
+    def from_binary(self, filepath):
+        '''
+        Reads a solution saved with to_binary.
+        '''
+        data = np.load(filepath)
+        magic, version, nb_operations, nb_periods = data[:_HEADER_SIZE].tolist()
+        if magic != _BINARY_MAGIC or version != _BINARY_VERSION:
+            raise ValueError(f"Not a solution file of version {_BINARY_VERSION}")
+        operations_end = _HEADER_SIZE + 3 * nb_operations
+        self._load_planning(data[_HEADER_SIZE:operations_end].reshape(-1, 3).tolist(),
+                            data[operations_end:operations_end + 3 * nb_periods].reshape(-1, 3).tolist())
+
+    def _operation_rows(self):
+        '''
+        Yields the (operation id, machine id, start time) of the scheduled operations.
+        '''
+        return ((op.operation_id, op.assigned_to, op.start_time) for op in self._instance.operations if op.assigned)
+
+    def _period_rows(self):
+        '''
+        Yields the (machine id, start time, stop time) of the periods of the machines.
+        '''
+        return ((machine.machine_id, start, stop) for machine in self._instance.machines
+                for start, stop in zip(machine.start_times, machine.stop_times))
+
+    def _load_planning(self, operation_rows, period_rows):
+        '''
+        Replaces the planning by the given (operation id, machine id, start time)
+        and (machine id, start time, stop time) rows, in any order.
+        '''
+        self._clear()
+        machine_operations = {machine.machine_id: [] for machine in self._instance.machines}
+        machine_periods = {machine.machine_id: [] for machine in self._instance.machines}
+        for op_id, machine_id, start_time in operation_rows:
+            op = self._instance.get_operation(op_id)
+            if op is None or machine_id not in op.processing_times:
+                raise ValueError(f"Operation {op_id} cannot be processed by machine {machine_id}")
+            # Les prédécesseurs ne sont pas forcément déjà lus
+            op.schedule(machine_id, start_time, False)
+            machine_operations[machine_id].append(op)
+        for machine_id, start, stop in period_rows:
+            if machine_id not in machine_periods:
+                raise ValueError(f"Unknown machine {machine_id}")
+            machine_periods[machine_id].append((start, stop))
+        for machine in self._instance.machines:
+            machine.load(machine_operations[machine.machine_id], machine_periods[machine.machine_id])
+        self._init_available()
+        self._violations = self._count_violations()
 
     @property
     def available_operations(self)-> List[Operation]:
@@ -184,18 +325,21 @@ class Solution(object):
         Returns the available operations for scheduling:
         all constraints have been met for those operations to start
         '''
-        available = []
-        for job in self._instance.jobs:
-            for idx, op in enumerate(job.operations):
-                if op.assigned:
-                    continue
-                if idx == 0:
-                    available.append(op)
-                else:
-                    prev_op = job.operations[idx - 1]
-                    if prev_op.assigned and prev_op.end_time <= max(m.available_time for m in self._instance.machines):
-                        available.append(op)
-        return available
+        return list(self._available)
+
+    def is_available(self, operation: Operation) -> bool:
+        '''
+        Returns True if the operation is available for scheduling:
+        it is not planned yet but all its predecessors are.
+        '''
+        return not operation.assigned and all(pred.assigned for pred in operation.predecessors)
+
+    def _init_available(self):
+        '''
+        Computes the operations available for scheduling from the planning.
+        They are then updated by schedule and unschedule.
+        '''
+        self._available = {op: None for op in self._instance.operations if self.is_available(op)}
 
 
     @property
@@ -211,98 +355,228 @@ class Solution(object):
         Starts the machine if stopped.
         @param operation: an operation that is available for scheduling
         '''
-        assert (operation in self.available_operations)
+        assert (self.is_available(operation))
 
+        self._save(operation)
+        self._save_machine(machine)
         start_time = max(machine.available_time, operation.min_start_time)
         if not machine.is_on(start_time):
             start_up_time = max(0, operation.min_start_time - machine.set_up_time)
             machine.start(start_up_time)
             start_time = max(machine.available_time, start_up_time + machine.set_up_time)
+        else:
+            # Machine vidée par un mouvement : pas avant la fin de son réglage
+            start_time = machine.ready_time(start_time)
         machine.add_operation(operation, start_time)
+        self._update_available(operation)
+        self._add_violations(self._violated_arcs(operation))
+        if self.shutdown_planning:
+            machine.set_periods(machine.optimal_periods())
+
+    def insert(self, operation: Operation, machine: Machine):
+        '''
+        Schedules the operation in the earliest idle period of the machine
+        where it can be processed, after the end of its predecessors.
+        Starts the machine if it has never been started.
+        If no idle period is long enough, the operation is scheduled at the end
+        of the planning of the machine as with schedule.
+        @param operation: an operation that is available for scheduling
+        '''
+        assert (self.is_available(operation))
+
+        self._save(operation)
+        self._save_machine(machine)
+        if not machine.start_times:
+            machine.start(max(0, operation.min_start_time - machine.set_up_time))
+        start_time = machine.earliest_slot(operation.processing_times[machine.machine_id],
+                                           operation.min_start_time, self.shutdown_planning)
+        if start_time is None:
+            self.schedule(operation, machine)
+            return
+        machine.insert_operation(operation, start_time)
+        self._update_available(operation)
+        self._add_violations(self._violated_arcs(operation))
+        if self.shutdown_planning:
+            machine.set_periods(machine.optimal_periods())
+
+    def _update_available(self, operation: Operation):
+        '''
+        Updates the available operations once the operation is scheduled.
+        '''
+        self._set_available(operation, False)
+        for successor in operation.successors:
+            if self.is_available(successor):
+                self._set_available(successor, True)
+
+    def unschedule(self, operation: Operation):
+        '''
+        Removes the operation from the planning of its machine
+        and clears its schedule information.
+        '''
+        self._save(operation)
+        if operation.assigned:
+            self._add_violations(-self._violated_arcs(operation))
+        machine = self._instance.get_machine(operation.assigned_to)
+        if machine is not None:
+            self._save_machine(machine)
+            machine.remove_operation(operation)
+            if self.shutdown_planning:
+                machine.set_periods(machine.optimal_periods())
+        operation.reset()
+        if self.is_available(operation):
+            self._set_available(operation, True)
+        for successor in operation.successors:
+            self._set_available(successor, False)
+
+    def plan_shutdowns(self):
+        '''
+        Plans the on/off periods of every machine for its current sequence of
+        operations so as to minimize its energy consumption: idle periods are
+        replaced by a tear down and a set up when it is cheaper
+        (see Machine.optimal_periods). The operations are not moved.
+        '''
+        for machine in self._instance.machines:
+            self._save_machine(machine)
+            machine.set_periods(machine.optimal_periods())
+
+    def export_state(self):
+        '''
+        Returns the planning of the solution as plain picklable values,
+        the operations being given by their position in Instance.operations.
+        load_state rebuilds it on another copy of the instance,
+        e.g. in another process.
+        '''
+        arrays = self._instance.as_arrays()
+        operation_states = [op.snapshot() for op in self._instance.operations]
+        machine_states = []
+        for machine in self._instance.machines:
+            scheduled_operations, *planning = machine.snapshot()
+            machine_states.append(([arrays.position(op) for op in scheduled_operations], planning))
+        return operation_states, machine_states, self.shutdown_planning
+
+    def load_state(self, state):
+        '''
+        Replaces the planning of the solution by a state returned by export_state.
+        '''
+        operation_states, machine_states, self.shutdown_planning = state
+        operations = self._instance.operations
+        for operation, operation_state in zip(operations, operation_states):
+            operation.restore(operation_state)
+        for machine, (positions, planning) in zip(self._instance.machines, machine_states):
+            machine.restore(([operations[i] for i in positions], *planning))
+        self._journal = []
+        self._stop_journals()
+        self._init_available()
+        self._violations = self._count_violations()
+
+    def apply_move(self, move) -> bool:
+        '''
+        Applies a move on the solution in place. Every operation and machine
+        modified by the move is journaled so that the move can be rolled back
+        with undo_move, or kept with commit_move.
+        Returns False, leaving the solution unchanged, if the move cannot be applied.
+        @param move: an object with an apply(solution) -> bool method
+          that changes the solution through schedule and unschedule
+        '''
+        self._journal.append({})
+        if move.apply(self):
+            return True
+        self.undo_move()
+        return False
+
+    def undo_move(self):
+        '''
+        Rolls back the last applied move.
+        '''
+        for restore, state in self._journal.pop().values():
+            restore(state)
+        if not self._journal:
+            self._stop_journals()
+
+    def commit_move(self):
+        '''
+        Keeps the last applied move. If it was applied inside another move,
+        it will be rolled back along with it.
+        '''
+        frame = self._journal.pop()
+        if self._journal:
+            outer_frame = self._journal[-1]
+            for key, entry in frame.items():
+                outer_frame.setdefault(key, entry)
+        else:
+            self._stop_journals()
+
+    def _save(self, item):
+        '''
+        Records the state of an operation in the current move
+        before it is modified, if a move is being applied.
+        '''
+        if self._journal:
+            frame = self._journal[-1]
+            if id(item) not in frame:
+                frame[id(item)] = (item.restore, item.snapshot())
+
+    def _save_machine(self, machine: Machine):
+        '''
+        Records the changes of a machine in the current move, if a move is being
+        applied. The machine journals the inverse of each change (see
+        Machine.start_journal), so that rolling the move back takes a time
+        proportional to the changes and not to the operations of the machine.
+        '''
+        if self._journal:
+            frame = self._journal[-1]
+            if id(machine) not in frame:
+                frame[id(machine)] = (machine.rollback, machine.start_journal())
+                self._journaled_machines[id(machine)] = machine
+
+    def _stop_journals(self):
+        '''
+        Stops the journals of the machines once no move is being applied.
+        '''
+        for machine in self._journaled_machines.values():
+            machine.stop_journal()
+        self._journaled_machines = {}
+
+    def _set_available(self, operation: Operation, available: bool):
+        '''
+        Adds or removes the operation from the operations available for scheduling.
+        The change is journaled if a move is being applied.
+        '''
+        if self._journal:
+            frame = self._journal[-1]
+            key = ('available', id(operation))
+            if key not in frame:
+                frame[key] = (partial(self._restore_available, operation), operation in self._available)
+        self._restore_available(operation, available)
+
+    def _add_violations(self, count: int):
+        '''
+        Updates the number of violated precedence constraints.
+        The change is journaled if a move is being applied.
+        '''
+        if count == 0:
+            return
+        if self._journal:
+            frame = self._journal[-1]
+            if 'violations' not in frame:
+                frame['violations'] = (self._restore_violations, self._violations)
+        self._violations += count
+
+    def _restore_violations(self, violations: int):
+        self._violations = violations
+
+    def _restore_available(self, operation: Operation, available: bool):
+        if available:
+            self._available[operation] = None
+        else:
+            self._available.pop(operation, None)
 
 
-    def gantt(self, colormapname):
+    def gantt(self, colormapname, params: Dict=dict()):
         """
-        Generate a plot of the planning.
+        Generate a plot of the planning (see visualization.gantt for the parameters).
         Standard colormaps can be found at https://matplotlib.org/stable/users/explain/colors/colormaps.html
         """
-        fig, ax = plt.subplots()
-        colormap = colormaps[colormapname]
-        for machine in self.inst.machines:
-            machine_operations = sorted(machine.scheduled_operations, key=lambda op: op.start_time)
-            for operation in machine_operations:
-                operation_start = operation.start_time
-                operation_end = operation.end_time
-                operation_duration = operation_end - operation_start
-                operation_label = f"O{operation.operation_id}_J{operation.job_id}"
-    
-                # Set color based on job ID
-                color_index = operation.job_id + 2
-                if color_index >= colormap.N:
-                    color_index = color_index % colormap.N
-                color = colormap(color_index)
-    
-                ax.broken_barh(
-                    [(operation_start, operation_duration)],
-                    (machine.machine_id - 0.4, 0.8),
-                    facecolors=color,
-                    edgecolor='black'
-                )
-
-                middle_of_operation = operation_start + operation_duration / 2
-                ax.text(
-                    middle_of_operation,
-                    machine.machine_id,
-                    operation_label,
-                    rotation=90,
-                    ha='center',
-                    va='center',
-                    fontsize=8
-                )
-            set_up_time = machine.set_up_time
-            tear_down_time = machine.tear_down_time
-            for (start, stop) in zip(machine.start_times, machine.stop_times):
-                start_label = "set up"
-                stop_label = "tear down"
-                ax.broken_barh(
-                    [(start, set_up_time)],
-                    (machine.machine_id - 0.4, 0.8),
-                    facecolors=colormap(0),
-                    edgecolor='black'
-                )
-                ax.broken_barh(
-                    [(stop, tear_down_time)],
-                    (machine.machine_id - 0.4, 0.8),
-                    facecolors=colormap(1),
-                    edgecolor='black'
-                )
-                ax.text(
-                    start + set_up_time / 2.0,
-                    machine.machine_id,
-                    start_label,
-                    rotation=90,
-                    ha='center',
-                    va='center',
-                    fontsize=8
-                )
-                ax.text(
-                    stop + tear_down_time / 2.0,
-                    machine.machine_id,
-                    stop_label,
-                    rotation=90,
-                    ha='center',
-                    va='center',
-                    fontsize=8
-                )          
-
-        fig = ax.figure
-        fig.set_size_inches(12, 6)
-    
-        ax.set_yticks(range(self._instance.nb_machines))
-        ax.set_yticklabels([f'M{machine_id+1}' for machine_id in range(self.inst.nb_machines)])
-        ax.set_xlabel('Time')
-        ax.set_ylabel('Machine')
-        ax.set_title('Gantt Chart')
-        ax.grid(True)
-    
-        return plt
+        # Import tardif : matplotlib n'est chargé que pour tracer
+        from src.scheduling.visualization import gantt
+        return gantt(self, colormapname, params)
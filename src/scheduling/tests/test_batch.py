@@ -0,0 +1,130 @@
+'''
+Tests for the batch solver and its command line
+'''
+import csv
+import json
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+from src.scheduling.__main__ import main
+from src.scheduling.batch import find_instances, output_names, run_batch
+from src.scheduling.benchmarks.generator import write_instance
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.solution import Solution
+
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.instances = os.path.join(self.folder.name, 'instances')
+        self.output = os.path.join(self.folder.name, 'output')
+        for seed, name in enumerate(('gen1', 'gen2')):
+            write_instance(self.instances, name, 4, 3, 3, {'seed': seed})
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_find_instances(self):
+        folders = [os.path.join(self.instances, name) for name in ('gen1', 'gen2')]
+        self.assertEqual(find_instances([self.instances]), folders)
+        self.assertEqual(find_instances([folders[1], folders[0], folders[1]]), folders)
+        self.assertEqual(find_instances([os.path.join(self.instances, '*2')]), folders[1:])
+        self.assertEqual(find_instances([self.output]), [])
+
+    def test_run_batch(self):
+        folders = find_instances([self.instances])
+        expected = [Greedy().run(Instance.from_file(folder)).objective for folder in folders]
+        for workers in (1, 2):
+            results = run_batch(folders, 'greedy', {}, workers, self.output)
+            self.assertEqual([result['instance'] for result in results], ['gen1', 'gen2'])
+            self.assertEqual([result['objective'] for result in results], expected)
+            for result in results:
+                self.assertTrue(result['feasible'])
+                self.assertIsNone(result['error'])
+                self.assertTrue(os.path.isfile(os.path.join(result['output'], 'operations.csv')))
+            with open(os.path.join(self.output, 'summary.json')) as f:
+                self.assertEqual(json.load(f), results)
+            with open(os.path.join(self.output, 'summary.csv')) as f:
+                self.assertEqual([int(row['objective']) for row in csv.DictReader(f)], expected)
+        # Une instance illisible est signalée dans le résumé, sans arrêter les autres
+        results = run_batch(folders + [self.output], 'greedy', {}, 2, self.output)
+        self.assertIsNone(results[0]['error'])
+        self.assertIsNotNone(results[2]['error'])
+        self.assertRaises(ValueError, run_batch, folders, 'unknown')
+
+    def test_same_names(self):
+        # Deux instances de même nom dans des dossiers différents
+        for seed, parent in enumerate(('a', 'b')):
+            write_instance(os.path.join(self.folder.name, parent), 'gen1', 4, 3, 3, {'seed': seed})
+        folders = find_instances([os.path.join(self.folder.name, '*')])
+        self.assertEqual(len(folders), 4)
+        names = output_names(folders)
+        self.assertEqual(names, [os.path.join('a', 'gen1'), os.path.join('b', 'gen1'),
+                                 os.path.join('instances', 'gen1'), 'gen2'])
+        self.assertEqual(output_names([folders[0], folders[0]]), ['gen1_0', 'gen1_1'])
+        self.assertEqual(find_instances([folders[0], os.path.join(folders[0], '..', 'gen1')]), folders[:1])
+
+        results = run_batch(folders, 'greedy', {}, 2, self.output)
+        self.assertEqual([result['instance'] for result in results], names)
+        self.assertEqual(len({result['output'] for result in results}), 4)
+        for folder, result in zip(folders, results):
+            read = Solution(Instance.from_file(folder))
+            read.from_csv(result['output'], 'operations.csv', 'machines.csv')
+            self.assertEqual(read.objective, result['objective'])
+
+    def test_time_limit(self):
+        # nondeterminist ignore le paramètre 'time_limit', et la lecture et la résolution
+        # de cette instance prennent plus de 0,15 s : son processus est arrêté
+        write_instance(self.instances, 'large', 400, 10, 10, {'seed': 0})
+        folders = find_instances([self.instances])
+        results = run_batch(folders, 'nondeterminist', {}, 2, self.output, time_limit=0.01, grace_period=0.05)
+        large_folder = os.path.join(self.instances, 'large')
+        large = results[folders.index(large_folder)]
+        self.assertIn('Stopped', large['error'])
+        self.assertIsNone(large['output'])
+        self.assertFalse(os.path.exists(os.path.join(self.output, 'large')))
+        for result in results:
+            if result is not large:
+                self.assertIsNone(result['error'])
+                self.assertTrue(result['feasible'])
+        # Un seul worker : les instances sont aussi résolues dans des processus arrêtables
+        results = run_batch([large_folder], 'nondeterminist', {}, 1, self.output, time_limit=0.01, grace_period=0.05)
+        self.assertIn('Stopped', results[0]['error'])
+        # Les heuristiques qui acceptent une limite reçoivent le temps restant après la lecture
+        results = run_batch([large_folder], 'tabu', {'max_iterations': 10 ** 9, 'stop_at_bound': False}, 1,
+                            self.output, time_limit=0.5, grace_period=10)
+        self.assertIsNone(results[0]['error'])
+        self.assertTrue(results[0]['feasible'])
+        self.assertLess(results[0]['read_time'] + results[0]['runtime'], 5)
+
+    def test_multi_start_workers(self):
+        # Les processus du batch peuvent avoir leurs propres workers (pool de MultiStart)
+        folders = find_instances([self.instances])
+        params = {'workers': 2, 'stop_at_bound': False}
+        for time_limit in (None, 5):
+            results = run_batch(folders, 'multi_start', params, 2, self.output, time_limit=time_limit)
+            for result in results:
+                self.assertIsNone(result['error'])
+                self.assertTrue(result['feasible'])
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_main(self):
+        argv = [self.instances, '--heuristic', 'TabuSearch', '--params', '{"max_iterations": 2}',
+                '--time-limit', '5', '--seed', '1', '--workers', '2', '--output', self.output, '--compress']
+        self.assertEqual(main(argv), 0)
+        with open(os.path.join(self.output, 'summary.json')) as f:
+            results = json.load(f)
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertEqual(result['heuristic'], 'TabuSearch')
+            self.assertTrue(os.path.isfile(os.path.join(result['output'], 'operations.csv.gz')))
+        with self.assertRaises(SystemExit):
+            main([self.output])
+
+
+if __name__ == "__main__":
+    unittest.main()
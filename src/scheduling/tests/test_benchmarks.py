@@ -0,0 +1,56 @@
+'''
+Tests for the instance generator and the benchmark runner
+'''
+import json
+import tempfile
+import unittest
+
+from src.scheduling.benchmarks.generator import generate, generate_rows, write_instance
+from src.scheduling.benchmarks.runner import run_benchmarks
+from src.scheduling.instance.instance import Instance
+
+
+class TestBenchmarks(unittest.TestCase):
+
+    def setUp(self):
+        pass
+
+    def tearDown(self):
+        pass
+
+    def test_generator(self):
+        params = {'seed': 3, 'density': 0.3, 'set_up_times': (2, 4)}
+        self.assertEqual(generate_rows(4, 3, 5, params), generate_rows(4, 3, 5, params))
+        self.assertNotEqual(generate_rows(4, 3, 5, params), generate_rows(4, 3, 5, dict(params, seed=4)))
+        with tempfile.TemporaryDirectory() as folder:
+            inst = Instance.from_file(write_instance(folder, 'gen', 4, 3, 5, params))
+        self.assertEqual(inst.nb_jobs, 4)
+        self.assertEqual(inst.nb_operations, 12)
+        self.assertEqual(inst.nb_machines, 5)
+        for job in inst.jobs:
+            self.assertEqual(len(job.operations), 3)
+        for op in inst.operations:
+            self.assertTrue(op.processing_times)
+        for machine in inst.machines:
+            self.assertTrue(2 <= machine.set_up_time <= 4)
+        # Toutes les machines peuvent traiter toutes les opérations par défaut
+        inst = generate(4, 3, 5)
+        self.assertTrue(all(len(op.processing_times) == 5 for op in inst.operations))
+
+    def test_runner(self):
+        document = run_benchmarks([10], {'time_limit': 1})
+        json.dumps(document)
+        steps = [result['step'] for result in document['results']]
+        for step in ('read_csv', 'read_cache', 'Greedy', 'NonDeterminist',
+                     'MachineSwitchNeighborhood.best_move', 'TabuSearch', 'GeneticAlgorithm'):
+            self.assertIn(step, steps)
+        for result in document['results']:
+            self.assertEqual(result['nb_operations'], 10)
+            self.assertGreaterEqual(result['seconds'], 0)
+        # Pas de recherche locale au-delà de max_search_operations
+        document = run_benchmarks([10], {'max_search_operations': 5})
+        self.assertNotIn('TabuSearch', [result['step'] for result in document['results']])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+'''
+Tests for the lower bounds of the objective
+'''
+import os
+import unittest
+
+from src.scheduling.bounds import LowerBounds, gap
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy, NonDeterminist
+from src.scheduling.optim.genetic import GeneticAlgorithm
+from src.scheduling.optim.local_search import BestNeighborLocalSearch, TabuSearch
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestBounds(unittest.TestCase):
+
+    def setUp(self):
+        self.instance = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp_easy")
+
+    def tearDown(self):
+        pass
+
+    def test_lower_bounds(self):
+        bounds = LowerBounds(self.instance)
+        self.assertEqual(bounds.objective, bounds.energy + bounds.cmax + bounds.mean_processing_time)
+        for seed in range(5):
+            solution = NonDeterminist().run(self.instance, {'seed': seed})
+            self.assertLessEqual(bounds.cmax, solution.cmax)
+            self.assertLessEqual(bounds.energy, solution.total_energy_consumption)
+            self.assertLessEqual(bounds.objective, solution.objective)
+        # La solution gloutonne de cette instance est optimale
+        self.assertEqual(bounds.objective, Greedy().run(self.instance).objective)
+
+    def test_gap(self):
+        self.assertEqual(gap(29, 29), 0.)
+        self.assertEqual(gap(40, 30), 0.25)
+
+    def test_stop_at_bound(self):
+        bound = LowerBounds(self.instance).objective
+        heuristic = TabuSearch()
+        solution = heuristic.run(self.instance, {'seed': 0, 'max_iterations': 1000})
+        self.assertEqual(solution.objective, bound)
+        self.assertEqual(heuristic.gap, 0.)
+        self.assertLess(heuristic.iterations, 1000)
+
+        genetic = GeneticAlgorithm()
+        solution = genetic.run(self.instance, {'seed': 0, 'generations': 1000})
+        self.assertEqual(solution.objective, bound)
+        self.assertEqual(genetic.gap, 0.)
+        self.assertLess(genetic.generations, 1000)
+
+        solution = TabuSearch().run(self.instance, {'seed': 0, 'max_iterations': 20, 'stop_at_bound': False})
+        self.assertEqual(solution.objective, bound)
+
+    def test_best_neighbor_gap(self):
+        bound = LowerBounds(self.instance).objective
+        heuristic = BestNeighborLocalSearch()
+        with self.assertLogs('src.scheduling.bounds', 'INFO'):
+            solution = heuristic.run(self.instance, {'seed': 0})
+        self.assertEqual(heuristic.gap, gap(solution.evaluate, bound))
+        # Solution initiale déjà optimale : aucun mouvement n'est cherché
+        heuristic.run(self.instance, {'nonDeterminist': Greedy()})
+        self.assertEqual(heuristic.gap, 0.)
+
+
+if __name__ == "__main__":
+    unittest.main()
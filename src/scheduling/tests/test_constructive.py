@@ -30,11 +30,29 @@ class TestConstructive(unittest.TestCase):
 
     def testNonDeterminist(self):
         heuristic = NonDeterminist()
-        first_solution = heuristic.run(self.instance)
-        second_solution = heuristic.run(self.instance2)
-        self.assertNotEqual(first_solution.evaluate, second_solution.evaluate, "Les solutions sont égales")
-        self.assertTrue(first_solution.is_feasible)
-        self.assertTrue(second_solution.is_feasible)
+        assignments = set()
+        for seed in range(5):
+            solution = heuristic.run(self.instance, {'seed': seed})
+            self.assertTrue(solution.is_feasible)
+            assignments.add(tuple(op.assigned_to for op in self.instance.operations))
+        # Avec 2 machines par opération, 5 seeds ne donnent pas toutes la même affectation
+        self.assertGreater(len(assignments), 1, "Les solutions sont égales")
+
+    def testNonDeterministSeed(self):
+        first_solution = NonDeterminist({'seed': 3}).run(self.instance)
+        second_solution = NonDeterminist().run(self.instance2, {'seed': 3})
+        self.assertEqual([(op.assigned_to, op.start_time) for op in self.instance.operations],
+                         [(op.assigned_to, op.start_time) for op in self.instance2.operations],
+                         "Le même seed doit donner la même solution")
+        self.assertEqual(first_solution.evaluate, second_solution.evaluate)
+
+    def testNonDeterministEligibleMachines(self):
+        instance = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp_partial")
+        for seed in range(10):
+            solution = NonDeterminist().run(instance, {'seed': seed})
+            self.assertTrue(solution.is_feasible)
+            for op in instance.operations:
+                self.assertIn(op.assigned_to, op.processing_times)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+'''
+Tests for the critical path and the critical block neighborhood
+'''
+import os
+import unittest
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.critical_path import CriticalPath
+from src.scheduling.optim.local_search import IteratedLocalSearch
+from src.scheduling.optim.moves import AdjacentSwapMove
+from src.scheduling.optim.neighborhoods import CriticalBlockNeighborhood, OperationOrderNeighborhood
+from src.scheduling.tests.test_neighborhoods import create_initial_solution
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestCriticalPath(unittest.TestCase):
+
+    def setUp(self):
+        self.inst, self.solution = create_initial_solution()
+
+    def tearDown(self):
+        pass
+
+    def test_heads_and_tails(self):
+        critical_path = CriticalPath(self.solution)
+        self.assertEqual(critical_path.makespan, self.solution.cmax)
+        for op in self.inst.operations:
+            self.assertLessEqual(critical_path.heads[op], op.start_time)
+            self.assertLessEqual(critical_path.heads[op] + op.processing_time + critical_path.tails[op],
+                                 critical_path.makespan)
+        last = max(self.inst.operations, key=lambda op: op.end_time)
+        self.assertTrue(critical_path.is_critical(last))
+        self.assertEqual(critical_path.tails[last], 0)
+
+    def test_critical_blocks(self):
+        critical_path = CriticalPath(self.solution)
+        blocks = critical_path.critical_blocks()
+        self.assertTrue(blocks)
+        for machine_id, block in blocks:
+            self.assertGreaterEqual(len(block), 2)
+            for previous, op in zip(block, block[1:]):
+                self.assertEqual(op.assigned_to, machine_id)
+                self.assertTrue(critical_path.is_critical(op))
+                self.assertEqual(critical_path.heads[previous] + previous.processing_time, critical_path.heads[op])
+
+    def test_on_local_search(self):
+        # Solution dont les opérations ont été déplacées par les mouvements
+        inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        solution = IteratedLocalSearch().run(inst, {'seed': 0, 'max_iterations': 5})
+        critical_path = CriticalPath(solution)
+        self.assertLessEqual(critical_path.makespan, solution.cmax)
+        for op in inst.operations:
+            self.assertLessEqual(critical_path.heads[op], op.start_time)
+        initial_value = solution.evaluate
+        neighborhood = CriticalBlockNeighborhood(inst)
+        self.assertLessEqual(neighborhood.first_better_neighbor(solution).evaluate, initial_value)
+        self.assertTrue(solution.is_feasible)
+
+    def test_cycle(self):
+        # Première opération du job 0 replanifiée après la suivante sur la même machine
+        op = self.inst.operations[0]
+        self.solution.unschedule(op)
+        self.solution.schedule(op, self.inst.machines[0])
+        self.assertFalse(self.solution.is_feasible)
+        with self.assertRaises(ValueError):
+            CriticalPath(self.solution)
+
+    def test_adjacent_swap_move(self):
+        machine = self.inst.machines[0]
+        sequence = list(machine.scheduled_operations)
+        # Opérations consécutives de deux jobs différents
+        position = next(i for i in range(len(sequence) - 1) if sequence[i].job_id != sequence[i + 1].job_id)
+        op1, op2 = sequence[position], sequence[position + 1]
+        start_time = op1.start_time
+        state = self.solution.export_state()
+
+        self.assertTrue(self.solution.apply_move(AdjacentSwapMove(op1, op2, machine)))
+        # Échange sur place : les opérations précédentes ne bougent pas
+        self.assertEqual(machine.scheduled_operations[:position], sequence[:position])
+        self.assertEqual(machine.scheduled_operations[position:position + 2], [op2, op1])
+        self.assertEqual(op2.start_time, max(start_time, op2.min_start_time))
+        self.assertEqual(len(machine.scheduled_operations), len(sequence))
+        self.solution.undo_move()
+        self.assertEqual(self.solution.export_state(), state)
+
+        # Opérations non consécutives ou du même job
+        self.assertFalse(self.solution.apply_move(AdjacentSwapMove(op2, op1, machine)))
+        self.assertFalse(self.solution.apply_move(AdjacentSwapMove(sequence[0], sequence[1], machine)))
+        self.assertEqual(self.solution.export_state(), state)
+
+    def test_critical_block_neighborhood(self):
+        neighborhood = CriticalBlockNeighborhood(self.inst)
+        moves = neighborhood.moves(self.solution)
+        self.assertTrue(moves)
+        self.assertLess(len(moves), len(OperationOrderNeighborhood(self.inst).moves(self.solution)))
+        for move in moves:
+            # Opérations consécutives sur leur machine
+            sequence = move.machine.scheduled_operations
+            self.assertIs(sequence[sequence.index(move.operation1) + 1], move.operation2)
+        initial_value = self.solution.evaluate
+        self.assertLessEqual(neighborhood.best_neighbor(self.solution).evaluate, initial_value)
+        self.assertLessEqual(neighborhood.first_better_neighbor(self.solution).evaluate, initial_value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+'''
+Tests for the encoding of the solutions and its decoder
+'''
+import os
+import unittest
+
+import numpy as np
+
+from src.scheduling.encoding import Encoding, decode, decode_population, sequence_from_jobs
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestEncoding(unittest.TestCase):
+
+    def setUp(self):
+        self.inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp_test_neighborhoods")
+        self.rng = np.random.default_rng(0)
+
+    def tearDown(self):
+        pass
+
+    def test_decode_matches_solution(self):
+        arrays = self.inst.as_arrays()
+        for _ in range(20):
+            encoding = Encoding.random(arrays, self.rng)
+            for plan_shutdowns in (False, True):
+                decoded = decode(arrays, encoding, plan_shutdowns)
+                solution = encoding.to_solution(self.inst, plan_shutdowns)
+                self.assertTrue(decoded.feasible)
+                self.assertEqual(decoded.evaluate, solution.evaluate)
+                self.assertEqual(decoded.operation_start_times,
+                                 [op.start_time for op in self.inst.operations])
+                self.assertEqual(decoded.machine_start_times,
+                                 [list(machine.start_times) for machine in self.inst.machines])
+
+    def test_from_solution(self):
+        solution = Greedy().run(self.inst)
+        value = solution.evaluate
+        encoding = Encoding.from_solution(solution)
+        self.assertEqual(decode(self.inst.as_arrays(), encoding).evaluate, value)
+
+    def test_decode_population(self):
+        arrays = self.inst.as_arrays()
+        job_sequences = np.array([self.rng.permutation(arrays.job_ids) for _ in range(10)])
+        assignments = np.array([Encoding.random(arrays, self.rng).assignment for _ in range(10)])
+        values = decode_population(arrays, job_sequences, assignments)
+        for job_sequence, assignment, value in zip(job_sequences, assignments, values):
+            encoding = Encoding(sequence_from_jobs(arrays, job_sequence), assignment)
+            self.assertEqual(value, decode(arrays, encoding).evaluate)
+
+    def test_infeasible_sequence(self):
+        arrays = self.inst.as_arrays()
+        encoding = Encoding.random(arrays, self.rng)
+        encoding.sequence = encoding.sequence[::-1].copy()
+        self.assertFalse(decode(arrays, encoding).feasible)
+        encoding.sequence = encoding.sequence[:0]
+        self.assertFalse(decode(arrays, encoding).feasible)
+        self.assertEqual(decode(arrays, encoding).cmax, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
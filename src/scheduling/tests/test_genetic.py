@@ -0,0 +1,49 @@
+'''
+Tests for the genetic algorithm
+'''
+import os
+import unittest
+
+import numpy as np
+
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.genetic import GeneticAlgorithm, _pox
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestGeneticAlgorithm(unittest.TestCase):
+
+    def setUp(self):
+        self.instance = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp_test_neighborhoods")
+
+    def tearDown(self):
+        pass
+
+    def test_pox(self):
+        parents = np.array([[0, 1, 2, 0, 1, 2], [2, 2, 1, 1, 0, 0]])
+        mates = np.array([[2, 1, 0, 2, 1, 0], [0, 1, 2, 0, 1, 2]])
+        children = _pox(parents, mates, 3, np.random.default_rng(0))
+        for parent, child in zip(parents, children):
+            # Chaque job garde son nombre d'opérations
+            self.assertEqual(sorted(child), sorted(parent))
+
+    def test_run(self):
+        heuristic = GeneticAlgorithm()
+        params = {'seed': 0, 'population_size': 20, 'generations': 10}
+        solution = heuristic.run(self.instance, params)
+        self.assertTrue(solution.is_feasible)
+        self.assertEqual(heuristic.generations, 10)
+        self.assertEqual(heuristic.evaluations, 20 + 10 * 18)
+        for op in self.instance.operations:
+            self.assertIn(op.assigned_to, op.processing_times)
+        self.assertEqual(GeneticAlgorithm().run(self.instance, params).evaluate, solution.evaluate)
+
+    def test_time_limit(self):
+        heuristic = GeneticAlgorithm()
+        solution = heuristic.run(self.instance, {'seed': 0, 'time_limit': 0})
+        self.assertEqual(heuristic.generations, 0)
+        self.assertTrue(solution.is_feasible)
+
+
+if __name__ == "__main__":
+    unittest.main()
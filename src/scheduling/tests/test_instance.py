@@ -13,9 +13,13 @@ import unittest
 
 import os
 
+import shutil
 
+import tempfile
 
-from src.scheduling.instance.instance import Instance
+
+
+from src.scheduling.instance.instance import Instance, CACHE_SUFFIX
 
 from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
 
@@ -67,6 +71,84 @@ class TestInstances(unittest.TestCase):
 
 
 
+    def test_get_by_id(self):
+
+        operation = self.inst.get_operation(2, job_id=1)
+
+        self.assertEqual((operation.job_id, operation.operation_id), (1, 2), 'wrong operation')
+
+        self.assertIs(self.inst.get_operation(2), operation, 'wrong operation')
+
+        self.assertEqual(operation.processing_times, {0: 5, 1: 9, 2: 6, 3: 5}, 'wrong processing times')
+
+        self.assertIsNone(self.inst.get_operation(2, job_id=0), 'operation 2 is not in job 0')
+
+        self.assertEqual(self.inst.get_machine(3).machine_id, 3, 'wrong machine')
+
+        self.assertEqual(self.inst.get_job(1).operations, self.inst.operations[2:], 'wrong job operations')
+
+
+
+
+
+    def test_binary(self):
+
+        with tempfile.TemporaryDirectory() as folder:
+
+            filepath = os.path.join(folder, 'jsp1.npy')
+
+            self.inst.to_binary(filepath)
+
+            inst = Instance.from_binary(filepath, name='jsp1')
+
+        self.assertEqual(str(inst), str(self.inst), 'wrong instance read')
+
+        for operation, read_operation in zip(self.inst.operations, inst.operations):
+
+            self.assertEqual(read_operation.processing_times, operation.processing_times, 'wrong processing times')
+
+            self.assertEqual(read_operation.energies, operation.energies, 'wrong energies')
+
+        self.assertEqual(inst.get_machine(3).end_time, 110, 'wrong machine end time')
+
+
+
+    def test_cache(self):
+
+        with tempfile.TemporaryDirectory() as folder:
+
+            folderpath = os.path.join(folder, 'jsp1')
+
+            shutil.copytree(TEST_FOLDER_DATA + os.path.sep + "jsp1", folderpath)
+
+            Instance.from_file(folderpath)
+
+            cache_path = os.path.join(folderpath, 'jsp1' + CACHE_SUFFIX)
+
+            self.assertTrue(os.path.exists(cache_path), 'cache file should be written')
+
+            self.assertEqual(str(Instance.from_file(folderpath)), 'jsp1_M4_J2_O4', 'wrong instance read from cache')
+
+            # The cache must not be used once the csv file changed
+
+            op_path = os.path.join(folderpath, 'jsp1_op.csv')
+
+            with open(op_path, 'a') as f:
+
+                f.write('\n1,3,3,1,1')
+
+            stat = os.stat(op_path)
+
+            os.utime(op_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+            inst = Instance.from_file(folderpath)
+
+            self.assertEqual(inst.get_operation(3).processing_times[3], 1, 'cache should be refreshed')
+
+
+
+
+
 if __name__ == "__main__":
 
     #import sys;sys.argv = ['', 'Test.testName']
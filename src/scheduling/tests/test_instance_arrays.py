@@ -0,0 +1,46 @@
+'''
+Tests for the array representation of the instances
+'''
+import os
+import unittest
+
+import numpy as np
+
+from src.scheduling.instance.arrays import INELIGIBLE
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestInstanceArrays(unittest.TestCase):
+
+    def setUp(self):
+        self.inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp_partial")
+
+    def tearDown(self):
+        pass
+
+    def test_as_arrays(self):
+        arrays = self.inst.as_arrays()
+        self.assertIs(arrays, self.inst.as_arrays(), 'arrays should be computed once')
+        self.assertEqual(arrays.processing_times.shape, (3, 3))
+        np.testing.assert_array_equal(arrays.processing_times,
+                                      [[4, 3, INELIGIBLE], [INELIGIBLE, 5, INELIGIBLE], [6, INELIGIBLE, 2]])
+        np.testing.assert_array_equal(arrays.energies,
+                                      [[6, 9, INELIGIBLE], [INELIGIBLE, 5, INELIGIBLE], [4, INELIGIBLE, 3]])
+        np.testing.assert_array_equal(arrays.eligible,
+                                      [[True, True, False], [False, True, False], [True, False, True]])
+        np.testing.assert_array_equal(arrays.predecessors, [-1, 0, -1])
+        np.testing.assert_array_equal(arrays.job_operations, [[0, 1], [2, -1]])
+        np.testing.assert_array_equal(arrays.set_up_times, [2, 1, 3])
+        np.testing.assert_array_equal(arrays.min_consumptions, [1, 1, 2])
+        self.assertEqual(arrays.position(self.inst.get_operation(2)), 2)
+
+    def test_greedy_skips_ineligible_machines(self):
+        solution = Greedy().run(self.inst)
+        self.assertTrue(solution.is_feasible)
+        self.assertEqual([op.assigned_to for op in self.inst.operations], [0, 1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,11 +1,15 @@
 import copy
 import os
+import random
+import time
 import unittest
 
+from src.scheduling.benchmarks.generator import generate
 from src.scheduling.instance.instance import Instance
 from src.scheduling.optim.constructive import NonDeterminist
-from src.scheduling.optim.local_search import FirstNeighborLocalSearch
-from src.scheduling.optim.neighborhoods import MachineSwitchNeighborhood
+from src.scheduling.optim.local_search import FirstNeighborLocalSearch, IteratedLocalSearch, SimulatedAnnealing, TabuSearch
+from src.scheduling.optim.local_search import _MoveSampler, _PerturbationDescent, _TabuList
+from src.scheduling.optim.neighborhoods import MachineSwitchNeighborhood, OperationOrderNeighborhood
 from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
 
 
@@ -16,6 +20,7 @@ class TestLocalSearch(unittest.TestCase):
         self.non_det = NonDeterminist()
         self.neigh = MachineSwitchNeighborhood(self.instance)
         self.local_search = FirstNeighborLocalSearch()
+        self.params = {'nonDeterminist': self.non_det, 'machineSwitchNeighborhood': self.neigh}
         self.instance_copy_test_1 = copy.deepcopy(self.instance)
         self.instance_copy_test_2 = copy.deepcopy(self.instance)
 
@@ -24,12 +29,12 @@ class TestLocalSearch(unittest.TestCase):
 
 
         # Génère une solution initiale non déterministe
-        initial_solution = self.non_det.run(self.instance)
+        initial_solution = self.non_det.run(self.instance, {'seed': 0})
         initial_eval = initial_solution.evaluate
 
 
-        # Applique la recherche locale
-        improved_solution = self.local_search.run(self.instance_copy_test_1, self.non_det, self.neigh)
+        # Applique la recherche locale depuis la même solution initiale
+        improved_solution = self.local_search.run(self.instance_copy_test_1, dict(self.params, seed=0))
         improved_eval = improved_solution.evaluate
 
         # La solution retournée doit être faisable
@@ -40,9 +45,141 @@ class TestLocalSearch(unittest.TestCase):
     def test_first_neighbor_local_search_repeatability(self):
         # Plusieurs runs doivent donner des solutions faisables
         for _ in range(5):
-            sol = self.local_search.run(self.instance_copy_test_2, self.non_det, self.neigh)
+            sol = self.local_search.run(self.instance_copy_test_2, self.params)
             self.assertTrue(sol.is_feasible)
             self.assertIsInstance(sol.evaluate, int)
 
+    def test_first_neighbor_local_search_plan_shutdowns(self):
+        params = dict(self.params, plan_shutdowns=True)
+        sol = self.local_search.run(self.instance_copy_test_1, params)
+        self.assertTrue(sol.is_feasible)
+        for machine in self.instance_copy_test_1.machines:
+            self.assertEqual(list(zip(machine.start_times, machine.stop_times)), machine.optimal_periods())
+
+    def test_tabu_search(self):
+        initial_eval = self.non_det.run(self.instance, {'seed': 0}).evaluate
+        tabu_search = TabuSearch()
+        sol = tabu_search.run(self.instance_copy_test_1, {'seed': 0, 'max_iterations': 20})
+        self.assertTrue(sol.is_feasible)
+        self.assertLessEqual(sol.evaluate, initial_eval)
+        self.assertLessEqual(tabu_search.iterations, 20)
+
+    def test_tabu_search_time_limit(self):
+        initial_eval = self.non_det.run(self.instance, {'seed': 0}).evaluate
+        tabu_search = TabuSearch()
+        sol = tabu_search.run(self.instance_copy_test_1, {'seed': 0, 'time_limit': 0})
+        self.assertEqual(tabu_search.iterations, 0)
+        self.assertEqual(sol.evaluate, initial_eval)
+
+    def test_tabu_search_time_limit_in_iteration(self):
+        # Une itération évalue tous les mouvements des deux voisinages, soit environ 0,4 s
+        # sur 300 opérations : la limite est vérifiée pendant leur évaluation
+        instance = generate(60, 5, 4, {'seed': 0})
+        tabu_search = TabuSearch()
+        start = time.perf_counter()
+        sol = tabu_search.run(instance, {'seed': 0, 'time_limit': 0.05, 'stop_at_bound': False})
+        self.assertLess(time.perf_counter() - start, 0.3)
+        self.assertLessEqual(tabu_search.iterations, 1)
+        self.assertTrue(sol.is_feasible)
+
+    def test_tabu_list(self):
+        tabu = _TabuList()
+        tabu.add('a', 3)
+        tabu.add('b', 4)
+        # 'a' est de nouveau tabou après son premier ajout
+        tabu.add('a', 5)
+        tabu.purge(3)
+        self.assertIn('a', tabu)
+        tabu.purge(4)
+        self.assertNotIn('b', tabu)
+        self.assertEqual(len(tabu), 1)
+        tabu.purge(5)
+        self.assertEqual(len(tabu), 0, "Expired attributes should be dropped")
+
+    def test_simulated_annealing(self):
+        initial_eval = self.non_det.run(self.instance, {'seed': 0}).evaluate
+        for cooling in ('geometric', 'linear', 'logarithmic'):
+            annealing = SimulatedAnnealing()
+            params = {'seed': 0, 'cooling': cooling, 'max_iterations': 200, 'reheat_after': 50,
+                      'stop_at_bound': False}
+            sol = annealing.run(self.instance_copy_test_1, params)
+            self.assertTrue(sol.is_feasible)
+            self.assertLessEqual(sol.evaluate, initial_eval)
+            self.assertEqual(annealing.iterations, 200)
+            self.assertGreater(annealing.iterations_per_second, 0)
+            # Même seed, même résultat
+            self.assertEqual(SimulatedAnnealing().run(self.instance_copy_test_2, params).evaluate, sol.evaluate)
+
+    def test_simulated_annealing_unknown_cooling(self):
+        with self.assertRaises(ValueError):
+            SimulatedAnnealing().run(self.instance, {'cooling': 'exponential'})
+
+    def test_iterated_local_search(self):
+        initial_eval = self.non_det.run(self.instance, {'seed': 0}).evaluate
+        for acceptance in ('better', 'threshold', 'always'):
+            search = IteratedLocalSearch()
+            params = {'seed': 0, 'acceptance': acceptance, 'max_iterations': 10}
+            sol = search.run(self.instance_copy_test_1, params)
+            self.assertTrue(sol.is_feasible)
+            self.assertLessEqual(sol.evaluate, initial_eval)
+            self.assertLessEqual(search.iterations, 10)
+            self.assertEqual(IteratedLocalSearch().run(self.instance_copy_test_2, params).evaluate, sol.evaluate)
+
+    def test_precedences(self):
+        # Les mouvements qui retardent une opération après le début de son successeur sont refusés
+        instance = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+        for search in (FirstNeighborLocalSearch(), TabuSearch(), SimulatedAnnealing(), IteratedLocalSearch()):
+            sol = search.run(instance, {'seed': 0, 'max_iterations': 20, 'stop_at_bound': False})
+            self.assertTrue(sol.is_feasible)
+            for op in instance.operations:
+                for pred in op.predecessors:
+                    self.assertLessEqual(pred.end_time, op.start_time)
+
+    def test_iterated_local_search_time_limit(self):
+        # La limite de temps arrête aussi la descente initiale, et non seulement les cycles
+        instance = generate(20, 5, 4, {'seed': 0})
+        initial_eval = self.non_det.run(instance, {'seed': 0}).evaluate
+        search = IteratedLocalSearch()
+        sol = search.run(instance, {'seed': 0, 'time_limit': 0, 'stop_at_bound': False})
+        self.assertEqual(search.iterations, 0)
+        self.assertEqual(sol.evaluate, initial_eval)
+
+    def test_iterated_local_search_time_limit_in_descent(self):
+        # Une seule passe de la descente sur 300 opérations prend plusieurs secondes :
+        # la limite est vérifiée pendant le parcours des mouvements
+        instance = generate(60, 5, 4, {'seed': 0})
+        search = IteratedLocalSearch()
+        start = time.perf_counter()
+        sol = search.run(instance, {'seed': 0, 'time_limit': 0.05, 'stop_at_bound': False})
+        self.assertLess(time.perf_counter() - start, 1.)
+        self.assertTrue(sol.is_feasible)
+
+    def test_perturbation_descent_undo(self):
+        sol = self.non_det.run(self.instance, {'seed': 0})
+        neighborhoods = (MachineSwitchNeighborhood(self.instance), OperationOrderNeighborhood(self.instance))
+        cycle = _PerturbationDescent(_MoveSampler(self.instance, random.Random(0), 0.5, True), 3, neighborhoods)
+        state = sol.export_state()
+        value = sol.evaluate
+        sol.apply_move(cycle)
+        sol.undo_move()
+        # Tout le cycle (perturbation et descente) est annulé
+        self.assertEqual(sol.export_state(), state)
+        self.assertEqual(sol.evaluate, value)
+
+    def test_move_sampler(self):
+        self.non_det.run(self.instance, {'seed': 0})
+        sampler = _MoveSampler(self.instance, random.Random(0), 0.5, True)
+        for _ in range(200):
+            switch = sampler._switch_move()
+            if switch is not None:
+                # Jamais vers la machine courante, toujours vers une machine éligible
+                self.assertNotEqual(switch.machine.machine_id, switch.operation.assigned_to)
+                self.assertIn(switch.machine.machine_id, switch.operation.processing_times)
+            swap = sampler._swap_move()
+            self.assertIsNotNone(swap)
+            self.assertGreaterEqual(len(swap.machine.scheduled_operations), 2)
+            self.assertIn(swap.operation1, swap.machine.scheduled_operations)
+            self.assertIn(swap.operation2, swap.machine.scheduled_operations)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -14,14 +14,15 @@ class TestMachine(unittest.TestCase):
         # Création de deux opérations fictives
         op1 = Operation(0, 0)
         op2 = Operation(1, 0)
+        op1.processing_times[0] = 5
+        op1.energies[0] = 2
+        op2.processing_times[0] = 7
+        op2.energies[0] = 3
         # On simule leur planification
-        op1._schedule_info = type('Schedule', (), {'schedule_time': 0, 'duration': 5, 'energy_consumption': 2, 'assigned_to': 0})()
-        op2._schedule_info = type('Schedule', (), {'schedule_time': 5, 'duration': 7, 'energy_consumption': 3, 'assigned_to': 0})()
-        self.machine._scheduled_operations.append(op1)
-        self.machine._scheduled_operations.append(op2)
+        self.machine.add_operation(op1, 0)
+        self.machine.add_operation(op2, 5)
         # On simule un démarrage et un arrêt
-        self.machine._start_times.append(0)
-        self.machine._stop_times.append(12)
+        self.machine.add_period(0, 12)
 
     def tearDown(self):
         pass
@@ -33,5 +34,125 @@ class TestMachine(unittest.TestCase):
         # 2+3 (opérations) + 1*2 (set_up) + 1*4 (tear_down)
         self.assertEqual(self.machine.total_energy_consumption, 11, "La consommation totale devrait être 11")
 
+    def testRemoveOperation(self):
+        operation = self.machine.scheduled_operations[1]
+        self.machine.remove_operation(operation)
+        self.assertEqual(self.machine.completion_time, 5, "La dernière opération devrait finir à 5")
+        # 2 (opération) + 1*2 (set_up) + 1*4 (tear_down) + 5*7 (machine allumée sans opération)
+        self.assertEqual(self.machine.total_energy_consumption, 43, "La consommation totale devrait être 43")
+
+    def testPeriods(self):
+        self.machine.add_period(30, 50)
+        self.machine.add_period(20, 25)
+        self.assertEqual(list(self.machine.start_times), [0, 20, 30], "Les démarrages doivent être triés")
+        self.assertEqual(list(self.machine.stop_times), [12, 25, 50], "Les arrêts doivent être triés")
+        self.assertEqual(self.machine.working_time, 37)
+        self.assertTrue(self.machine.is_on(0))
+        self.assertFalse(self.machine.is_on(12))
+        self.assertTrue(self.machine.is_on(24))
+        self.assertFalse(self.machine.is_on(60))
+        self.assertEqual(self.machine.next_on(15), 20)
+        self.assertEqual(self.machine.next_on(40), 40)
+        self.assertIsNone(self.machine.next_on(50))
+        self.assertEqual(self.machine.next_off(32), 50)
+        self.assertEqual(self.machine.next_off(27), 27)
+        with self.assertRaises(AttributeError):
+            self.machine.start_times.append(60)
+
+    def testEarliestSlot(self):
+        # Machine allumée de 0 à 12, opérations sur [0, 5) et [5, 12), set up de 1
+        self.machine.add_period(20, 40)
+        self.assertEqual(self.machine.earliest_slot(3, 0), 21, "La machine est occupée jusqu'à 12")
+        self.assertEqual(self.machine.earliest_slot(19, 0), 21)
+        self.assertIsNone(self.machine.earliest_slot(20, 0), "Aucune période assez longue")
+        op = Operation(2, 0)
+        op.processing_times[0] = 4
+        op.energies[0] = 1
+        self.machine.insert_operation(op, 25)
+        self.assertEqual(self.machine.earliest_slot(4, 21), 21)
+        self.assertEqual(self.machine.earliest_slot(5, 21), 29)
+        self.assertEqual(self.machine.available_time, 29)
+        # Insérée avant la précédente : les opérations restent dans l'ordre de traitement
+        first = Operation(3, 0)
+        first.processing_times[0] = 4
+        first.energies[0] = 1
+        self.machine.insert_operation(first, 21)
+        self.assertEqual(self.machine.scheduled_operations[-2:], [first, op])
+        self.assertEqual(self.machine.available_time, 29)
+
+    def testOptimalPeriods(self):
+        machine = Machine(1, 1, 2, 3, 4, 5, 100)
+        for start_time, duration in [(10, 5), (40, 5), (47, 3)]:
+            op = Operation(0, start_time)
+            op.processing_times[1] = duration
+            op.energies[1] = 1
+            machine.insert_operation(op, start_time)
+        # Arrêt entre 15 et 40 : 2 + 4 + 5*1 < 5*25 ; pas entre 45 et 47 (trop court)
+        self.assertEqual(machine.optimal_periods(), [(9, 15), (39, 50)])
+        machine.set_periods(machine.optimal_periods())
+        self.assertEqual(machine.working_time, 17)
+        self.assertFalse(machine.is_on(20))
+        # 3 (opérations) + 2*2 (set_up) + 2*4 (tear_down) + 5*(17-13)
+        self.assertEqual(machine.total_energy_consumption, 35)
+
+    def testOvertime(self):
+        machine = Machine(1, 1, 2, 3, 4, 5, 20)
+        machine.start(0)
+        op = Operation(0, 0)
+        op.processing_times[1] = 5
+        op.energies[1] = 1
+        # La machine tourne encore après sa fin de planning pour l'opération
+        self.assertTrue(machine.is_on(30))
+        machine.add_operation(op, 30)
+        self.assertEqual(machine.working_time, 35, "La machine doit tourner jusqu'à la fin de l'opération")
+        machine.remove_operation(op)
+        self.assertEqual(machine.working_time, 20)
+
+    def testStartEarlier(self):
+        machine = Machine(1, 1, 2, 3, 4, 5, 20)
+        machine.start(10)
+        # Démarrer avant le premier démarrage avance celui-ci
+        machine.start(4)
+        self.assertEqual(machine.start_times, [4])
+        self.assertEqual(machine.working_time, 16)
+
+    def testStartAfterEndTime(self):
+        # Machine démarrée après sa fin de planning (opération en heures supplémentaires) :
+        # la dernière période ne s'arrête pas avant son démarrage
+        machine = Machine(2, 1, 2, 3, 4, 5, 20)
+        machine.start(30)
+        self.assertEqual(machine.working_time, 0)
+        op = Operation(0, 0)
+        op.processing_times[2] = 4
+        op.energies[2] = 3
+        machine.add_operation(op, 31)
+        self.assertTrue(machine.is_on(31))
+        self.assertEqual(machine.working_time, 5)
+        # Opération, set up, tear down et consommation minimale pendant le réglage
+        self.assertEqual(machine.total_energy_consumption, 3 + 2 + 4 + 5 * (5 - 4))
+
+    def testRollback(self):
+        machine = Machine(1, 1, 2, 3, 4, 5, 20)
+        op = Operation(0, 0)
+        op.processing_times[1] = 3
+        op.energies[1] = 2
+        machine.start(0)
+        machine.add_operation(op, 2)
+        state = machine.snapshot()
+        mark = machine.start_journal()
+        # Chaque modification de la planification est annulée
+        machine.remove_operation(op)
+        machine.start(10)
+        machine.add_period(12, 15)
+        machine.insert_operation(op, 12)
+        machine.set_periods([(0, 6), (11, 15)])
+        machine.reset()
+        machine.load([op], [(0, 16)])
+        machine.stop(18)
+        machine.recalculate_available_time()
+        machine.rollback(mark)
+        self.assertEqual(machine.snapshot(), state)
+        machine.stop_journal()
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,86 @@
+'''
+Tests for the multi-start heuristic
+'''
+import multiprocessing
+import os
+import time
+import unittest
+
+from src.scheduling.benchmarks.generator import generate
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.local_search import FirstNeighborLocalSearch, SimulatedAnnealing
+from src.scheduling.optim.multi_start import MultiStart
+from src.scheduling.optim.rng import child_seeds
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestMultiStart(unittest.TestCase):
+
+    def setUp(self):
+        self.instance = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp_easy")
+
+    def tearDown(self):
+        pass
+
+    def test_keeps_best_run(self):
+        finished = []
+        heuristic = MultiStart()
+        solution = heuristic.run(self.instance, {'runs': 4, 'workers': 1, 'stop_at_bound': False,
+                                                 'callback': lambda *run: finished.append(run)})
+        self.assertEqual(finished, heuristic.runs)
+        self.assertEqual(sorted(seed for seed, _, _ in finished), sorted(child_seeds(0, 4)))
+        self.assertEqual(solution.evaluate, min(value for _, value, _ in finished))
+        # Une exécution est reproductible à partir de son seed
+        seed, value, _ = finished[-1]
+        self.assertEqual(FirstNeighborLocalSearch().run(self.instance, {'seed': seed}).evaluate, value)
+
+    def test_parallel_runs_match_sequential(self):
+        sequential = MultiStart()
+        sequential.run(self.instance, {'runs': 4, 'workers': 1, 'stop_at_bound': False})
+        parallel = MultiStart()
+        solution = parallel.run(self.instance, {'runs': 4, 'workers': 2, 'stop_at_bound': False})
+        self.assertEqual(sorted((seed, value) for seed, value, _ in parallel.runs),
+                         sorted((seed, value) for seed, value, _ in sequential.runs))
+        self.assertEqual(solution.evaluate, min(value for _, value, _ in sequential.runs))
+
+    def test_stop_at_bound(self):
+        heuristic = MultiStart()
+        solution = heuristic.run(self.instance, {'runs': 4, 'workers': 1})
+        # Les exécutions s'arrêtent à la première qui atteint la borne inférieure
+        self.assertLess(len(heuristic.runs), 4)
+        self.assertEqual(heuristic.gap, 0.)
+        self.assertEqual(solution.evaluate, heuristic.runs[-1][1])
+        self.assertTrue(all(value > solution.evaluate for _, value, _ in heuristic.runs[:-1]))
+
+    def test_time_limit(self):
+        heuristic = MultiStart()
+        solution = heuristic.run(self.instance, {'runs': 4, 'workers': 1, 'time_limit': 0})
+        # Le premier run est toujours fait, avec le temps restant comme limite
+        self.assertEqual(len(heuristic.runs), 1)
+        self.assertTrue(solution.is_feasible)
+        # Les runs en cours dans les workers s'arrêtent aussi à l'échéance
+        params = {'runs': 4, 'workers': 2, 'time_limit': 0.5, 'stop_at_bound': False,
+                  'heuristic': SimulatedAnnealing(),
+                  'heuristic_params': {'max_iterations': 10 ** 9, 'stop_at_bound': False}}
+        start = time.perf_counter()
+        solution = heuristic.run(self.instance, params)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertTrue(solution.is_feasible)
+        self.assertTrue(heuristic.runs)
+        self.assertRaises(ValueError, heuristic.run, self.instance, {'runs': 0})
+
+    def test_time_limit_default_heuristic(self):
+        # Sans limite, un run de FirstNeighborLocalSearch prend près de 5 s sur 1000 opérations
+        instance = generate(100, 10, 10, {'seed': 0})
+        for workers in (1, 2):
+            start = time.perf_counter()
+            solution = MultiStart().run(instance, {'runs': 4, 'workers': workers, 'time_limit': 0.2,
+                                                   'stop_at_bound': False})
+            self.assertLess(time.perf_counter() - start, 2)
+            self.assertTrue(solution.is_feasible)
+            # Les processus des runs encore en cours sont arrêtés
+            self.assertEqual(multiprocessing.active_children(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,11 @@
 import unittest
 import os
+from src.scheduling.benchmarks.generator import generate
 from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import NonDeterminist
 from src.scheduling.solution import Solution
 from src.scheduling.optim.neighborhoods import MachineSwitchNeighborhood, OperationOrderNeighborhood
+from src.scheduling.optim.moves import MachineSwitchMove
 from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
 
 
@@ -74,5 +77,83 @@ class TestNeighborhoods(unittest.TestCase):
         self.assertLessEqual(better_sol.evaluate, initial_value)
         self.assertTrue(better_sol.is_feasible)
 
+    def test_apply_and_undo_move(self):
+        """Un mouvement annulé doit laisser la solution inchangée"""
+        inst, solution = create_initial_solution()
+        initial_value = solution.evaluate
+        initial_state = [op.snapshot() for op in inst.operations]
+        # Dernière opération du job 1 : pas de successeur retardé par le changement
+        operation = inst.operations[5]
+
+        self.assertTrue(solution.apply_move(MachineSwitchMove(operation, inst.machines[2])))
+        self.assertEqual(operation.assigned_to, 2)
+        self.assertIn(operation, inst.machines[2].scheduled_operations)
+        self.assertNotIn(operation, inst.machines[0].scheduled_operations)
+
+        solution.undo_move()
+        self.assertEqual(operation.assigned_to, 0)
+        self.assertEqual(inst.machines[2].scheduled_operations, [])
+        self.assertEqual([op.snapshot() for op in inst.operations], initial_state)
+        self.assertEqual(solution.evaluate, initial_value)
+
+    def test_undo_every_move(self):
+        """Chaque mouvement annulé rend exactement la planification des machines"""
+        inst = generate(8, 4, 3, {'seed': 1})
+        for plan_shutdowns in (False, True):
+            solution = NonDeterminist().run(inst, {'seed': 0})
+            if plan_shutdowns:
+                solution.shutdown_planning = True
+                solution.plan_shutdowns()
+            state = solution.export_state()
+            neighborhoods = (MachineSwitchNeighborhood(inst), MachineSwitchNeighborhood(inst, {'insert': True}),
+                             OperationOrderNeighborhood(inst))
+            for neighborhood in neighborhoods:
+                for move in neighborhood.moves(solution):
+                    if solution.apply_move(move):
+                        solution.undo_move()
+                    self.assertEqual(solution.export_state(), state, str(move))
+
+    def test_move_breaking_precedence(self):
+        """Un mouvement qui termine une opération après le début de son successeur est refusé"""
+        inst, solution = create_initial_solution()
+        initial_state = [op.snapshot() for op in inst.operations]
+        operation = inst.operations[4]
+
+        self.assertFalse(solution.apply_move(MachineSwitchMove(operation, inst.machines[2])))
+        self.assertEqual([op.snapshot() for op in inst.operations], initial_state)
+        self.assertEqual(solution.violated_precedences, 0)
+        self.assertTrue(solution.is_feasible)
+
+        # Sans passer par un mouvement, la contrainte violée rend la solution non réalisable
+        solution.unschedule(operation)
+        solution.schedule(operation, inst.machines[2])
+        self.assertGreater(operation.end_time, inst.operations[5].start_time)
+        self.assertEqual(solution.violated_precedences, 1)
+        self.assertFalse(solution.is_feasible)
+
+    def test_best_move_leaves_solution_unchanged(self):
+        """La recherche du meilleur mouvement ne modifie pas la solution"""
+        inst, solution = create_initial_solution()
+        initial_value = solution.evaluate
+        initial_state = [op.snapshot() for op in inst.operations]
+
+        for neighborhood in (MachineSwitchNeighborhood(inst), OperationOrderNeighborhood(inst)):
+            move, value = neighborhood.best_move(solution)
+            self.assertIsNotNone(move)
+            self.assertEqual(solution.evaluate, initial_value)
+            self.assertEqual([op.snapshot() for op in inst.operations], initial_state)
+
+    def test_parallel_best_move(self):
+        """L'évaluation parallèle donne le même meilleur mouvement que l'évaluation séquentielle"""
+        inst, solution = create_initial_solution()
+        for neighborhood_class in (MachineSwitchNeighborhood, OperationOrderNeighborhood):
+            serial_move, serial_value = neighborhood_class(inst).best_move(solution)
+            neighborhood = neighborhood_class(inst, {'workers': 2})
+            try:
+                move, value = neighborhood.best_move(solution)
+            finally:
+                neighborhood.close()
+            self.assertEqual((str(move), value), (str(serial_move), serial_value))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
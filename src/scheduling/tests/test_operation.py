@@ -0,0 +1,43 @@
+'''
+Tests for the Operation class
+'''
+import unittest
+
+from src.scheduling.instance.operation import Operation
+
+
+class TestOperation(unittest.TestCase):
+
+    def setUp(self):
+        self.operation = Operation(0, 0)
+        self.operation.processing_times = {0: 5, 1: 7}
+        self.operation.energies = {0: 2, 1: 3}
+
+    def tearDown(self):
+        pass
+
+    def testNoInstanceDict(self):
+        self.assertFalse(hasattr(self.operation, '__dict__'), "L'opération ne doit pas avoir de __dict__")
+
+    def testScheduleInfoReused(self):
+        self.operation.schedule(0, 10)
+        info = self.operation._schedule_info
+        self.operation.reset()
+        self.assertFalse(self.operation.assigned)
+        self.operation.schedule(1, 20)
+        self.assertIs(self.operation._schedule_info, info, "L'information de planification doit être réutilisée")
+        self.assertEqual((self.operation.assigned_to, self.operation.start_time, self.operation.end_time,
+                          self.operation.energy), (1, 20, 27, 3))
+
+    def testSnapshotRestore(self):
+        self.operation.schedule(0, 10)
+        state = self.operation.snapshot()
+        self.operation.schedule(1, 20)
+        self.operation.restore(state)
+        self.assertEqual((self.operation.assigned_to, self.operation.start_time, self.operation.end_time), (0, 10, 15))
+        self.operation.restore(None)
+        self.assertFalse(self.operation.assigned)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,9 +4,13 @@ Test of the Solution class.
 @author: Vassilissa Lehoux
 '''
 import os
+import tempfile
 import unittest
 
+from src.scheduling.benchmarks.generator import generate
 from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.optim.local_search import SimulatedAnnealing
 from src.scheduling.solution import Solution
 from src.scheduling.tests.test_utils import TEST_FOLDER, TEST_FOLDER_DATA
 
@@ -26,6 +30,35 @@ class TestSolution(unittest.TestCase):
         self.assertEqual(len(sol.available_operations), len(self.inst1.jobs),
                          'One operation per job should be available for scheduling')
 
+    def test_available_operations(self):
+        sol = Solution(self.inst1)
+        first, second = self.inst1.jobs[0].operations
+        self.assertIn(first, sol.available_operations)
+        self.assertNotIn(second, sol.available_operations)
+        sol.schedule(first, self.inst1.machines[0])
+        self.assertNotIn(first, sol.available_operations)
+        self.assertIn(second, sol.available_operations)
+        sol.unschedule(first)
+        self.assertFalse(first.assigned, 'operation should not be assigned anymore')
+        self.assertIn(first, sol.available_operations)
+        self.assertNotIn(second, sol.available_operations)
+
+    def test_insert_op(self):
+        sol = Solution(self.inst1)
+        operations = self.inst1.operations
+        machine = self.inst1.machines[0]
+        sol.schedule(operations[2], machine)
+        sol.schedule(operations[0], self.inst1.machines[1])
+        sol.schedule(operations[1], machine)
+        # Idle period between 20 and 32 on machine 0
+        self.assertEqual((operations[1].start_time, machine.available_time), (32, 37))
+        sol.insert(operations[3], machine)
+        self.assertEqual(operations[3].start_time, 20, 'operation should fill the idle period')
+        self.assertEqual(operations[3].end_time, 30, 'wrong operation end time')
+        self.assertEqual(machine.available_time, 37, 'available time should not change')
+        self.assertEqual(sol.cmax, 37, 'wrong cmax')
+        self.assertTrue(sol.is_feasible, 'Solution should be feasible')
+
     def test_schedule_op(self):
         sol = Solution(self.inst1)
         operation = self.inst1.operations[0]
@@ -79,6 +112,47 @@ class TestSolution(unittest.TestCase):
         plt.savefig(TEST_FOLDER + os.path.sep +  'temp.png')
         sol.to_csv()
 
+    def test_schedule_on_emptied_machine(self):
+        sol = Solution(self.inst1)
+        operation = self.inst1.operations[0]
+        machine = self.inst1.machines[1]
+        sol.schedule(operation, machine)
+        sol.unschedule(operation)
+        # La machine reste allumée depuis 0 : l'opération attend la fin du réglage
+        sol.schedule(operation, machine)
+        self.assertEqual(operation.start_time, machine.start_times[0] + machine.set_up_time)
+        self.assertEqual(list(machine.start_times), [0])
+
+    def test_restart_emptied_machine(self):
+        # Machine démarrée à 17 pour une opération, vidée par un retrait, puis
+        # redémarrée plus tôt : une seule période, et non deux démarrages pour un arrêt
+        sol = Solution(self.inst1)
+        machine = self.inst1.machines[0]
+        sol.schedule(self.inst1.operations[0], self.inst1.machines[1])
+        sol.schedule(self.inst1.operations[1], machine)
+        self.assertEqual(list(machine.start_times), [17])
+        sol.unschedule(self.inst1.operations[1])
+        sol.schedule(self.inst1.operations[2], machine)
+        self.assertEqual(list(machine.start_times), [0])
+        self.assertEqual(list(machine.stop_times), [100])
+        self.assertEqual(machine.working_time, 100)
+        self.assertEqual(self.inst1.operations[2].start_time, 15)
+
+    def test_plan_shutdowns(self):
+        sol = Solution(self.inst1)
+        operations = self.inst1.operations
+        machine = self.inst1.machines[0]
+        for operation in operations:
+            sol.schedule(operation, machine)
+        energy = sol.total_energy_consumption
+        sol.plan_shutdowns()
+        self.assertEqual(list(machine.start_times), [0], 'machine should be started once')
+        self.assertEqual(list(machine.stop_times), [operations[-1].end_time], 'machine should stop after its last operation')
+        self.assertLess(sol.total_energy_consumption, energy, 'idle energy until the end should be saved')
+        sol.shutdown_planning = True
+        sol.unschedule(operations[-1])
+        self.assertEqual(list(machine.stop_times), [operations[-2].end_time], 'periods should be planned again')
+
     def test_objective(self):
         '''
         Test your objective function
@@ -122,6 +196,64 @@ class TestSolution(unittest.TestCase):
 
 
 
+    def test_overtime(self):
+        # Fin de planning trop courte : les dernières opérations sont en heures supplémentaires
+        inst = generate(10, 3, 2, {'horizon': 0.5})
+        sol = Greedy().run(inst)
+        self.assertTrue(sol.is_feasible, "Overtime does not make the solution infeasible")
+        late_machines = [machine for machine in inst.machines if machine.completion_time > machine.end_time]
+        self.assertTrue(late_machines)
+        for machine in late_machines:
+            self.assertEqual(list(machine.stop_times), [machine.end_time])
+            self.assertEqual(machine.working_time, machine.completion_time - machine.start_times[0],
+                             "The machine should run until its last operation ends")
+
+    def test_export_import(self):
+        inst = generate(20, 5, 4, {'density': 0.5})
+        # Opérations insérées dans les créneaux libres : planifiées dans le désordre
+        sol = SimulatedAnnealing().run(inst, {'seed': 0, 'max_iterations': 200, 'stop_at_bound': False})
+        sol.plan_shutdowns()
+        def planning(solution):
+            # Les opérations d'une machine sont dans l'ordre de leurs dates de début
+            operation_states, machine_states, _ = solution.export_state()
+            return operation_states, machine_states, solution.evaluate
+
+        expected = planning(sol)
+        with tempfile.TemporaryDirectory() as folder:
+            sol.to_csv(folder)
+            sol.to_csv(folder, compress=True)
+            sol.to_binary(os.path.join(folder, 'solution.npy'))
+            # Lignes dans le désordre : les prédécesseurs sont lus après leurs successeurs
+            with open(os.path.join(folder, 'operations.csv')) as f:
+                header, *rows = f.read().splitlines()
+            with open(os.path.join(folder, 'shuffled.csv'), 'w') as f:
+                f.write('\n'.join([header] + rows[::-1]) + '\n')
+            for operation_file, machine_file in (('operations.csv', 'machines.csv'),
+                                                 ('operations.csv.gz', 'machines.csv.gz'),
+                                                 ('shuffled.csv', 'machines.csv')):
+                read = Solution(inst)
+                read.from_csv(folder, operation_file, machine_file)
+                self.assertEqual(planning(read), expected)
+            read = Solution(inst)
+            read.from_binary(os.path.join(folder, 'solution.npy'))
+            self.assertEqual(planning(read), expected)
+            self.assertTrue(read.is_feasible)
+            self.assertFalse(read.available_operations)
+
+    def test_import_errors(self):
+        with tempfile.TemporaryDirectory() as folder:
+            with open(os.path.join(folder, 'operations.csv'), 'w') as f:
+                f.write('operation_id,machine_id,start_time\n0,9,0\n')
+            with open(os.path.join(folder, 'machines.csv'), 'w') as f:
+                f.write('machine_id,start_time,stop_time\n')
+            sol = Solution(self.inst1)
+            with self.assertRaises(ValueError):
+                sol.from_csv(folder, 'operations.csv', 'machines.csv')
+            with open(os.path.join(folder, 'operations.csv'), 'w') as f:
+                f.write('operation,machine,start\n0,0,0\n')
+            with self.assertRaises(ValueError):
+                sol.from_csv(folder, 'operations.csv', 'machines.csv')
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
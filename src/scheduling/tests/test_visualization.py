@@ -0,0 +1,60 @@
+'''
+Tests for the plots, and for the solvers not importing matplotlib
+'''
+import os
+import tempfile
+import unittest
+
+from src.scheduling.benchmarks.generator import generate
+from src.scheduling.benchmarks.runner import SOLVER_MODULES, import_modules
+from src.scheduling.instance.instance import Instance
+from src.scheduling.optim.constructive import Greedy
+from src.scheduling.tests.test_utils import TEST_FOLDER_DATA
+
+
+class TestVisualization(unittest.TestCase):
+
+    def setUp(self):
+        self.inst = Instance.from_file(TEST_FOLDER_DATA + os.path.sep + "jsp1")
+
+    def tearDown(self):
+        pass
+
+    def test_solvers_do_not_import_matplotlib(self):
+        # Nouvel interpréteur : les autres tests ont pu importer matplotlib
+        seconds, modules = import_modules(SOLVER_MODULES)
+        self.assertIn('src.scheduling.optim.local_search', modules)
+        self.assertFalse([module for module in modules if module.split('.')[0] == 'matplotlib'],
+                         "matplotlib should only be imported to plot")
+
+    def test_gantt(self):
+        from src.scheduling.visualization import gantt
+        solution = Greedy().run(self.inst)
+        plt = gantt(solution, 'tab20')
+        figure = plt.gcf()
+        self.assertEqual(len(figure.axes), 1)
+        self.assertEqual(figure.axes[0].get_title(), 'Gantt Chart')
+        self.assertEqual(len(figure.axes[0].get_yticks()), self.inst.nb_machines)
+        # Une seule collection pour les opérations, réglages et arrêts
+        self.assertEqual(len(figure.axes[0].collections), 1)
+        nb_set_ups = sum(len(machine.start_times) for machine in self.inst.machines)
+        self.assertEqual(len(figure.axes[0].collections[0].get_paths()),
+                         self.inst.nb_operations + 2 * nb_set_ups)
+        self.assertEqual(len(figure.axes[0].texts), self.inst.nb_operations + 2 * nb_set_ups)
+        plt.close(figure)
+
+    def test_large_gantt(self):
+        solution = Greedy().run(generate(200, 10, 5))
+        with tempfile.TemporaryDirectory() as folder:
+            filename = folder + os.path.sep + 'gantt.svg'
+            plt = solution.gantt('tab20', {'filename': filename, 'max_labels': 50})
+            self.assertTrue(os.path.getsize(filename) > 0)
+        axes = plt.gcf().axes[0]
+        # Seules les barres assez larges sont étiquetées
+        self.assertLessEqual(len(axes.texts), 50)
+        self.assertFalse(axes.collections[0].get_rasterized())
+        plt.close('all')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+'''
+Plots of the solutions.
+matplotlib is only imported here, so that the solvers (and their worker
+processes) do not load it. Import this module only to plot.
+
+@author: Vassilissa Lehoux
+'''
+import sys
+from typing import Dict
+
+import matplotlib
+import numpy as np
+
+
+if 'matplotlib.pyplot' not in sys.modules:
+    # Rendu sans affichage, sauf si pyplot est déjà utilisé (notebook, interface...)
+    matplotlib.use('Agg')
+
+from matplotlib import colormaps
+from matplotlib import pyplot as plt
+from matplotlib.collections import PolyCollection
+
+
+# Height of the bars, centered on the row of their machine
+BAR_HEIGHT = 0.8
+LABEL_FONT_SIZE = 8
+
+
+def gantt(solution, colormapname, params: Dict=dict()):
+    """
+    Generate a plot of the planning.
+    Standard colormaps can be found at https://matplotlib.org/stable/users/explain/colors/colormaps.html
+    All the bars (operations, set ups and tear downs) are drawn as a single
+    collection, and only the bars wide enough to show their label are labelled,
+    so that schedules of tens of thousands of operations are plotted in seconds.
+    Returns the pyplot module, e.g. to save the figure with savefig.
+
+    @param params: 'max_labels' (default 2000): at most this number of labels,
+        the ones of the widest bars,
+      'filename' (default None): the figure is saved in this file, in the format
+        given by its extension (png, svg, pdf...),
+      'dpi' (default 100),
+      'rasterized' (default True above 10000 bars): the bars are drawn as an image
+        in vector formats, which keeps svg and pdf files small
+    """
+    max_labels = params.get('max_labels', 2000)
+    dpi = params.get('dpi', 100)
+    colormap = colormaps[colormapname]
+    machines = solution.inst.machines
+
+    operations = [op for machine in machines for op in machine.scheduled_operations]
+    op_starts = np.array([op.start_time for op in operations], dtype=float)
+    op_durations = np.array([op.end_time - op.start_time for op in operations], dtype=float)
+    op_rows = np.array([op.assigned_to for op in operations], dtype=float)
+    # Set color based on job ID
+    op_colors = colormap((np.array([op.job_id for op in operations], dtype=int) + 2) % colormap.N)
+    op_labels = [f"O{op.operation_id}_J{op.job_id}" for op in operations]
+
+    # Réglages et arrêts des machines
+    set_ups = [(start, machine.set_up_time, stop, machine.tear_down_time, machine.machine_id)
+               for machine in machines for (start, stop) in zip(machine.start_times, machine.stop_times)]
+    set_ups = np.array(set_ups, dtype=float).reshape(-1, 5)
+    nb_set_ups = len(set_ups)
+
+    starts = np.concatenate((op_starts, set_ups[:, 0], set_ups[:, 2]))
+    durations = np.concatenate((op_durations, set_ups[:, 1], set_ups[:, 3]))
+    rows = np.concatenate((op_rows, set_ups[:, 4], set_ups[:, 4]))
+    colors = np.concatenate((op_colors.reshape(-1, 4),
+                             np.tile(colormap(0), (nb_set_ups, 1)),
+                             np.tile(colormap(1), (nb_set_ups, 1))))
+    labels = op_labels + ["set up"] * nb_set_ups + ["tear down"] * nb_set_ups
+
+    fig, ax = plt.subplots(figsize=(12, 6), dpi=dpi)
+    bottoms = rows - BAR_HEIGHT / 2
+    tops = rows + BAR_HEIGHT / 2
+    ends = starts + durations
+    vertices = np.stack((np.column_stack((starts, bottoms)), np.column_stack((starts, tops)),
+                         np.column_stack((ends, tops)), np.column_stack((ends, bottoms))), axis=1)
+    bars = PolyCollection(vertices, facecolors=colors, edgecolors='black',
+                          linewidths=1. if len(starts) <= 1000 else 0.2)
+    bars.set_rasterized(params.get('rasterized', len(starts) > 10000))
+    ax.add_collection(bars)
+    ax.autoscale_view()
+
+    # Niveau de détail : étiquettes des seules barres assez larges pour leur texte
+    x_min, x_max = ax.get_xlim()
+    axes_width = fig.get_figwidth() * dpi * ax.get_position().width
+    pixel_widths = durations * axes_width / (x_max - x_min) if x_max > x_min else durations
+    labelled = np.flatnonzero(pixel_widths >= LABEL_FONT_SIZE * dpi / 72.)
+    if len(labelled) > max_labels:
+        labelled = labelled[np.argsort(-pixel_widths[labelled], kind='stable')[:max_labels]]
+    for bar in labelled.tolist():
+        ax.text(starts[bar] + durations[bar] / 2, rows[bar], labels[bar],
+                rotation=90, ha='center', va='center', fontsize=LABEL_FONT_SIZE)
+
+    ax.set_yticks(range(solution.inst.nb_machines))
+    ax.set_yticklabels([f'M{machine_id+1}' for machine_id in range(solution.inst.nb_machines)])
+    ax.set_xlabel('Time')
+    ax.set_ylabel('Machine')
+    ax.set_title('Gantt Chart')
+    ax.grid(True)
+
+    if params.get('filename') is not None:
+        fig.savefig(params['filename'], dpi=dpi)
+    return plt